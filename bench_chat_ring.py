@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark chat fan-out to N sessions on one host: every session tailing the
+chat log and parsing each JSON line itself, against one writer publishing
+into the shared-memory ring and each session reading its own cursor.
+"""
+import json
+import os
+import tempfile
+import time
+
+from chat_ring import ChatRing, RingReader
+from chat_tail import ChatTailReader
+from chat_view import format_chat_time
+
+MESSAGES = 200
+BATCH = 10  # messages written between session wake-ups
+
+
+def _message(i):
+    return {"username": f"user{i % 7}", "message": f"message number {i} " + "x" * 40,
+            "timestamp": "2026-10-17T12:34:56Z"}
+
+
+def bench_file(readers: int, tmp: str) -> float:
+    path = os.path.join(tmp, "chat.log")
+    open(path, "w").close()
+    sessions = [ChatTailReader(path) for _ in range(readers)]
+    shown = 0
+    start = time.perf_counter()
+    with open(path, "a") as log:
+        for batch in range(0, MESSAGES, BATCH):
+            log.write("".join(json.dumps(_message(i)) + "\n" for i in range(batch, batch + BATCH)))
+            log.flush()
+            for index, reader in enumerate(sessions):
+                me = f"user{index % 7}"
+                for line in reader.read_lines():
+                    msg = json.loads(line)
+                    if msg.get("username") != me:
+                        f"[{format_chat_time(msg['timestamp'])}] {msg['username']}: {msg['message']}"
+                        shown += 1
+    elapsed = time.perf_counter() - start
+    for reader in sessions:
+        reader.close()
+    return elapsed, shown
+
+
+def bench_ring(readers: int, tmp: str) -> float:
+    path = os.path.join(tmp, "chat.ring")
+    ring = ChatRing(path)
+    sessions = [RingReader(path) for _ in range(readers)]
+    names = [f"user{index % 7}".encode() for index in range(readers)]
+    shown = 0
+    start = time.perf_counter()
+    for batch in range(0, MESSAGES, BATCH):
+        for i in range(batch, batch + BATCH):
+            msg = json.loads(json.dumps(_message(i)))  # the relay parses each message once
+            ring.append(msg["username"], msg["timestamp"], msg["message"])
+        for reader, me in zip(sessions, names):
+            records, _missed = reader.read(me)
+            for username, timestamp, message in records:
+                f"[{format_chat_time(timestamp)}] {username}: {message}"
+                shown += 1
+    elapsed = time.perf_counter() - start
+    for reader in sessions:
+        reader.close()
+    ring.close()
+    return elapsed, shown
+
+
+def main():
+    print(f"{MESSAGES} messages, sessions woken every {BATCH}")
+    print(f"{'readers':>8} {'file us/msg':>12} {'ring us/msg':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for readers in (10, 100, 1000):
+            file_time, file_shown = bench_file(readers, tmp)
+            ring_time, ring_shown = bench_ring(readers, tmp)
+            assert file_shown == ring_shown
+            print(f"{readers:>8} {file_time / MESSAGES * 1e6:>12.0f} {ring_time / MESSAGES * 1e6:>12.0f} "
+                  f"{file_time / ring_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Measure headless round throughput: deal, hit to 17, dealer play, settle.
+"""
+import time
+
+from engine import Round, generate_shoe
+
+
+def bench_engine(hands=200_000):
+    rnd = Round(generate_shoe())
+    start = time.perf_counter()
+    for _ in range(hands):
+        if len(rnd.shoe) < 20:
+            rnd.shoe = generate_shoe()
+        if not rnd.deal():
+            while rnd.player.values()[1] < 17:
+                rnd.hit()
+            if not rnd.player_bust():
+                rnd.play_dealer()
+        rnd.settle()
+    elapsed = time.perf_counter() - start
+    print(f"{hands} hands in {elapsed:.2f}s: {hands / elapsed:,.0f} hands/s")
+
+
+if __name__ == "__main__":
+    bench_engine()
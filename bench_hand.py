@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for hand evaluation: the incremental Hand against the
+old approach of walking every card and comparing rank strings per call.
+"""
+import random
+import timeit
+
+from engine import Hand, card_rank
+
+
+def values_by_walking(cards):
+    """The per-call evaluation Hand.values() used before running totals"""
+    total = 0
+    aces = 0
+    for card in cards:
+        rank = card_rank(card)
+        if rank in ["J", "Q", "K"]:
+            total += 10
+        elif rank == "A":
+            aces += 1
+            total += 1
+        else:
+            total += int(rank)
+    high = total + (10 if aces and total + 10 <= 21 else 0)
+    return total, high
+
+
+def bench_hand(number=200_000):
+    cards = random.sample(range(52), 3)
+    hand = Hand("Player")
+    for card in cards:
+        hand.add(card)
+    assert hand.values() == values_by_walking(cards)
+
+    # One player action queries the hand several times; time a representative mix
+    walking = timeit.timeit(
+        lambda: (values_by_walking(cards), values_by_walking(cards)[1], values_by_walking(cards)),
+        number=number,
+    )
+    incremental = timeit.timeit(
+        lambda: (hand.values(), hand.best_value(), hand.is_bust()),
+        number=number,
+    )
+    print(f"walking:     {walking / number * 1e9:8.0f} ns per action")
+    print(f"incremental: {incremental / number * 1e9:8.0f} ns per action")
+    print(f"speedup:     {walking / incremental:.1f}x")
+
+
+if __name__ == "__main__":
+    bench_hand()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Bytes written to the terminal per hand. The app runs on a driver that
+counts its output instead of a TTY, plays seeded hands by pressing the
+buttons, and reports what each hand cost to draw. The dealer's pauses are
+shortened so the run is quick; the screens drawn are the same.
+
+    python bench_render.py [hands] [--low-bandwidth]
+"""
+import argparse
+import asyncio
+import random
+
+from textual import events
+from textual.driver import Driver
+from textual.geometry import Size
+
+import main
+
+HANDS = 20
+SIZE = (160, 50)
+STEP = 0.05  # dealer pacing: short, but still one frame per dealer card
+
+
+class CountingDriver(Driver):
+    """Driver that renders normally but only counts what it would send"""
+
+    bytes_written = 0
+    writes = 0
+
+    def write(self, data: str) -> None:
+        CountingDriver.bytes_written += len(data.encode("utf-8"))
+        CountingDriver.writes += 1
+
+    def start_application_mode(self) -> None:
+        size = Size(*self._size)
+        self.process_message(events.Resize(size, size))
+
+    def disable_input(self) -> None:
+        pass
+
+    def stop_application_mode(self) -> None:
+        pass
+
+
+async def settle(app):
+    """Wait until the round is over and the screen has caught up"""
+    deal = app.query_one("#deal-button")
+    while not deal.visible or app.dealer_worker is not None:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+
+
+async def play(hands: int, low_bandwidth: bool = False):
+    random.seed(1234)
+    app = main.BlackjackApp(session_id="local", username="bench", low_bandwidth=low_bandwidth,
+                            step_delay=STEP, driver_class=CountingDriver)
+    results = {}
+
+    async def auto_pilot(pilot):
+        await pilot.pause(0.5)
+        results["startup"] = CountingDriver.bytes_written
+        per_hand = results["hands"] = []
+        for _ in range(hands):
+            before = CountingDriver.bytes_written, CountingDriver.writes
+            app.query_one("#deal-button").press()
+            await pilot.pause(0.1)
+            while app.query_one("#hit-button").visible and app.player_hand.best_value() < 15:
+                app.query_one("#hit-button").press()
+                await pilot.pause(0.1)
+            if app.query_one("#stand-button").visible:
+                app.query_one("#stand-button").press()
+            await settle(app)
+            per_hand.append((CountingDriver.bytes_written - before[0], CountingDriver.writes - before[1]))
+        app.exit()
+
+    await app.run_async(size=SIZE, auto_pilot=auto_pilot)
+    return results["startup"], results["hands"]
+
+
+def main_():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("hands", type=int, nargs="?", default=HANDS)
+    parser.add_argument("--low-bandwidth", action="store_true", help="use the compact layout")
+    args = parser.parse_args()
+    hands = args.hands
+    startup, per_hand = asyncio.run(play(hands, args.low_bandwidth))
+    total = sum(b for b, _ in per_hand)
+    writes = sum(w for _, w in per_hand)
+    print(f"first frame:  {startup:8d} bytes")
+    print(f"per hand:     {total / hands:8.0f} bytes, {writes / hands:.1f} writes (mean of {hands})")
+    print(f"largest hand: {max(b for b, _ in per_hand):8d} bytes")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Measure per-session shoe cost: build time (default and CSPRNG shuffle),
+resident memory, draw cost and how long a deal waits at a reshuffle.
+"""
+import random
+import time
+import tracemalloc
+
+from engine import ShoeManager, generate_shoe
+
+
+def bench_shoe(rounds=200):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        generate_shoe()
+    build_ms = (time.perf_counter() - start) / rounds * 1000
+
+    system = random.SystemRandom()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        generate_shoe(rng=system)
+    secure_ms = (time.perf_counter() - start) / rounds * 1000
+
+    tracemalloc.start()
+    shoe = generate_shoe()
+    memory_kb = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    drawn = 0
+    while len(shoe) > 1:
+        shoe.draw()
+        drawn += 1
+    draw_us = (time.perf_counter() - start) / drawn * 1e6
+
+    # start_round() at the cut card, with the next shoe shuffled in the background
+    swaps = []
+    manager = ShoeManager()
+    while len(swaps) < rounds // 10:
+        start = time.perf_counter()
+        if manager.start_round():
+            swaps.append(time.perf_counter() - start)
+        for _ in range(6):
+            manager.shoe.draw()
+    swap_us = sum(swaps) / len(swaps) * 1e6
+
+    print(f"generate_shoe: {build_ms:.3f} ms ({secure_ms:.3f} ms with SystemRandom)")
+    print(f"shoe memory:   {memory_kb:.1f} KiB")
+    print(f"draw:          {draw_us:.3f} µs/card")
+    print(f"reshuffle:     {swap_us:.1f} µs at the table (next shoe shuffled in the background)")
+
+
+if __name__ == "__main__":
+    bench_shoe()
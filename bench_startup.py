@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Where a cold session's start-up time goes: the slowest imports (from
+`python -X importtime`) and a timeline of `python main.py` under a PTY,
+from spawn to the first frame on the terminal, using the timestamps the
+app records (BLACKJACK_STARTUP_TIMELINE). The repo's modules are byte-compiled
+first, as a deployment should do (`python -m compileall .`).
+
+    python bench_startup.py [--runs 7] [--imports 15]
+"""
+import argparse
+import compileall
+import json
+import os
+import pty
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_zygote import session_env, wait_for_frame
+
+
+def import_times(top: int):
+    """(total ms, [(cumulative ms, self ms, module)] slowest first) for `import main`"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            capture_output=True, text=True, check=True)
+    # Each module is listed after the ones it imported, indented two spaces a level
+    direct = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == "main":
+            return int(cumulative) / 1000, sorted(direct, reverse=True)[:top]
+        if depth == 0:
+            direct = []  # imported by the interpreter, not by main
+        elif depth == 1:
+            direct.append((int(cumulative) / 1000, int(own) / 1000, name.strip()))
+    raise RuntimeError("no import time for main")
+
+
+def timed_start(env: dict, timeline_path: str):
+    """Spawn main.py on a PTY; returns {event: ms after spawn}, including the first frame seen"""
+    master, slave = pty.openpty()
+    spawned = time.monotonic()
+    spawned_perf = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], stdin=slave, stdout=slave, stderr=slave,
+                            env=env, start_new_session=True)
+    os.close(slave)
+    frame = wait_for_frame(master) - spawned_perf
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and not os.path.getsize(timeline_path):
+        os.read(master, 65536)  # keep the PTY drained while the deferred work runs
+    proc.kill()
+    proc.wait()
+    os.close(master)
+    with open(timeline_path) as f:
+        events = json.loads(f.readline())["events"]
+    open(timeline_path, "w").close()
+    times = {name: (when - spawned) * 1000 for name, when in events}
+    times["frame on terminal"] = frame * 1000
+    return times
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def timelines(runs: int) -> dict:
+    """{configuration: {event: median ms after spawn}} over `runs` cold starts.
+
+    A cold process has nothing parsed to reuse, so the in-process CSS cache
+    makes no difference here; see zygote.py and ssh_host.py for where it does.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        timeline_path = os.path.join(tmp, "timeline.jsonl")
+        open(timeline_path, "w").close()
+        env = dict(session_env(), SSH_SESSION_ID="bench-startup", BLACKJACK_STARTUP_TIMELINE=timeline_path,
+                   BLACKJACK_CACHE_DIR=os.path.join(tmp, "cache"))
+        configurations = {"cold start": env}
+        timed_start(env, timeline_path)  # warms the OS file cache
+        samples = {label: [] for label in configurations}
+        for _ in range(runs):
+            for label, config in configurations.items():
+                samples[label].append(timed_start(config, timeline_path))
+    results = {}
+    for label, starts in samples.items():
+        events = sorted(starts[0], key=lambda name: median([start[name] for start in starts]))
+        results[label] = {name: median([start[name] for start in starts]) for name in events}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Break down session start-up time")
+    parser.add_argument("--runs", type=int, default=7, help="cold starts per configuration")
+    parser.add_argument("--imports", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    # Sessions should find up-to-date .pyc files (main.py alone takes ~15 ms to
+    # compile); make sure they exist even where PYTHONDONTWRITEBYTECODE is set
+    compileall.compile_dir(os.path.dirname(os.path.abspath(__file__)), maxlevels=0, quiet=1)
+    total, slowest = import_times(args.imports)
+    print(f"import main: {total:.1f} ms (-X importtime, which inflates it somewhat)")
+    print(f"  {'cumulative':>10} {'self':>8}  module")
+    for cumulative, own, name in slowest:
+        print(f"  {cumulative:>8.1f}ms {own:>6.1f}ms  {name}")
+
+    results = timelines(args.runs)
+    names = list(results["cold start"])
+    print(f"\nstart-up timeline, median ms after spawn over {args.runs} runs")
+    print(f"  {'event':<22}" + "".join(f"{label:>14}" for label in results))
+    for name in names:
+        print(f"  {name:<22}" + "".join(f"{timeline.get(name, float('nan')):>14.1f}" for timeline in results.values()))
+    print(f"  {'imports done -> frame':<22}" + "".join(
+        f"{timeline['frame on terminal'] - timeline['imports done']:>14.1f}" for timeline in results.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the game-logic, chat and UI hot paths, with a saved JSON
+baseline to compare against.
+
+Every benchmark reports one number where lower is better (time per
+operation, or bytes), taking the best of repeated runs over at least
+half a second. Next to each timing a fixed pure-Python workload is timed
+as well, and comparisons use the ratio of the two, since the speed of a
+shared machine drifts by tens of percent between runs. A result worse
+than the baseline by more than the threshold is rerun, and reported as a
+regression (with a non-zero exit) only if it stays that slow. Baselines
+are still best saved on the machine that checks.
+
+    python bench_suite.py --save             # record a baseline
+    python bench_suite.py                    # compare against it
+    python bench_suite.py --only chat --threshold 0.3 --quick
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+from engine import Hand, generate_shoe
+
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.25  # fraction slower than the baseline that counts as a regression
+CONFIRM_RUNS = 2  # reruns of a benchmark that looks regressed before it is reported
+REPEATS = 5  # at least this many runs...
+MIN_TIME = 0.5  # ...and keep going until this many seconds have been spent
+CHAT_LOG_SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+CHAT_BURST = 100
+
+BENCHMARKS = []  # (name, unit, function returning {suffix: value} or a value)
+
+
+def benchmark(name: str, unit: str):
+    def register(fn):
+        BENCHMARKS.append((name, unit, fn))
+        return fn
+    return register
+
+
+def calibration_workload():
+    """Fixed interpreter work (arithmetic, dicts, lists) to measure the machine's speed by"""
+    counts = {}
+    items = []
+    for i in range(20_000):
+        counts[i & 63] = counts.get(i & 63, 0) + i * 3
+        items.append(i ^ 0x55)
+    items.sort()
+    return counts
+
+
+def calibrate() -> float:
+    return best_of(calibration_workload, min_time=0.2) * 1e6
+
+
+def best_of(fn, repeats=REPEATS, min_time=MIN_TIME):
+    """Fastest of repeated timed runs of fn(), in seconds"""
+    best = float("inf")
+    spent = 0.0
+    runs = 0
+    while runs < repeats or spent < min_time:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best
+
+
+@benchmark("hand.evaluate", "ns/call")
+def bench_hand_evaluate(options):
+    random.seed(1)
+    hands = []
+    for _ in range(100):
+        hand = Hand("Player")
+        for card in random.sample(range(52), random.randint(2, 4)):
+            hand.add(card)
+        hands.append(hand)
+
+    def evaluate():
+        for hand in hands:
+            hand.values()
+            hand.best_value()
+            hand.is_blackjack()
+
+    number = 20
+    seconds = best_of(lambda: timeit.timeit(evaluate, number=number))
+    return seconds / (number * len(hands) * 3) * 1e9
+
+
+@benchmark("shoe.generate", "us/shoe")
+def bench_generate_shoe(options):
+    random.seed(1)
+    rounds = 50
+    return best_of(lambda: [generate_shoe() for _ in range(rounds)]) / rounds * 1e6
+
+
+def _app(**kwargs):
+    from main import BlackjackApp
+
+    return BlackjackApp(session_id="local", username="bench", watch_chat=False, pacing="instant", **kwargs)
+
+
+@benchmark("ui.mount_first_frame", "ms")
+def bench_mount(options):
+    async def mount():
+        app = _app()
+        async with app.run_test(size=(160, 50)) as pilot:
+            await pilot.pause()
+
+    return min(_timed(mount) for _ in range(REPEATS)) * 1000
+
+
+@benchmark("ui.round", "us/round")
+def bench_round(options):
+    """deal_new_hand, the dealer loop and determine_winner on a mounted app"""
+    rounds = 200
+
+    async def run():
+        random.seed(1)
+        app = _app()
+        async with app.run_test(size=(160, 50)) as pilot:
+            await pilot.pause()
+
+            async def play():
+                for _ in range(rounds):
+                    app.deal_new_hand()  # swaps in the next shoe at the cut card
+                    app.update_totals()
+                    while app.player_hand.best_value() < 17:
+                        app.round.hit()
+                        app.show_cards(app.player_slots, app.player_hand.cards)
+                    app.reveal_dealer_cards()
+                    if not app.round.player_bust():
+                        await app.handle_dealer_turn()
+                    app.determine_winner()
+
+            best = float("inf")
+            spent = 0.0
+            runs = 0
+            while runs < REPEATS or spent < MIN_TIME:
+                start = time.perf_counter()
+                await play()
+                elapsed = time.perf_counter() - start
+                best = min(best, elapsed)
+                spent += elapsed
+                runs += 1
+            return best
+
+    return asyncio.run(run()) / rounds * 1e6
+
+
+def _chat_line(i):
+    return json.dumps({"username": f"user{i % 7}", "message": f"message number {i} " + "x" * 40,
+                       "timestamp": "2026-10-17T12:34:56Z", "session_id": "bench"}) + "\n"
+
+
+@benchmark("chat.ingest", "ms/join+burst")
+def bench_chat_ingest(options):
+    """A late joiner's backfill plus one check_for_chat_messages picking up a
+    burst, against logs of growing size: should not grow with the log"""
+    from chat_store import BACKFILL_LINES
+    from chat_tail import ChatTailReader
+
+    sizes = dict(CHAT_LOG_SIZES)
+    if options.quick:
+        sizes.pop("1M")
+    results = {}
+
+    async def run(path):
+        app = _app()
+        async with app.run_test(size=(160, 50)) as pilot:
+            await pilot.pause()
+            size = os.path.getsize(path)
+            best = float("inf")
+            spent = 0.0
+            runs = 0
+            while runs < REPEATS or spent < MIN_TIME:
+                with open(path, "a") as log:
+                    log.writelines(_chat_line(i) for i in range(CHAT_BURST))
+                start = time.perf_counter()
+                app.chat_reader.close()
+                app.chat_reader = ChatTailReader(path)
+                app.chat_reader.skip_to_last(BACKFILL_LINES + CHAT_BURST)
+                app.check_for_chat_messages()
+                elapsed = time.perf_counter() - start
+                best = min(best, elapsed)
+                spent += elapsed
+                runs += 1
+                os.truncate(path, size)  # the same log size every run
+            return best
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, lines in sizes.items():
+            path = os.path.join(tmp, f"chat-{label}.log")
+            with open(path, "w") as log:
+                chunk = 10_000
+                for base in range(0, lines, chunk):
+                    log.writelines(_chat_line(i) for i in range(base, min(base + chunk, lines)))
+            results[label] = asyncio.run(run(path)) * 1000
+            os.remove(path)
+    return results
+
+
+@benchmark("chat.display_burst", "us/message")
+def bench_chat_display(options):
+    """display_chat_message for a burst of messages, each shown as it arrives"""
+    messages = [json.loads(_chat_line(i)) for i in range(500)]
+
+    async def run():
+        app = _app()
+        async with app.run_test(size=(160, 50)) as pilot:
+            await pilot.pause()
+
+            def burst():
+                for msg in messages:
+                    app.display_chat_message(msg)
+
+            return best_of(burst)
+
+    return asyncio.run(run()) / len(messages) * 1e6
+
+
+@benchmark("ui.bytes_per_hand", "bytes/hand")
+def bench_bytes_per_hand(options):
+    """Terminal output per hand (see bench_render.py); deterministic"""
+    import bench_render
+
+    hands = 5 if options.quick else 10
+    _, per_hand = asyncio.run(bench_render.play(hands))
+    return sum(count for count, _ in per_hand) / hands
+
+
+def _timed(coroutine_fn):
+    start = time.perf_counter()
+    asyncio.run(coroutine_fn())
+    return time.perf_counter() - start
+
+
+def run_all(options, names=None) -> dict:
+    results = {}
+    for name, unit, fn in BENCHMARKS:
+        if options.only and not any(part in name for part in options.only):
+            continue
+        if names is not None and name not in names:
+            continue
+        before = calibrate()
+        value = fn(options)
+        calibration = min(before, calibrate())
+        values = value if isinstance(value, dict) else {None: value}
+        for suffix, number in values.items():
+            key = f"{name}[{suffix}]" if suffix else name
+            results[key] = {"value": round(number, 3), "unit": unit, "calibration": round(calibration, 3)}
+            print(f"  {key:<28} {number:>12.3f} {unit}", file=sys.stderr)
+    return results
+
+
+def change(result: dict, old: dict) -> float:
+    """Relative change from the baseline; timings are scaled by the machine's speed at the time"""
+    new_value, old_value = result["value"], old["value"]
+    if result["unit"].split("/")[0] in ("ns", "us", "ms") and result.get("calibration") and old.get("calibration"):
+        new_value /= result["calibration"]
+        old_value /= old["calibration"]
+    return new_value / old_value - 1 if old_value else 0.0
+
+
+def best_results(results: dict, rerun: dict) -> dict:
+    """Keep whichever of two runs of each benchmark was faster, relative to machine speed"""
+    merged = dict(results)
+    for name, result in rerun.items():
+        if name not in merged or change(result, merged[name]) < 0:
+            merged[name] = result
+    return merged
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """[(name, old, new, change)] for results worse than the baseline by more than threshold"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old or old["value"] <= 0:
+            continue
+        difference = change(result, old)
+        if difference > threshold:
+            regressions.append((name, old["value"], result["value"], difference))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths and compare with a baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default 0.25)")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="skip the 1M-line chat log")
+    parser.add_argument("--confirm", type=int, default=CONFIRM_RUNS,
+                        help="rerun apparent regressions this many times before reporting them")
+    options = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            baseline = json.load(f).get("results", {})
+
+    print("running benchmarks...", file=sys.stderr)
+    results = run_all(options)
+    for _ in range(0 if options.save else options.confirm):
+        suspects = {name.split("[")[0] for name, *_ in compare(results, baseline, options.threshold)}
+        if not suspects:
+            break
+        print(f"rerunning {', '.join(sorted(suspects))} to confirm...", file=sys.stderr)
+        results = best_results(results, run_all(options, suspects))
+    report = {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(f"{'benchmark':<28} {'baseline':>12} {'now':>12} {'change':>8}  (timings scaled by machine speed)")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old:
+            print(f"{name:<28} {old['value']:>12.3f} {result['value']:>12.3f} {change(result, old):>+7.1%}  "
+                  f"{result['unit']}")
+        else:
+            print(f"{name:<28} {'-':>12} {result['value']:>12.3f} {'new':>8}  {result['unit']}")
+
+    if options.save:
+        # Keep baselines of benchmarks that weren't run this time
+        merged = dict(baseline)
+        merged.update(results)
+        with open(options.baseline, "w") as f:
+            json.dump({**report, "results": merged}, f, indent=2)
+        print(f"baseline saved to {options.baseline}")
+        return
+
+    regressions = compare(results, baseline, options.threshold)
+    for name, old, new, difference in regressions:
+        print(f"REGRESSION {name}: {old:.3f} -> {new:.3f} ({difference:+.1%} allowing for machine speed, "
+              f"threshold {options.threshold:.0%})")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
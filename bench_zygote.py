@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-frame for a cold `python main.py` against a fork from the
+zygote. Start the zygote first:  python zygote.py &
+"""
+import json
+import os
+import pty
+import select
+import socket
+import subprocess
+import sys
+import time
+
+from zygote import DEFAULT_SOCKET
+
+FIRST_FRAME_MARKER = b"Deal"
+
+
+def wait_for_frame(master_fd, timeout=30.0):
+    """Read terminal output until the Deal button has been drawn"""
+    seen = b""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        ready, _, _ = select.select([master_fd], [], [], 0.1)
+        if ready:
+            try:
+                seen += os.read(master_fd, 65536)
+            except OSError:
+                break
+            if FIRST_FRAME_MARKER in seen:
+                return time.perf_counter()
+    raise TimeoutError("no frame drawn")
+
+
+def session_env():
+    env = dict(os.environ, TERM="xterm-256color", SSH_SESSION_ID="local", SSH_USERNAME="bench")
+    return env
+
+
+def cold_start():
+    master, slave = pty.openpty()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], stdin=slave, stdout=slave, stderr=slave,
+                            env=session_env(), start_new_session=True)
+    os.close(slave)
+    elapsed = wait_for_frame(master) - start
+    proc.kill()
+    proc.wait()
+    os.close(master)
+    return elapsed
+
+
+def zygote_start(path):
+    master, slave = pty.openpty()
+    start = time.perf_counter()
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    conn.connect(path)
+    socket.send_fds(conn, [json.dumps({"env": session_env()}).encode()], [slave])
+    os.close(slave)
+    elapsed = wait_for_frame(master) - start
+    conn.close()  # hangs up the session
+    os.close(master)
+    return elapsed
+
+
+def bench_zygote(runs=5, path=DEFAULT_SOCKET):
+    cold = sorted(cold_start() for _ in range(runs))
+    print(f"cold start:  median {cold[runs // 2] * 1000:.0f} ms")
+    if os.path.exists(path):
+        forked = sorted(zygote_start(path) for _ in range(runs))
+        print(f"zygote fork: median {forked[runs // 2] * 1000:.0f} ms")
+    else:
+        print(f"zygote not running on {path}")
+
+
+if __name__ == "__main__":
+    bench_zygote()
@@ -0,0 +1,197 @@
+"""Shared-memory ring of recent chat messages for sessions on one host.
+
+One writer (the chat relay) parses each message once and copies its fields
+into a fixed-size slot of a memory-mapped file; every session keeps its own
+cursor and reads the slots it hasn't seen. Fields are decoded straight out
+of the mapping, once per process however many sessions it hosts, so N
+sessions cost one parse instead of N and no file reads at all.
+
+Layout (little-endian):
+    header  magic "BJCR", version u32, slot count u32, slot size u32, last seq u64
+    slot    seq u64, username len u16, timestamp len u16, message len u16,
+            then the three UTF-8 fields back to back
+
+Message n lives in slot n % count. The writer clears the slot's seq, writes
+the fields, then stores the seq and finally the header's last seq. A reader
+checks the slot seq before and after decoding, so a slot reused under it
+(the reader was lapped) is detected and skipped rather than shown torn.
+Readers that fall more than a ring behind skip to the oldest message still
+held and are told how many they missed.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+
+MAGIC = b"BJCR"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIQ")
+SLOT_HEADER = struct.Struct("<QHHH")
+LAST_SEQ = struct.Struct("<Q")
+LAST_SEQ_OFFSET = HEADER.size - LAST_SEQ.size
+DEFAULT_SLOTS = 4096
+DEFAULT_SLOT_SIZE = 512
+
+
+def default_path() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else "/tmp"
+    return os.getenv("BLACKJACK_CHAT_RING", os.path.join(directory, "ssh-blackjack-chat.ring"))
+
+
+def _fit(text: str, room: int) -> bytes:
+    """UTF-8 encode, cutting at a character boundary to fit the room left"""
+    data = text.encode("utf-8")
+    if len(data) > room:
+        data = data[:room].decode("utf-8", errors="ignore").encode("utf-8")
+    return data
+
+
+class ChatRing:
+    """The single writer"""
+
+    def __init__(self, path: str, slots: int = DEFAULT_SLOTS, slot_size: int = DEFAULT_SLOT_SIZE):
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        size = HEADER.size + slots * slot_size
+        # Publish a fully initialised, empty ring in one step
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w+b") as f:
+            f.truncate(size)
+            self._map = mmap.mmap(f.fileno(), size)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, slots, slot_size, 0)
+        os.replace(tmp_path, path)
+        self.last_seq = 0
+
+    def append(self, username: str, timestamp: str, message: str) -> int:
+        room = self.slot_size - SLOT_HEADER.size
+        user = _fit(username, min(room, 64))
+        stamp = _fit(timestamp, min(room - len(user), 40))
+        text = _fit(message, room - len(user) - len(stamp))
+
+        seq = self.last_seq + 1
+        offset = HEADER.size + (seq % self.slots) * self.slot_size
+        buf = self._map
+        SLOT_HEADER.pack_into(buf, offset, 0, 0, 0, 0)
+        start = offset + SLOT_HEADER.size
+        end = start + len(user) + len(stamp) + len(text)
+        buf[start:end] = user + stamp + text
+        SLOT_HEADER.pack_into(buf, offset, seq, len(user), len(stamp), len(text))
+        LAST_SEQ.pack_into(buf, LAST_SEQ_OFFSET, seq)
+        self.last_seq = seq
+        return seq
+
+    def close(self):
+        self._map.close()
+
+
+class _Mapping:
+    """One read-only mapping of a ring per process, shared by its readers.
+
+    Slots are decoded at most once per process: a published slot never
+    changes until the writer reuses it for a later seq, so the decoded
+    fields can be kept by seq for every reader in the process.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.inode = (st.st_dev, st.st_ino)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slots, self.slot_size, _ = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a chat ring")
+        self.view = memoryview(self.map)
+        self.decoded = {}  # seq -> (username bytes, username, timestamp, message)
+        self.users = 0
+
+    def record(self, seq: int):
+        """Decoded fields of message `seq`, or None if its slot has been reused"""
+        record = self.decoded.get(seq)
+        if record is not None:
+            return record
+        view = self.view
+        offset = HEADER.size + (seq % self.slots) * self.slot_size
+        slot_seq, user_len, stamp_len, text_len = SLOT_HEADER.unpack_from(view, offset)
+        if slot_seq != seq:
+            return None
+        start = offset + SLOT_HEADER.size
+        body = bytes(view[start:start + user_len + stamp_len + text_len])
+        if SLOT_HEADER.unpack_from(view, offset)[0] != seq:
+            return None  # overwritten while we read it
+        # The copy is settled now; "replace" still guards against a torn header
+        user = body[:user_len]
+        record = (
+            user,
+            user.decode("utf-8", "replace"),
+            body[user_len:user_len + stamp_len].decode("utf-8", "replace"),
+            body[user_len + stamp_len:].decode("utf-8", "replace"),
+        )
+        self.decoded[seq] = record
+        self.decoded.pop(seq - self.slots, None)
+        return record
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+
+
+_mappings = {}
+
+
+class RingReader:
+    """One session's cursor into a ChatRing"""
+
+    def __init__(self, path: str):
+        mapping = _mappings.get(path)
+        if mapping is not None:
+            st = os.stat(path)
+            if mapping.inode != (st.st_dev, st.st_ino):
+                mapping = None  # the ring was recreated
+        if mapping is None:
+            mapping = _mappings[path] = _Mapping(path)
+        mapping.users += 1
+        self.path = path
+        self._mapping = mapping
+        self.slots = mapping.slots
+        self.next_seq = self.last_seq() + 1
+
+    def last_seq(self) -> int:
+        return LAST_SEQ.unpack_from(self._mapping.map, LAST_SEQ_OFFSET)[0]
+
+    def backfill(self, count: int):
+        """Rewind so the next read also returns up to `count` recent messages"""
+        self.next_seq = max(1, self.last_seq() - min(count, self.slots - 1) + 1)
+
+    def read(self, skip_user: bytes = None) -> tuple[list, int]:
+        """Return ([(username, timestamp, message), ...], messages missed).
+
+        Messages from `skip_user` are left out.
+        """
+        last = self.last_seq()
+        missed = 0
+        oldest = last - self.slots + 2  # the slot after `last` may be mid-write
+        if self.next_seq < oldest:
+            missed = oldest - self.next_seq
+            self.next_seq = oldest
+
+        record_for = self._mapping.record
+        records = []
+        for seq in range(self.next_seq, last + 1):
+            record = record_for(seq)
+            if record is None:
+                missed += 1
+            elif record[0] != skip_user:
+                records.append(record[1:])
+        self.next_seq = last + 1
+        return records, missed
+
+    def close(self):
+        mapping = self._mapping
+        mapping.users -= 1
+        if mapping.users == 0:
+            mapping.close()
+            if _mappings.get(self.path) is mapping:
+                del _mappings[self.path]
@@ -0,0 +1,263 @@
+"""Segmented chat history with an index, so late joiners backfill cheaply.
+
+The file sessions tail (/tmp/ssh-chat/ssh-chat.log) is the active segment. It
+sits in a directory of its own, so sessions watching that directory for the
+log to be recreated aren't woken by everything else created in /tmp. Once it
+passes a size or age limit, the relay renames it aside and moves it into
+the segment directory as segment-<seq>.log (copied, if that directory is on
+another filesystem), then appends an entry to index.jsonl there; readers
+notice the new inode, drain the old file and follow the new one. A
+background thread gzips sealed segments and drops the oldest beyond a limit,
+rewriting the index to match.
+
+A new session doesn't read history from the top. It seeks backwards from the
+end of the active segment for its last N lines, and only when that comes up
+short does it open the newest sealed segments the index lists. Connect cost
+therefore depends on N, not on how long the server has been up. backfill()
+takes the active segment and the index as one snapshot: if a segment was
+being sealed meanwhile it looks again, so no line is shown twice or missed.
+
+Index entries are JSON lines; the last entry for a sequence number wins:
+    {"seq": 3, "file": "segment-000003.log", "messages": 812, "bytes": 262190, "sealed": 1792249507.7}
+    {"seq": 3, "file": "segment-000003.log.gz"}
+    {"seq": 3, "file": null}
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+from chat_tail import tail_offset
+
+CHAT_LOG_DIR = "/tmp/ssh-chat"
+CHAT_FILE = os.path.join(CHAT_LOG_DIR, "ssh-chat.log")
+SEGMENT_DIR = "/tmp/ssh-chat.d"
+INDEX_NAME = "index.jsonl"
+SEGMENT_BYTES = 256 * 1024
+SEGMENT_SECONDS = 3600
+MAX_SEGMENTS = 64
+BACKFILL_LINES = 50
+SNAPSHOT_TRIES = 5  # looks at the log before backfilling from a possibly torn snapshot
+
+_SEGMENT_NAME = re.compile(r"segment-(\d+)\.log(\.gz)?$")
+
+
+def default_directory() -> str:
+    return os.getenv("BLACKJACK_CHAT_DIR", SEGMENT_DIR)
+
+
+def read_index(directory: str) -> dict:
+    """seq -> latest index entry, for segments that still exist"""
+    entries = {}
+    try:
+        with open(os.path.join(directory, INDEX_NAME)) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                merged = entries.get(entry["seq"], {})
+                merged.update(entry)
+                entries[entry["seq"]] = merged
+    except OSError:
+        pass
+    return {seq: entry for seq, entry in entries.items() if entry.get("file")}
+
+
+def history(lines: int, directory: str = None, entries: dict = None) -> list[str]:
+    """The last `lines` messages held in sealed segments, oldest first.
+
+    `entries` is an index already read (see backfill); by default the
+    index is read now.
+    """
+    directory = directory or default_directory()
+    if entries is None:
+        entries = read_index(directory)
+    collected = []
+    for seq, entry in sorted(entries.items(), reverse=True):
+        if lines <= 0:
+            break
+        data = _read_segment(os.path.join(directory, entry["file"]), lines)
+        if data is None:
+            continue
+        segment = [line.decode("utf-8", errors="replace") for line in data.split(b"\n") if line]
+        segment = segment[-lines:]
+        collected[:0] = segment
+        lines -= len(segment)
+    return collected
+
+
+def _read_segment(path: str, lines: int):
+    """Bytes holding a segment's last `lines` lines, or None if it is gone.
+
+    A segment gzipped since the index was read is read from its .gz.
+    """
+    for candidate in (path, f"{path}.gz") if not path.endswith(".gz") else (path,):
+        opener = gzip.open if candidate.endswith(".gz") else open
+        try:
+            with opener(candidate, "rb") as f:
+                if opener is open:
+                    f.seek(tail_offset(f, lines)[0])
+                return f.read()
+        except OSError:
+            continue
+    return None
+
+
+def backfill(reader, lines: int, directory: str = None) -> list[str]:
+    """Start a ChatTailReader at the last `lines` messages; returns those from sealed segments.
+
+    The reader takes what is in the active segment. The index read for the
+    rest must be from the same moment: it may not yet list a segment sealed
+    just before the reader opened its file, or may already list the file the
+    reader holds. Either shows on disk as the active path no longer being
+    the reader's file, a segment half moved (.sealing), or a segment file
+    the index doesn't have; then everything is looked at again.
+    """
+    directory = directory or default_directory()
+    for _ in range(SNAPSHOT_TRIES):
+        reader.close()
+        found = reader.skip_to_last(lines)
+        entries = read_index(directory)
+        if _snapshot_holds(reader, directory, entries):
+            break
+        time.sleep(0.01)
+    if found >= lines:
+        return []
+    return history(lines - found, directory, entries)
+
+
+def _snapshot_holds(reader, directory: str, entries: dict) -> bool:
+    try:
+        st = os.stat(reader.path)
+        active = (st.st_dev, st.st_ino)
+    except FileNotFoundError:
+        active = None
+    if active != reader.inode or os.path.exists(f"{reader.path}.sealing"):
+        return False
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return True
+    on_disk = {int(m.group(1)) for m in map(_SEGMENT_NAME.match, names) if m}
+    return on_disk <= set(entries)
+
+
+class ChatStore:
+    """Writer side of the chat log: appends, seals segments and compacts them.
+
+    Exactly one process should write through a ChatStore (the chat relay).
+    Under the Go server, main.go's rotateChatLog seals segments the same way.
+    """
+
+    def __init__(self, path: str = CHAT_FILE, directory: str = None,
+                 segment_bytes: int = SEGMENT_BYTES, segment_seconds: float = SEGMENT_SECONDS,
+                 max_segments: int = MAX_SEGMENTS):
+        self.path = path
+        self.directory = directory or default_directory()
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.started = None  # when the active segment got its first line
+        self.messages = 0  # lines in the active segment
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    self.messages += chunk.count(b"\n")
+        except FileNotFoundError:
+            pass
+        self._compactor = None
+        self._lock = threading.Lock()  # one compaction / index rewrite at a time
+        os.makedirs(self.directory, exist_ok=True)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def append(self, lines: list[str]):
+        if not lines:
+            return
+        with open(self.path, "a") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+            size = f.tell()
+        self.messages += len(lines)
+        now = time.time()
+        if self.started is None:
+            self.started = now
+        if size >= self.segment_bytes or now - self.started >= self.segment_seconds:
+            self.rotate()
+
+    def next_seq(self) -> int:
+        seqs = [int(m.group(1)) for m in map(_SEGMENT_NAME.match, os.listdir(self.directory)) if m]
+        return max(seqs, default=0) + 1
+
+    def rotate(self):
+        """Seal the active segment and start a new, empty one"""
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return
+        if not size:
+            return
+        seq = self.next_seq()
+        name = f"segment-{seq:06d}.log"
+        target = os.path.join(self.directory, name)
+        # Renaming within the active segment's own directory is atomic for its
+        # readers and writers; the move may then copy across filesystems
+        sealing = f"{self.path}.sealing"
+        os.replace(self.path, sealing)
+        messages, self.messages = self.messages, 0
+        self.started = None
+        shutil.move(sealing, target)
+        self._append_index({"seq": seq, "file": name, "messages": messages,
+                            "bytes": size, "sealed": round(time.time(), 3)})
+        self.compact_in_background()
+
+    def compact_in_background(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self.compact, name="chat-compactor", daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        """Gzip sealed segments, drop the oldest over the limit and rewrite the index"""
+        with self._lock:
+            entries = read_index(self.directory)
+            seqs = sorted(entries)
+            for seq in seqs[:max(0, len(seqs) - self.max_segments)]:
+                try:
+                    os.remove(os.path.join(self.directory, entries.pop(seq)["file"]))
+                except OSError:
+                    pass
+
+            for seq, entry in entries.items():
+                if entry["file"].endswith(".gz"):
+                    continue
+                source = os.path.join(self.directory, entry["file"])
+                target = f"{source}.gz"
+                try:
+                    with open(source, "rb") as src, gzip.open(f"{target}.tmp", "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.replace(f"{target}.tmp", target)
+                except OSError:
+                    continue
+                entry["file"] += ".gz"
+                os.remove(source)
+
+            tmp_path = os.path.join(self.directory, f"{INDEX_NAME}.tmp")
+            with open(tmp_path, "w") as f:
+                for seq in sorted(entries):
+                    f.write(json.dumps(entries[seq]) + "\n")
+            os.replace(tmp_path, os.path.join(self.directory, INDEX_NAME))
+
+    def wait(self):
+        """Block until any running compaction has finished"""
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def _append_index(self, entry: dict):
+        with self._lock:
+            with open(os.path.join(self.directory, INDEX_NAME), "a") as f:
+                f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,125 @@
+"""Incremental tail reader for the shared chat log"""
+from __future__ import annotations
+
+import os
+
+
+def tail_offset(f, lines: int, block: int = 8192) -> tuple[int, int]:
+    """Find where the last `lines` complete lines of a binary file start.
+
+    Reads backwards a block at a time. A trailing partial line is not
+    counted. Returns (offset, complete lines found after it).
+    """
+    end = f.seek(0, os.SEEK_END)
+    if lines <= 0:
+        return end, 0
+    pos = end
+    newlines = 0
+    while pos > 0:
+        size = min(block, pos)
+        pos -= size
+        f.seek(pos)
+        chunk = f.read(size)
+        index = len(chunk)
+        while True:
+            index = chunk.rfind(b"\n", 0, index)
+            if index < 0:
+                break
+            newlines += 1
+            if newlines == lines + 1:
+                return pos + index + 1, lines
+    # Fewer newlines than asked for: everything from the top
+    return 0, newlines
+
+
+class ChatTailReader:
+    """Follow a growing log file and return only the lines appended since the last read.
+
+    The file is kept open and its byte offset and inode are remembered, so each
+    read costs time proportional to the new data rather than the whole history.
+    Partial lines are buffered until their newline arrives. If the file is
+    truncated the reader starts again from the top; if it is rotated (the path
+    now points at a different inode) the old file is drained before switching.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._file = None
+        self._inode = None
+        self._partial = b""
+
+    def _open(self) -> bool:
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return False
+        st = os.fstat(f.fileno())
+        self._file = f
+        self._inode = (st.st_dev, st.st_ino)
+        self.offset = 0
+        self._partial = b""
+        return True
+
+    @property
+    def inode(self):
+        """(st_dev, st_ino) of the file being followed, or None before it is opened"""
+        return self._inode
+
+    def skip_to_last(self, lines: int) -> int:
+        """Start from the last `lines` complete lines instead of the top of the file.
+
+        Returns how many lines that covers; fewer when the file is shorter.
+        """
+        if self._file is None and not self._open():
+            return 0
+        self.offset, found = tail_offset(self._file, lines)
+        self._partial = b""
+        return found
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._inode = None
+
+    def _drain(self) -> list[str]:
+        """Read everything between the saved offset and EOF, splitting complete lines"""
+        self._file.seek(self.offset)
+        data = self._file.read()
+        if not data:
+            return []
+        self.offset += len(data)
+
+        chunks = (self._partial + data).split(b"\n")
+        self._partial = chunks.pop()
+        return [chunk.decode("utf-8", errors="replace") for chunk in chunks]
+
+    def read_lines(self) -> list[str]:
+        """Return the complete lines appended since the previous call"""
+        if self._file is None and not self._open():
+            return []
+
+        try:
+            st = os.stat(self.path)
+            current = (st.st_dev, st.st_ino)
+        except OSError:
+            # Removed but not yet recreated: keep following the old file
+            current = self._inode
+
+        if current != self._inode:
+            # Rotated: pick up the last writes to the old file, then follow the new one
+            lines = self._drain()
+            self.close()
+            if self._open():
+                lines.extend(self._drain())
+            return lines
+
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.offset:
+            # Truncated in place: everything we had is gone, start over
+            self.offset = 0
+            self._partial = b""
+        if size == self.offset:
+            return []
+        return self._drain()
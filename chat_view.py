@@ -0,0 +1,51 @@
+"""Bounded chat history feeding the chat log widget"""
+from collections import deque
+from datetime import datetime
+
+from rich.text import Text
+
+DEFAULT_MAX_LINES = 200
+
+
+def format_chat_time(timestamp: str) -> str:
+    """Return HH:MM:SS for a chat timestamp.
+
+    Timestamps are ISO-8601 strings from Python (`isoformat()`) or Go
+    (`time.Time` JSON, with up to nanosecond precision). The clock time is
+    shown as written, so it is sliced out rather than parsed.
+    """
+    if not timestamp:
+        return datetime.now().strftime("%H:%M:%S")
+    if len(timestamp) >= 19 and timestamp[10] in "T " and timestamp[13] == ":" and timestamp[16] == ":":
+        return timestamp[11:19]
+    return ""
+
+
+class ChatBuffer:
+    """Fixed-capacity ring of formatted chat lines rendered into a Static widget.
+
+    Appending only touches the ring; the widget is updated once per `flush()`,
+    so a burst of messages costs a single re-render and memory stays bounded
+    however long the session runs.
+    """
+
+    def __init__(self, widget, max_lines: int = DEFAULT_MAX_LINES):
+        self.widget = widget
+        self.lines = deque(maxlen=max_lines)
+        self.dirty = False
+
+    def append(self, line: str):
+        self.lines.append(line)
+        self.dirty = True
+
+    def append_message(self, msg: dict):
+        self.append_chat(msg.get("username", "Unknown"), msg.get("timestamp", ""), msg.get("message", ""))
+
+    def append_chat(self, username: str, timestamp: str, message: str):
+        self.append(f"[{format_chat_time(timestamp)}] {username}: {message}")
+
+    def flush(self):
+        if self.dirty:
+            # Plain Text so chat content is never interpreted as markup
+            self.widget.update(Text("\n".join(self.lines)))
+            self.dirty = False
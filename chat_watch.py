@@ -0,0 +1,125 @@
+"""Push notification of chat log writes using inotify on the asyncio event loop"""
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+FILE_EVENTS = IN_MODIFY | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF
+DIR_EVENTS = IN_CREATE | IN_MOVED_TO
+
+EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+
+
+def _load_libc():
+    """Return libc with the inotify calls available, or None on platforms without them"""
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1
+            libc.inotify_add_watch
+        except (OSError, AttributeError):
+            libc = False
+        _libc = libc
+    return _libc or None
+
+
+class ChatFileWatcher:
+    """Invoke a callback on the event loop whenever the watched file is written.
+
+    The file itself is watched for writes so unrelated activity in its directory
+    doesn't wake the session; the directory is watched only for the file being
+    created or renamed into place, so the watch survives removal and rotation.
+    Every file created in that directory still wakes the watcher, so the file
+    should have a directory of its own rather than sit in /tmp. Nothing runs
+    between events, which keeps idle sessions at zero CPU.
+    """
+
+    def __init__(self, path: str, callback):
+        self.path = path
+        self.callback = callback
+        self._name = os.path.basename(path).encode()
+        self._fd = None
+        self._file_wd = None
+        self._dir_wd = None
+        self._loop = None
+
+    def start(self) -> bool:
+        """Begin watching; returns False if inotify isn't available here"""
+        libc = _load_libc()
+        if libc is None:
+            return False
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)  # may start before the writer
+        except OSError:
+            pass
+        dir_wd = libc.inotify_add_watch(fd, directory.encode(), DIR_EVENTS)
+        if dir_wd < 0:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        self._dir_wd = dir_wd
+        self._watch_file()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._on_readable)
+        return True
+
+    def stop(self):
+        if self._fd is None:
+            return
+        self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        self._file_wd = None
+        self._dir_wd = None
+
+    def _watch_file(self):
+        wd = _load_libc().inotify_add_watch(self._fd, self.path.encode(), FILE_EVENTS)
+        self._file_wd = wd if wd >= 0 else None
+
+    def _on_readable(self):
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            pos = 0
+            while pos < len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, pos)
+                name = data[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b"\0")
+                pos += EVENT_HEADER.size + length
+
+                if wd == self._file_wd:
+                    changed = True
+                    if mask & IN_IGNORED:
+                        self._file_wd = None
+                elif wd == self._dir_wd and name == self._name:
+                    changed = True
+                    self._watch_file()
+
+        if changed:
+            self.callback()
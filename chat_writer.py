@@ -0,0 +1,146 @@
+"""Append chat lines to a file without blocking the event loop.
+
+Callers queue a line and return immediately; one background task per file
+collects whatever arrives within a short window and hands the batch to a
+thread as a single write and flush on a long-lived handle. The queue is
+bounded: a full queue drops the line and says so, rather than letting a
+slow disk grow memory or stall the session.
+
+Sessions in one process share a writer, so its own counters are totals
+for the process. A session that wants its own passes a ChatWriteCounts
+with each line, and it is counted there as well.
+"""
+import asyncio
+import os
+
+import debuglog
+
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_WINDOW = 0.005  # seconds to wait for more lines before writing a batch
+DELAY_WARNING = 0.25    # queued longer than this counts as delayed
+
+_writers = {}
+
+
+class ChatWriteCounts:
+    """What happened to the lines queued by one session, or by everyone on a writer"""
+
+    def __init__(self):
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.delayed = 0
+        self.errors = 0
+        self.max_delay = 0.0
+
+    def report(self) -> str:
+        return (f"{self.written} lines in {self.batches} writes, {self.dropped} dropped, "
+                f"{self.delayed} delayed (max {self.max_delay * 1000:.0f} ms), {self.errors} errors")
+
+
+class ChatWriter(ChatWriteCounts):
+    def __init__(self, path: str, maxsize: int = DEFAULT_QUEUE_SIZE, window: float = DEFAULT_WINDOW):
+        super().__init__()
+        self.path = path
+        self.maxsize = maxsize
+        self.window = window
+        self.queue = None
+        self.task = None
+        self.loop = None
+        self._file = None
+        self._inode = None
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.maxsize)
+        self.task = self.loop.create_task(self._run())
+
+    def submit(self, line: str, counts: ChatWriteCounts = None) -> bool:
+        """Queue a line for writing; returns False (and counts it) if the queue is full"""
+        try:
+            self.queue.put_nowait((line, self.loop.time(), counts))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if counts is not None:
+                counts.dropped += 1
+            return False
+        return True
+
+    async def write(self, line: str, counts: ChatWriteCounts = None):
+        """Queue a line, waiting for room instead of dropping it"""
+        await self.queue.put((line, self.loop.time(), counts))
+
+    async def drain(self):
+        """Wait until everything queued so far is on disk"""
+        await self.queue.join()
+
+    async def close(self):
+        await self.drain()
+        self.task.cancel()
+        if self._file is not None:
+            await self.loop.run_in_executor(None, self._file.close)
+            self._file = None
+
+    async def _run(self):
+        queue = self.queue
+        while True:
+            batch = [await queue.get()]
+            if self.window:
+                await asyncio.sleep(self.window)
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            data = "".join(f"{line}\n" for line, _, _ in batch)
+            # The writer's totals, plus each session's own counts for its lines
+            lines = {self: len(batch)}
+            for _, _, counts in batch:
+                if counts is not None:
+                    lines[counts] = lines.get(counts, 0) + 1
+            try:
+                await self.loop.run_in_executor(None, self._write, data)
+                for counts, written in lines.items():
+                    counts.written += written
+                    counts.batches += 1
+            except Exception as error:
+                # Count and log it; ending the task here would leave drain() waiting forever
+                for counts in lines:
+                    counts.errors += 1
+                debuglog.warning("chat.write_failed", path=self.path, lines=len(batch), error=repr(error))
+            finally:
+                now = self.loop.time()
+                for _, queued, counts in batch:
+                    delay = now - queued
+                    for target in (self, counts) if counts is not None else (self,):
+                        if delay > DELAY_WARNING:
+                            target.delayed += 1
+                        target.max_delay = max(target.max_delay, delay)
+                    queue.task_done()
+
+    def _write(self, data: str):
+        # Reopen if the file was removed or rotated under the open handle
+        try:
+            st = os.stat(self.path)
+            inode = (st.st_dev, st.st_ino)
+        except FileNotFoundError:
+            inode = None
+        if self._file is None or inode != self._inode:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.path, "a")
+            st = os.fstat(self._file.fileno())
+            self._inode = (st.st_dev, st.st_ino)
+        self._file.write(data)
+        self._file.flush()
+
+
+def shared_writer(path: str) -> ChatWriter:
+    """The writer for `path` on the running loop, started on first use.
+
+    Sessions hosted in one process share it, so their lines are batched together.
+    """
+    loop = asyncio.get_running_loop()
+    writer = _writers.get(path)
+    if writer is None or writer.loop is not loop or writer.task.done():
+        writer = _writers[path] = ChatWriter(path)
+        writer.start()
+    return writer
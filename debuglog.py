@@ -0,0 +1,117 @@
+"""Structured debug logging that costs nothing unless switched on.
+
+Set BLACKJACK_DEBUG to a level (debug, info, warning, error; "1" means
+debug) to record events at that level and above. Records go into an
+in-memory ring of the last BLACKJACK_DEBUG_LINES events and are only
+formatted when the ring is dumped: at exit, on SIGUSR1, or by calling
+dump(). The dump is written as JSON lines to BLACKJACK_DEBUG_FILE
+(default /tmp/ssh-blackjack-debug-<pid>.jsonl).
+
+With debugging off, debug() and friends are bound to a function that does
+nothing, so a call site pays for one call and never formats or writes.
+Call them through the module (debuglog.debug(...)) so configure() can
+rebind them.
+"""
+import atexit
+import json
+import os
+import signal
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {"1": DEBUG, "debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+DEFAULT_LINES = 2000
+
+level = None  # None when disabled
+ring = deque(maxlen=DEFAULT_LINES)
+_installed = False
+
+
+def _noop(event, **fields):
+    pass
+
+
+def _recorder(record_level):
+    def record(event, **fields):
+        ring.append((time.time(), record_level, event, fields))
+    return record
+
+
+debug = info = warning = error = _noop
+
+
+def configure(env=None):
+    """(Re)read the environment and rebind the logging functions"""
+    global level, ring, debug, info, warning, error
+    env = os.environ if env is None else env
+    level = LEVELS.get(env.get("BLACKJACK_DEBUG", "").lower())
+    debug = info = warning = error = _noop
+    if level is None:
+        return
+
+    lines = int(env.get("BLACKJACK_DEBUG_LINES", DEFAULT_LINES))
+    if ring.maxlen != lines:
+        ring = deque(ring, maxlen=lines)
+    if level <= DEBUG:
+        debug = _recorder(DEBUG)
+    if level <= INFO:
+        info = _recorder(INFO)
+    if level <= WARNING:
+        warning = _recorder(WARNING)
+    error = _recorder(ERROR)
+    _install()
+
+
+def enabled(at: int = DEBUG) -> bool:
+    """For call sites that would do real work just to build their fields"""
+    return level is not None and level <= at
+
+
+def dump_path() -> str:
+    return os.getenv("BLACKJACK_DEBUG_FILE", f"/tmp/ssh-blackjack-debug-{os.getpid()}.jsonl")
+
+
+def dump(path: str = None) -> str:
+    """Write the ring to disk as JSON lines and return the path"""
+    path = path or dump_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        for when, record_level, event, fields in list(ring):
+            record = {"time": round(when, 6), "level": LEVEL_NAMES[record_level], "event": event}
+            record.update(fields)
+            f.write(json.dumps(record, default=str) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def dump_if_enabled():
+    """For processes that leave through os._exit, which skips atexit"""
+    if level is not None:
+        _dump_quietly()
+
+
+def _dump_quietly(*_):
+    try:
+        dump()
+    except OSError:
+        pass
+
+
+def _install():
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    atexit.register(_dump_quietly)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, _dump_quietly)
+
+
+configure()
@@ -69,6 +69,23 @@ cp main.py "$INSTALL_DIR/"
 cp go.mod "$INSTALL_DIR/"
 cp go.sum "$INSTALL_DIR/"
 cp button.tcss "$INSTALL_DIR/"
+cp chat_tail.py "$INSTALL_DIR/"
+cp chat_watch.py "$INSTALL_DIR/"
+cp chat_view.py "$INSTALL_DIR/"
+cp engine.py "$INSTALL_DIR/"
+cp strategy.py "$INSTALL_DIR/"
+cp live_ev.py "$INSTALL_DIR/"
+cp zygote.py "$INSTALL_DIR/"
+cp ssh_host.py "$INSTALL_DIR/"
+cp chat_writer.py "$INSTALL_DIR/"
+cp debuglog.py "$INSTALL_DIR/"
+cp chat_store.py "$INSTALL_DIR/"
+cp chat_ring.py "$INSTALL_DIR/"
+cp compact.tcss "$INSTALL_DIR/"
+cp table.py "$INSTALL_DIR/"
+cp stats_store.py "$INSTALL_DIR/"
+cp profiling.py "$INSTALL_DIR/"
+cp frame_cap.py "$INSTALL_DIR/"
 chown -R "$SERVICE_USER:$SERVICE_USER" "$INSTALL_DIR"
 
 # Update port to 22
@@ -112,6 +129,8 @@ AmbientCapabilities=CAP_NET_BIND_SERVICE
 
 # Environment
 Environment=PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin
+# Stats database, strategy tables and host key: ~/.cache is off limits under ProtectHome
+Environment=BLACKJACK_CACHE_DIR=$INSTALL_DIR/cache
 
 [Install]
 WantedBy=multi-user.target
@@ -43,6 +43,23 @@ cp main.py "$INSTALL_DIR/"
 cp go.mod "$INSTALL_DIR/"
 cp go.sum "$INSTALL_DIR/"
 cp button.tcss "$INSTALL_DIR/"
+cp chat_tail.py "$INSTALL_DIR/"
+cp chat_watch.py "$INSTALL_DIR/"
+cp chat_view.py "$INSTALL_DIR/"
+cp engine.py "$INSTALL_DIR/"
+cp strategy.py "$INSTALL_DIR/"
+cp live_ev.py "$INSTALL_DIR/"
+cp zygote.py "$INSTALL_DIR/"
+cp ssh_host.py "$INSTALL_DIR/"
+cp chat_writer.py "$INSTALL_DIR/"
+cp debuglog.py "$INSTALL_DIR/"
+cp chat_store.py "$INSTALL_DIR/"
+cp chat_ring.py "$INSTALL_DIR/"
+cp compact.tcss "$INSTALL_DIR/"
+cp table.py "$INSTALL_DIR/"
+cp stats_store.py "$INSTALL_DIR/"
+cp profiling.py "$INSTALL_DIR/"
+cp frame_cap.py "$INSTALL_DIR/"
 chown -R "$SERVICE_USER:$SERVICE_USER" "$INSTALL_DIR"
 
 # Set up Python virtual environment
@@ -69,6 +86,7 @@ echo "✅ Opened port $PORT/tcp"
 echo "⚙️  Installing systemd service..."
 cp ssh-blackjack.service /etc/systemd/system/
 sed -i "s|WorkingDirectory=.*|WorkingDirectory=$INSTALL_DIR|g" /etc/systemd/system/ssh-blackjack.service
+sed -i "s|BLACKJACK_CACHE_DIR=.*|BLACKJACK_CACHE_DIR=$INSTALL_DIR/cache|g" /etc/systemd/system/ssh-blackjack.service
 sed -i "s|User=.*|User=$SERVICE_USER|g" /etc/systemd/system/ssh-blackjack.service
 sed -i "s|Group=.*|Group=$SERVICE_USER|g" /etc/systemd/system/ssh-blackjack.service
 
@@ -0,0 +1,267 @@
+"""Headless blackjack rules: cards, hands, shoes and a step-by-step round.
+
+Nothing here touches Textual, so the same rules drive the UI, tests,
+simulations and bots.
+"""
+from __future__ import annotations
+
+import random
+import threading
+from array import array
+
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+SUITS = ["♠", "♥", "♦", "♣"]
+
+DEFAULT_DECKS = 6
+
+# Cards are encoded as rank_index * 4 + suit_index; the cut card gets its own code
+BREAK = 0xFF
+
+# Round outcomes, from the player's point of view
+PLAYER_BLACKJACK = "player_blackjack"
+PLAYER_BUST = "player_bust"
+DEALER_BUST = "dealer_bust"
+PLAYER_WIN = "player_win"
+DEALER_WIN = "dealer_win"
+PUSH = "push"
+
+
+def payout(outcome: str, bet: int) -> int:
+    """Chips won (or lost, negative) on a bet; a natural pays 3:2, rounded down"""
+    if outcome == PLAYER_BLACKJACK:
+        return bet * 3 // 2
+    if outcome in (PLAYER_WIN, DEALER_BUST):
+        return bet
+    if outcome == PUSH:
+        return 0
+    return -bet
+
+
+def card_rank(code: int) -> str:
+    return RANKS[code >> 2]
+
+
+def card_label(code: int) -> str:
+    return f"{RANKS[code >> 2]}{SUITS[code & 3]}"
+
+
+# Blackjack value of each card code, aces counted as 1
+CARD_VALUES = bytes(min(code // len(SUITS) + 1, 10) for code in range(len(RANKS) * len(SUITS)))
+
+
+class Hand:
+    """Cards in a hand plus running totals, so every query is O(1)"""
+    __slots__ = ("owner", "cards", "hard", "aces", "_values")
+
+    def __init__(self, owner: str):
+        self.owner = owner  # player or dealer
+        self.cards: list[int] = []
+        self.hard = 0  # total with every ace counted as 1
+        self.aces = 0
+        self._values = (0, 0)
+
+    def add(self, card: int):
+        self.cards.append(card)
+        value = CARD_VALUES[card]
+        hard = self.hard + value
+        self.hard = hard
+        if value == 1:
+            self.aces += 1
+        self._values = (hard, hard + 10 if self.aces and hard + 10 <= 21 else hard)
+
+    def clear(self):
+        self.cards.clear()
+        self.hard = 0
+        self.aces = 0
+        self._values = (0, 0)
+
+    def values(self) -> tuple[int, int]:
+        """Returns (low_value, high_value) where high_value uses aces as 11 when beneficial"""
+        return self._values
+
+    def best_value(self) -> int:
+        """Returns the best valid hand value"""
+        # high only differs from low when counting an ace as 11 doesn't bust
+        return self._values[1]
+
+    def is_blackjack(self) -> bool:
+        return len(self.cards) == 2 and self._values[1] == 21
+
+    def is_bust(self) -> bool:
+        return self.hard > 21
+
+    def __repr__(self):
+        cards = " ".join(card_label(c) for c in self.cards)
+        return f"{self.owner} Hand: {cards} (best={self.best_value()})"
+
+
+class Shoe:
+    """A shuffled shoe stored as one byte per card, drawn from a cursor.
+
+    `remaining` counts the undrawn cards of each value (index 0 for aces,
+    9 for ten-value cards) and is kept up to date as cards are drawn.
+    """
+    __slots__ = ("cards", "position", "cut_card_reached", "remaining")
+
+    def __init__(self, cards: array):
+        self.cards = cards
+        self.position = 0
+        self.cut_card_reached = False
+        self.remaining = [0] * 10
+        for card in cards:
+            if card != BREAK:
+                self.remaining[CARD_VALUES[card] - 1] += 1
+
+    def draw(self) -> int:
+        """Return the next card code; raises IndexError once the shoe is empty"""
+        card = self.cards[self.position]
+        self.position += 1
+        if card == BREAK:
+            self.cut_card_reached = True
+            return self.draw()
+        self.remaining[CARD_VALUES[card] - 1] -= 1
+        return card
+
+    def value_left(self) -> int:
+        """Total value of the undrawn cards, aces counted as 1"""
+        return sum(count * value for value, count in enumerate(self.remaining, 1))
+
+    def __len__(self):
+        return len(self.cards) - self.position
+
+
+def generate_shoe(num_decks=DEFAULT_DECKS, rng=random):
+    """Generate a shuffled shoe of cards with a break card near the end.
+
+    `rng` is anything with shuffle() and randint(), e.g. random.SystemRandom()
+    for a shuffle drawn from the OS CSPRNG.
+    """
+    shoe = array("B", range(len(RANKS) * len(SUITS))) * num_decks
+    rng.shuffle(shoe)
+
+    # Insert break card near the end
+    cut_position = rng.randint(60, 75)
+    break_card_index = len(shoe) - cut_position
+    shoe.insert(break_card_index, BREAK)
+
+    return Shoe(shoe)
+
+
+class ShoeManager:
+    """Hands out the shoe for each round and shuffles the next one in the background.
+
+    Call `start_round()` before every deal. Once the cut card has come out the
+    round in progress plays on from the same shoe, and the next round starts
+    on a fresh one. That shoe is shuffled on a thread as soon as the current
+    one is half dealt, so swapping it in costs nothing at the table.
+
+    With `secure` the shuffles use random.SystemRandom (the OS CSPRNG, as
+    `secrets` does), for games whose fairness may be audited; it is about
+    three times slower than the default generator, but that is off the
+    deal's path.
+    """
+    __slots__ = ("num_decks", "rng", "shoe", "shoes", "_next", "_shuffler")
+
+    def __init__(self, num_decks=DEFAULT_DECKS, secure=False):
+        self.num_decks = num_decks
+        self.rng = random.SystemRandom() if secure else random
+        self.shoe = generate_shoe(num_decks, self.rng)
+        self.shoes = 1  # shoes dealt from so far, this one included
+        self._next = None
+        self._shuffler = None
+
+    def start_round(self, reserve: int = 0) -> bool:
+        """Switch to the next shoe if the cut card came out; True if it did.
+
+        `reserve` is the card value (see Shoe.value_left) the coming round may
+        need; a shoe holding less is swapped out even before the cut card.
+        """
+        shoe = self.shoe
+        if shoe.cut_card_reached or shoe.value_left() < reserve:
+            self.shoe = self._take_next()
+            self.shoes += 1
+            return True
+        if self._shuffler is None and shoe.position * 2 >= len(shoe.cards):
+            self._shuffler = threading.Thread(target=self._shuffle_next, name="shoe-shuffle", daemon=True)
+            self._shuffler.start()
+        return False
+
+    def _shuffle_next(self):
+        self._next = generate_shoe(self.num_decks, self.rng)
+
+    def _take_next(self) -> Shoe:
+        shuffler, self._shuffler = self._shuffler, None
+        if shuffler is None:
+            # A small shoe can be cut before it is half dealt: nothing was prepared
+            return generate_shoe(self.num_decks, self.rng)
+        shuffler.join()
+        shoe, self._next = self._next, None
+        return shoe
+
+
+class Round:
+    """One hand of blackjack between a player and the dealer.
+
+    Steps are `deal()`, then `hit()` until the player stands or busts, then
+    `dealer_draw()` while `dealer_should_draw()` (or `play_dealer()` to run it
+    all at once), then `settle()`. Each step only mutates the hands; callers
+    decide how to show it.
+    """
+    __slots__ = ("shoe", "player", "dealer")
+
+    def __init__(self, shoe: Shoe, player: Hand = None, dealer: Hand = None):
+        self.shoe = shoe
+        self.player = player if player is not None else Hand("Player")
+        self.dealer = dealer if dealer is not None else Hand("Dealer")
+
+    def deal(self) -> bool:
+        """Deal two cards each; returns True if the player has a natural"""
+        player, dealer, draw = self.player, self.dealer, self.shoe.draw
+        player.clear()
+        dealer.clear()
+        player.add(draw())
+        dealer.add(draw())
+        player.add(draw())
+        dealer.add(draw())
+        return player.is_blackjack()
+
+    def hit(self) -> int:
+        """Draw a card for the player and return it"""
+        card = self.shoe.draw()
+        self.player.add(card)
+        return card
+
+    def player_bust(self) -> bool:
+        return self.player.hard > 21
+
+    def dealer_should_draw(self) -> bool:
+        """The dealer draws while their best total is under 17 (stands on soft 17)"""
+        return self.dealer.values()[1] < 17
+
+    def dealer_draw(self) -> int:
+        card = self.shoe.draw()
+        self.dealer.add(card)
+        return card
+
+    def play_dealer(self):
+        while self.dealer_should_draw():
+            self.dealer_draw()
+
+    def settle(self) -> str:
+        """Return the outcome of the round as one of the outcome constants"""
+        if self.player.is_blackjack():
+            return PLAYER_BLACKJACK
+
+        player_best = self.player.values()[1]
+        dealer_best = self.dealer.values()[1]
+
+        if player_best > 21:
+            return PLAYER_BUST
+        elif dealer_best > 21:
+            return DEALER_BUST
+        elif player_best > dealer_best:
+            return PLAYER_WIN
+        elif player_best < dealer_best:
+            return DEALER_WIN
+        else:
+            return PUSH
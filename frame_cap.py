@@ -0,0 +1,85 @@
+"""Cap how often a Textual driver writes to the terminal.
+
+Low-bandwidth sessions get at most BLACKJACK_LOW_BANDWIDTH_FPS writes a
+second. The cap lives in the driver rather than in TEXTUAL_FPS, which Textual
+reads once at import: a session forked from the zygote or hosted in
+ssh_host.py shares an interpreter that imported Textual long before it knew
+the session wanted low bandwidth.
+"""
+from __future__ import annotations
+
+import functools
+import os
+
+LOW_BANDWIDTH_FPS = 10  # terminal writes per second for low-bandwidth sessions
+
+
+def low_bandwidth_frame_interval() -> float:
+    return 1 / int(os.getenv("BLACKJACK_LOW_BANDWIDTH_FPS", LOW_BANDWIDTH_FPS))
+
+
+class FrameCap:
+    """Driver mixin: output written during one loop iteration goes out as one
+    write, and with a `frame_interval` at most one write goes out per interval.
+
+    The underlying driver's write() is only called from _send(); a driver
+    without one of its own overrides _emit() instead.
+    """
+
+    def __init__(self, *args, frame_interval: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._frame_interval = frame_interval
+        self._last_flush = 0.0
+        self._output = []
+        self._flush_scheduled = False
+
+    def write(self, data: str) -> None:
+        self._output.append(data)
+        self._schedule_flush(self._last_flush + self._frame_interval - self._loop.time())
+
+    def flush(self) -> None:
+        """Send the pending output, or once `frame_interval` allows.
+
+        Textual calls this after every frame, so the cap has to hold here too.
+        """
+        delay = self._last_flush + self._frame_interval - self._loop.time()
+        if delay > 0:
+            self._schedule_flush(delay)
+        else:
+            self._send()
+
+    def close(self) -> None:
+        self._send()  # whatever stop_application_mode wrote, before the output goes away
+        super().close()
+
+    def _schedule_flush(self, delay: float):
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        if delay > 0:
+            self._loop.call_later(delay, self._scheduled_flush)
+        else:
+            self._loop.call_soon(self._scheduled_flush)
+
+    def _scheduled_flush(self):
+        self._flush_scheduled = False
+        self.flush()  # something may have been sent since this was scheduled
+
+    def _send(self):
+        if not self._output:
+            return
+        self._last_flush = self._loop.time()
+        data = "".join(self._output)
+        self._output.clear()
+        self._emit(data)
+
+    def _emit(self, data: str):
+        super().write(data)
+
+
+def capped_driver(driver_class, frame_interval: float):
+    """`driver_class`, or a functools.partial of a FrameCap driver, writing at most once per `frame_interval`"""
+    base = getattr(driver_class, "func", driver_class)
+    if not issubclass(base, FrameCap):
+        driver_class = type(f"FrameCapped{base.__name__}", (FrameCap, driver_class), {})
+    return functools.partial(driver_class, frame_interval=frame_interval)
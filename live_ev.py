@@ -0,0 +1,84 @@
+"""Composition-dependent hit/stand EV from the cards actually left in the shoe.
+
+The dealer's final-total distribution is computed exactly for the unseen
+cards, with removal as the dealer draws; its subproblems are memoised by the
+remaining-count vector in a bounded LRU shared across decisions, so states
+that repeat within a shoe come back from the cache. The player's hit EV
+recurses with removal for the player's own draws and, as is usual for a
+live solver, plays each resulting total against the dealer distribution of
+the current composition.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+
+from engine import CARD_VALUES
+from strategy import DEALER_FINALS, DEALER_STANDS_ON, HIT, STAND, best_total, stand_ev
+
+CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _dealer_finish(remaining: tuple, hard: int, ace: bool) -> tuple:
+    best = hard + 10 if ace and hard + 10 <= 21 else hard
+    result = [0.0] * len(DEALER_FINALS)
+    if best >= DEALER_STANDS_ON:
+        result[min(best, 22) - 17] = 1.0
+        return tuple(result)
+
+    total = sum(remaining)
+    for index, count in enumerate(remaining):
+        if not count:
+            continue
+        value = index + 1
+        drawn = remaining[:index] + (count - 1,) + remaining[index + 1:]
+        p = count / total
+        for outcome, q in enumerate(_dealer_finish(drawn, hard + value, ace or value == 1)):
+            result[outcome] += p * q
+    return tuple(result)
+
+
+@lru_cache(maxsize=CACHE_SIZE // 16)
+def solve(counts: tuple, hard: int, ace: bool, up: int) -> tuple[float, float]:
+    """Return (stand EV, hit EV) for a player state against the up card value.
+
+    `counts` holds the unseen cards of each value 1..10: the undrawn shoe
+    plus the dealer's hole card, with the player's and up cards removed.
+    """
+    dealer = _dealer_finish(counts, up, up == 1)
+    memo = {}
+
+    def best_ev(remaining, hard, ace):
+        if hard > 21:
+            return -1.0
+        key = (remaining, hard, ace)
+        if key not in memo:
+            memo[key] = max(stand_ev(best_total(hard, ace), dealer), hit_ev(remaining, hard, ace))
+        return memo[key]
+
+    def hit_ev(remaining, hard, ace):
+        total = sum(remaining)
+        ev = 0.0
+        for index, count in enumerate(remaining):
+            if not count:
+                continue
+            value = index + 1
+            drawn = remaining[:index] + (count - 1,) + remaining[index + 1:]
+            ev += count / total * best_ev(drawn, hard + value, ace or value == 1)
+        return ev
+
+    return stand_ev(best_total(hard, ace), dealer), hit_ev(counts, hard, ace)
+
+
+def unseen_counts(shoe, hole_card: int) -> tuple:
+    """What the player can't see: the undrawn shoe plus the dealer's hole card"""
+    counts = list(shoe.remaining)
+    counts[CARD_VALUES[hole_card] - 1] += 1
+    return tuple(counts)
+
+
+def advise(shoe, player, dealer) -> tuple[str, float, float]:
+    """Best play for the engine hands given the live shoe composition"""
+    counts = unseen_counts(shoe, dealer.cards[1])
+    stand, hit = solve(counts, player.hard, player.aces > 0, CARD_VALUES[dealer.cards[0]])
+    return (HIT if hit > stand else STAND), stand, hit
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Load generator: N concurrent blackjack sessions playing and chatting, to
+see how many players a box holds before it slows down.
+
+Sessions run in this process on one event loop, the way ssh_host.py hosts
+them, or with `--subprocesses` as one interpreter each with SSH_SESSION_ID
+and SSH_USERNAME set, the way the Go server starts them. Each one presses
+Deal, Hit and Stand at `--rate` actions a second and sends a chat message
+every `--chat-interval` seconds. Chat goes the real way: into
+/tmp/ssh-chat-messages.log, copied by the relay (this script runs one
+unless `--no-relay`, e.g. when the Go server is up) into /tmp/ssh-chat/ssh-chat.log,
+and read back by every other session. Players on the same host see the
+load's messages; `--chat-dir` keeps them in other files.
+
+Reported per run: action-to-render latency (press to the next frame
+written), chat end-to-end latency (sent to shown in another session), and
+RSS and CPU per session. Several session counts make one row each:
+
+    python loadgen.py --sessions 10,50,100 --duration 20 --json load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from textual import events
+from textual.driver import Driver
+from textual.geometry import Size
+
+from chat_tail import ChatTailReader
+from chat_watch import ChatFileWatcher
+from chat_writer import shared_writer
+from main import BlackjackApp
+
+SIZE = (120, 40)
+CHAT_FILE = "ssh-chat.log"  # in --chat-dir
+CHAT_MESSAGES_FILE = "ssh-chat-messages.log"
+CHAT_TAG = "loadgen"  # chat messages sent by the load are "loadgen <send time> <session>"
+ACTION_TIMEOUT = 5.0  # a press with no frame after this long counts as a timeout
+DRAIN = 2.0  # seconds to keep reading chat after the last message is sent
+SAMPLE_INTERVAL = 0.5  # how often in-process RSS is sampled
+
+
+class LoadDriver(Driver):
+    """Driver that renders normally, throws the output away and notes each frame"""
+
+    def __init__(self, app, **kwargs):
+        super().__init__(app, **kwargs)
+        self.frames = 0
+        self.bytes_written = 0
+        self.frame_written = asyncio.Event()
+        app.load_driver = self
+
+    def write(self, data: str) -> None:
+        self.frames += 1
+        self.bytes_written += len(data)
+        self.frame_written.set()
+
+    def start_application_mode(self) -> None:
+        size = Size(*self._size)
+        self.process_message(events.Resize(size, size))
+
+    def disable_input(self) -> None:
+        pass
+
+    def stop_application_mode(self) -> None:
+        pass
+
+
+class LoadApp(BlackjackApp):
+    """BlackjackApp that notes when other sessions' load messages reach it"""
+
+    def __init__(self, **kwargs):
+        super().__init__(driver_class=LoadDriver, **kwargs)
+        self.load_driver = None
+        self.chat_latencies = []
+        self.started = time.time()  # older load messages are backfill from earlier runs
+
+    def display_chat_message(self, msg, flush: bool = True):
+        text = msg.get("message", "")
+        if text.startswith(CHAT_TAG) and msg.get("username") != self.username:
+            try:
+                sent = float(text.split()[1])
+            except (IndexError, ValueError):
+                sent = 0.0
+            if sent >= self.started:
+                self.chat_latencies.append(time.time() - sent)
+        super().display_chat_message(msg, flush)
+
+
+def rss_mb() -> float:
+    """Resident set size of this process now (peak, where /proc isn't available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def percentiles(values: list) -> dict:
+    """p50/p90/p99/max of latencies in seconds, as milliseconds"""
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    values = sorted(values)
+    pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(values[-1] * 1000, 2)}
+
+
+async def press(app, button, result):
+    """Press a button and time it until the next frame is written"""
+    driver = app.load_driver
+    driver.frame_written.clear()
+    start = time.perf_counter()
+    button.press()
+    try:
+        await asyncio.wait_for(driver.frame_written.wait(), ACTION_TIMEOUT)
+    except asyncio.TimeoutError:
+        result["timeouts"] += 1
+        return
+    result["latencies"].append(time.perf_counter() - start)
+
+
+async def play(app, options, deadline, result):
+    """Scripted play: deal, hit below 15, stand, at `rate` actions a second"""
+    gap = 1 / options.rate
+    due = time.monotonic() + random.uniform(0, gap)  # don't press in lockstep with every other session
+    while due < deadline:
+        await asyncio.sleep(max(0.0, due - time.monotonic()))
+        if app.deal_button.visible and app.dealer_worker is None:
+            button = app.deal_button
+        elif app.hit_button.visible and app.player_hand.best_value() < 15:
+            button = app.hit_button
+        elif app.stand_button.visible:
+            button = app.stand_button
+        else:
+            due += 0.01  # the dealer is still playing
+            continue
+        await press(app, button, result)
+        due = max(due + gap, time.monotonic())
+
+
+async def chat(app, options, deadline, result):
+    if not options.chat_interval:
+        return
+    await asyncio.sleep(random.uniform(0, options.chat_interval))
+    while time.monotonic() < deadline:
+        app.send_chat_message(f"{CHAT_TAG} {time.time():.6f} {app.username}")
+        result["chat_sent"] += 1
+        await asyncio.sleep(options.chat_interval)
+
+
+def use_chat_dir(app, directory: str):
+    """Point a mounted session at the chat logs in `directory` instead of the server's"""
+    path = os.path.join(directory, CHAT_FILE)
+    app.chat_reader.close()
+    app.chat_reader = ChatTailReader(path)
+    app.chat_writer = shared_writer(os.path.join(directory, CHAT_MESSAGES_FILE))
+    if app.chat_watcher:
+        app.chat_watcher.stop()
+        app.chat_watcher = ChatFileWatcher(path, app.check_for_chat_messages)
+        app.chat_watcher.start()
+
+
+async def run_session(app, options, duration) -> dict:
+    """Run one session for `duration` seconds; returns what it measured"""
+    result = {"latencies": [], "timeouts": 0, "chat_sent": 0, "chat_latencies": app.chat_latencies}
+
+    async def auto_pilot(pilot):
+        while not app.setup_done:  # chat monitoring starts after the first paint
+            await pilot.pause(0.01)
+        if options.chat_dir:
+            use_chat_dir(app, options.chat_dir)
+        deadline = time.monotonic() + duration
+        await asyncio.gather(play(app, options, deadline, result), chat(app, options, deadline, result))
+        await asyncio.sleep(DRAIN)
+        result["frames"] = app.load_driver.frames
+        result["bytes"] = app.load_driver.bytes_written
+        app.exit()
+
+    await app.run_async(size=SIZE, auto_pilot=auto_pilot)
+    return result
+
+
+def chat_paths(options) -> tuple:
+    """(outgoing messages file, shared chat log) the sessions use"""
+    if not options.chat_dir:
+        import ssh_host
+
+        return ssh_host.CHAT_MESSAGES_FILE, ssh_host.CHAT_FILE
+    return os.path.join(options.chat_dir, CHAT_MESSAGES_FILE), os.path.join(options.chat_dir, CHAT_FILE)
+
+
+def start_relay(options):
+    """Relay new chat from the sessions' outgoing log into the shared log, as the server does"""
+    from ssh_host import ChatRelay
+
+    source, target = chat_paths(options)
+    if not os.path.exists(source):
+        open(source, "a").close()
+    relay = ChatRelay(source, target)
+    relay.reader.skip_to_last(0)  # only what the load sends, not old history
+    relay.start()
+    return relay
+
+
+def stop_relay(relay):
+    if relay is None:
+        return
+    relay.watcher.stop()
+    if relay.timer:
+        relay.timer.cancel()
+    relay.relay()
+    relay.store.wait()
+
+
+async def run_in_process(count: int, options) -> dict:
+    """`count` sessions on this event loop, chat pushed by one watcher as in ssh_host"""
+    import ssh_host
+
+    relay = None if options.no_relay else start_relay(options)
+    hub = ssh_host.ChatHub(chat_paths(options)[1])
+    hub.start()
+    base_rss = rss_mb()
+    peak_rss = base_rss
+    cpu_start = cpu_seconds()
+
+    async def sample():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, rss_mb())
+            await asyncio.sleep(SAMPLE_INTERVAL)
+
+    async def session(index):
+        await asyncio.sleep(options.ramp * index / count)  # spread start-up out
+        app = LoadApp(session_id=f"load-{os.getpid()}-{index}", username=f"load{index}", watch_chat=False,
+                      pacing=options.pacing)
+        hub.apps.add(app)
+        try:
+            return await run_session(app, options, options.duration)
+        finally:
+            hub.apps.discard(app)
+
+    sampler = asyncio.get_running_loop().create_task(sample())
+    start = time.monotonic()
+    sessions = await asyncio.gather(*(session(index) for index in range(count)))
+    elapsed = time.monotonic() - start
+    sampler.cancel()
+    hub.watcher.stop()
+    if hub.timer:
+        hub.timer.cancel()
+    stop_relay(relay)
+    cpu = cpu_seconds() - cpu_start
+    for result in sessions:
+        result["rss_mb"] = (peak_rss - base_rss) / count
+        result["cpu_s"] = cpu / count
+    return summarize("in-process", count, sessions, elapsed, options.duration)
+
+
+async def run_subprocesses(count: int, options) -> dict:
+    """`count` sessions as separate interpreters, each reporting its own numbers"""
+    relay = None if options.no_relay else start_relay(options)
+    args = [sys.executable, os.path.abspath(__file__), "--child", "--duration", str(options.duration),
+            "--rate", str(options.rate), "--chat-interval", str(options.chat_interval)]
+    if options.pacing:
+        args += ["--pacing", options.pacing]
+    if options.chat_dir:
+        args += ["--chat-dir", options.chat_dir]
+
+    async def session(index):
+        await asyncio.sleep(options.ramp * index / count)
+        env = dict(os.environ, SSH_SESSION_ID=f"load-{os.getpid()}-{index}", SSH_USERNAME=f"load{index}")
+        process = await asyncio.create_subprocess_exec(*args, env=env, stdout=asyncio.subprocess.PIPE)
+        stdout, _ = await process.communicate()
+        try:
+            return json.loads(stdout.decode().strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            return None
+
+    start = time.monotonic()
+    sessions = await asyncio.gather(*(session(index) for index in range(count)))
+    elapsed = time.monotonic() - start
+    stop_relay(relay)
+    failed = sessions.count(None)
+    summary = summarize("subprocess", count, [result for result in sessions if result], elapsed, options.duration)
+    summary["failed"] = failed
+    return summary
+
+
+async def run_child(options, stdout):
+    """One session in this interpreter (for --subprocesses); prints its numbers as JSON"""
+    cpu_start = cpu_seconds()
+    app = LoadApp(pacing=options.pacing)
+    result = await run_session(app, options, options.duration)
+    result["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result["cpu_s"] = cpu_seconds() - cpu_start
+    print(json.dumps(result), file=stdout)
+
+
+def summarize(mode: str, count: int, sessions: list, elapsed: float, duration: float) -> dict:
+    """One row of the report; actions/s over the playing time, CPU over the whole run"""
+    latencies = [value for result in sessions for value in result["latencies"]]
+    chat_latencies = [value for result in sessions for value in result["chat_latencies"]]
+    sent = sum(result["chat_sent"] for result in sessions)
+    rss = [result["rss_mb"] for result in sessions]
+    cpu = [result["cpu_s"] for result in sessions]
+    return {
+        "mode": mode,
+        "sessions": count,
+        "elapsed_s": round(elapsed, 2),
+        "actions": len(latencies),
+        "actions_per_s": round(len(latencies) / duration, 1) if duration else 0.0,
+        "timeouts": sum(result["timeouts"] for result in sessions),
+        "action_latency_ms": percentiles(latencies),
+        "chat_sent": sent,
+        "chat_delivered": len(chat_latencies),
+        "chat_expected": sent * (len(sessions) - 1),
+        "chat_latency_ms": percentiles(chat_latencies),
+        "bytes_per_session": round(sum(result["bytes"] for result in sessions) / max(len(sessions), 1)),
+        "rss_mb_per_session": round(sum(rss) / max(len(rss), 1), 2),
+        "cpu_percent_per_session": round(sum(cpu) / max(len(cpu), 1) / elapsed * 100, 1) if elapsed else 0.0,
+    }
+
+
+def print_table(runs: list):
+    print(f"{'sessions':>8} {'mode':<11} {'act/s':>7} {'p50 ms':>7} {'p90':>7} {'p99':>7} {'max':>7} "
+          f"{'t/o':>4} {'chat p50':>8} {'p99':>7} {'delivered':>11} {'MB/sess':>8} {'cpu%/sess':>9}")
+    fmt = lambda value: "-" if value is None else f"{value:.1f}"
+    for run in runs:
+        action, chat = run["action_latency_ms"], run["chat_latency_ms"]
+        delivered = f"{run['chat_delivered']}/{run['chat_expected']}"
+        print(f"{run['sessions']:>8} {run['mode']:<11} {run['actions_per_s']:>7.1f} {fmt(action['p50']):>7} "
+              f"{fmt(action['p90']):>7} {fmt(action['p99']):>7} {fmt(action['max']):>7} {run['timeouts']:>4} "
+              f"{fmt(chat['p50']):>8} {fmt(chat['p99']):>7} {delivered:>11} {run['rss_mb_per_session']:>8.1f} "
+              f"{run['cpu_percent_per_session']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent blackjack sessions and measure them")
+    parser.add_argument("--sessions", default="10", help="session count, or several separated by commas")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds each session plays")
+    parser.add_argument("--rate", type=float, default=2.0, help="button presses per second per session")
+    parser.add_argument("--chat-interval", type=float, default=5.0,
+                        help="seconds between chat messages per session (0: no chat)")
+    parser.add_argument("--pacing", default="instant", help="dealer pacing for the sessions")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which sessions start")
+    parser.add_argument("--subprocesses", action="store_true", help="one interpreter per session")
+    parser.add_argument("--no-relay", action="store_true", help="a running server already relays chat")
+    parser.add_argument("--chat-dir", help="use the chat logs in this directory rather than the live ones in /tmp")
+    parser.add_argument("--json", help="write the runs as JSON to this file ('-' for stdout only)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    # Apps redirect stdout and stderr while they run; with several running at
+    # once the last to exit can leave another's redirect in place
+    streams = sys.stdout, sys.stderr
+    if options.child:
+        asyncio.run(run_child(options, streams[0]))
+        return
+
+    # Keep the load's hands out of the real leaderboard
+    stats_dir = tempfile.TemporaryDirectory()
+    os.environ.setdefault("BLACKJACK_STATS_DB", os.path.join(stats_dir.name, "stats.sqlite3"))
+    runner = run_subprocesses if options.subprocesses else run_in_process
+    runs = []
+    for count in (int(value) for value in options.sessions.split(",")):
+        print(f"running {count} sessions for {options.duration:.0f}s...", file=sys.stderr)
+        runs.append(asyncio.run(runner(count, options)))
+        sys.stdout, sys.stderr = streams
+
+    if options.json == "-":
+        json.dump(runs, sys.stdout, indent=2)
+        print()
+        return
+    print_table(runs)
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump(runs, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,19 @@ package main
 
 import (
 	"bufio"
+	"compress/gzip"
 	"encoding/json"
 	"fmt"
 	"io"
 	"log"
+	"net"
 	"os"
 	"os/exec"
 	"path/filepath"
+	"sort"
+	"strings"
 	"sync"
+	"syscall"
 	"time"
 
 	"github.com/creack/pty"
@@ -73,7 +78,8 @@ func (sm *SessionManager) BroadcastMessage(msg ChatMessage) {
 	log.Printf("Broadcasting message from %s: %s", msg.Username, msg.Message)
 	
 	// Write to chat file for all sessions to read
-	chatFile := "/tmp/ssh-chat.log"
+	chatStoreMutex.Lock()
+	defer chatStoreMutex.Unlock()
 	file, err := os.OpenFile(chatFile, os.O_APPEND|os.O_CREATE|os.O_WRONLY, 0644)
 	if err != nil {
 		log.Printf("Error opening chat file: %v", err)
@@ -92,8 +98,248 @@ func (sm *SessionManager) BroadcastMessage(msg ChatMessage) {
 		log.Printf("Error writing to chat file: %v", err)
 		return
 	}
+	segmentMessages++
 	
 	log.Printf("Successfully wrote chat message to file: %s", string(messageData))
+
+	// Seal the active segment once it is big or old enough (see chat_store.py)
+	if segmentStarted.IsZero() {
+		segmentStarted = time.Now()
+	}
+	if info, err := file.Stat(); err == nil &&
+		(info.Size() >= chatSegmentBytes || time.Since(segmentStarted) >= chatSegmentAge) {
+		if err := rotateChatLog(info.Size()); err != nil {
+			log.Printf("Error rotating chat log: %v", err)
+		}
+	}
+}
+
+const (
+	chatFile         = "/tmp/ssh-chat/ssh-chat.log" // own directory: sessions watch it for the file being recreated
+	chatSegmentBytes = 256 * 1024
+	chatSegmentAge   = time.Hour
+	chatMaxSegments  = 64
+)
+
+var (
+	// Where sealed segments go; BLACKJACK_CHAT_DIR, as for chat_store.py's readers
+	chatSegmentDir = chatDirectory()
+	chatIndexFile  = filepath.Join(chatSegmentDir, "index.jsonl")
+
+	chatStoreMutex  sync.Mutex // serialises chat log writes and rotation
+	chatIndexMutex  sync.Mutex // serialises index appends and compaction
+	segmentStarted  time.Time
+	segmentMessages int // lines written to the active segment
+)
+
+func chatDirectory() string {
+	if dir := os.Getenv("BLACKJACK_CHAT_DIR"); dir != "" {
+		return dir
+	}
+	return "/tmp/ssh-chat.d"
+}
+
+// chatIndexEntry is one line of the segment index; the last entry for a seq wins
+type chatIndexEntry struct {
+	Seq      int     `json:"seq"`
+	File     *string `json:"file"`
+	Messages int     `json:"messages,omitempty"`
+	Bytes    int64   `json:"bytes,omitempty"`
+	Sealed   float64 `json:"sealed,omitempty"`
+}
+
+// rotateChatLog moves the active chat log into the segment directory, records
+// it in the index and compresses old segments in the background. It works as
+// ChatStore.rotate in chat_store.py does: the log is first renamed aside to
+// <chatFile>.sealing, which readers backfilling history treat as a segment
+// still on its way, then moved (copied, across filesystems) into place.
+func rotateChatLog(size int64) error {
+	if err := os.MkdirAll(chatSegmentDir, 0755); err != nil {
+		return err
+	}
+	seq := 1
+	matches, _ := filepath.Glob(filepath.Join(chatSegmentDir, "segment-*.log*"))
+	for _, m := range matches {
+		var n int
+		if _, err := fmt.Sscanf(filepath.Base(m), "segment-%d.log", &n); err == nil && n >= seq {
+			seq = n + 1
+		}
+	}
+
+	name := fmt.Sprintf("segment-%06d.log", seq)
+	target := filepath.Join(chatSegmentDir, name)
+	sealing := chatFile + ".sealing"
+	if err := os.Rename(chatFile, sealing); err != nil {
+		return err
+	}
+	messages := segmentMessages
+	segmentStarted = time.Time{}
+	segmentMessages = 0
+	if err := moveFile(sealing, target); err != nil {
+		return err
+	}
+
+	entry := chatIndexEntry{
+		Seq:      seq,
+		File:     &name,
+		Messages: messages,
+		Bytes:    size,
+		Sealed:   float64(time.Now().UnixMilli()) / 1000,
+	}
+	line, _ := json.Marshal(entry)
+
+	chatIndexMutex.Lock()
+	index, err := os.OpenFile(chatIndexFile, os.O_APPEND|os.O_CREATE|os.O_WRONLY, 0644)
+	if err == nil {
+		_, err = index.Write(append(line, '\n'))
+		index.Close()
+	}
+	chatIndexMutex.Unlock()
+	if err != nil {
+		return err
+	}
+
+	go compactChatSegments()
+	return nil
+}
+
+// moveFile renames source to target, copying and removing it when they are
+// on different filesystems
+func moveFile(source, target string) error {
+	err := os.Rename(source, target)
+	if linkErr, ok := err.(*os.LinkError); !ok || linkErr.Err != syscall.EXDEV {
+		return err
+	}
+	in, err := os.Open(source)
+	if err != nil {
+		return err
+	}
+	defer in.Close()
+	tmpPath := target + ".tmp"
+	out, err := os.Create(tmpPath)
+	if err != nil {
+		return err
+	}
+	if _, err := io.Copy(out, in); err != nil {
+		out.Close()
+		os.Remove(tmpPath)
+		return err
+	}
+	if err := out.Close(); err != nil {
+		os.Remove(tmpPath)
+		return err
+	}
+	if err := os.Rename(tmpPath, target); err != nil {
+		return err
+	}
+	return os.Remove(source)
+}
+
+// readChatIndex returns the live index entries by sequence number
+func readChatIndex() map[int]*chatIndexEntry {
+	entries := make(map[int]*chatIndexEntry)
+	file, err := os.Open(chatIndexFile)
+	if err != nil {
+		return entries
+	}
+	defer file.Close()
+
+	scanner := bufio.NewScanner(file)
+	for scanner.Scan() {
+		var entry chatIndexEntry
+		if err := json.Unmarshal(scanner.Bytes(), &entry); err != nil {
+			continue
+		}
+		if existing, ok := entries[entry.Seq]; ok {
+			existing.File = entry.File
+			continue
+		}
+		entries[entry.Seq] = &entry
+	}
+	for seq, entry := range entries {
+		if entry.File == nil {
+			delete(entries, seq)
+		}
+	}
+	return entries
+}
+
+// compactChatSegments gzips sealed segments, drops the oldest beyond
+// chatMaxSegments and rewrites the index to match
+func compactChatSegments() {
+	if !chatIndexMutex.TryLock() {
+		return // a compaction is already running
+	}
+	defer chatIndexMutex.Unlock()
+
+	entries := readChatIndex()
+	seqs := make([]int, 0, len(entries))
+	for seq := range entries {
+		seqs = append(seqs, seq)
+	}
+	sort.Ints(seqs)
+	for len(seqs) > chatMaxSegments {
+		os.Remove(filepath.Join(chatSegmentDir, *entries[seqs[0]].File))
+		delete(entries, seqs[0])
+		seqs = seqs[1:]
+	}
+
+	for _, seq := range seqs {
+		entry := entries[seq]
+		if strings.HasSuffix(*entry.File, ".gz") {
+			continue
+		}
+		source := filepath.Join(chatSegmentDir, *entry.File)
+		if err := gzipFile(source, source+".gz"); err != nil {
+			log.Printf("Error compressing chat segment %s: %v", source, err)
+			continue
+		}
+		compressed := *entry.File + ".gz"
+		entry.File = &compressed
+		os.Remove(source)
+	}
+
+	tmpPath := chatIndexFile + ".tmp"
+	out, err := os.Create(tmpPath)
+	if err != nil {
+		log.Printf("Error rewriting chat index: %v", err)
+		return
+	}
+	for _, seq := range seqs {
+		line, _ := json.Marshal(entries[seq])
+		out.Write(append(line, '\n'))
+	}
+	out.Close()
+	if err := os.Rename(tmpPath, chatIndexFile); err != nil {
+		log.Printf("Error rewriting chat index: %v", err)
+	}
+}
+
+// gzipFile writes a compressed copy of source to target via a temporary file
+func gzipFile(source, target string) error {
+	in, err := os.Open(source)
+	if err != nil {
+		return err
+	}
+	defer in.Close()
+
+	out, err := os.Create(target + ".tmp")
+	if err != nil {
+		return err
+	}
+	zw := gzip.NewWriter(out)
+	if _, err := io.Copy(zw, in); err != nil {
+		out.Close()
+		return err
+	}
+	if err := zw.Close(); err != nil {
+		out.Close()
+		return err
+	}
+	if err := out.Close(); err != nil {
+		return err
+	}
+	return os.Rename(target+".tmp", target)
 }
 
 // GetActiveUsers returns a list of active usernames
@@ -188,10 +434,77 @@ func watchChatMessages() {
 	}
 }
 
+// startProcess runs a fresh Python interpreter for the session on a new PTY
+func startProcess(env []string, winsize *pty.Winsize) (*os.File, func(), error) {
+	cmd := exec.Command("./.venv/bin/python3", "main.py")
+	cmd.Env = env
+
+	ptmx, err := pty.StartWithSize(cmd, winsize)
+	if err != nil {
+		return nil, nil, err
+	}
+	return ptmx, func() { _ = cmd.Process.Kill() }, nil
+}
+
+// zygoteRequest is sent to zygote.py as one SOCK_SEQPACKET datagram together
+// with the PTY slave fd
+type zygoteRequest struct {
+	Env map[string]string `json:"env"`
+}
+
+// startFromZygote asks the pre-forked Python zygote (zygote.py) to fork a
+// session onto a new PTY, skipping interpreter start-up and imports
+func startFromZygote(socketPath string, env []string, winsize *pty.Winsize) (*os.File, func(), error) {
+	ptmx, tty, err := pty.Open()
+	if err != nil {
+		return nil, nil, err
+	}
+	defer tty.Close()
+
+	if err := pty.Setsize(ptmx, winsize); err != nil {
+		ptmx.Close()
+		return nil, nil, err
+	}
+
+	conn, err := net.DialUnix("unixpacket", nil, &net.UnixAddr{Name: socketPath, Net: "unixpacket"})
+	if err != nil {
+		ptmx.Close()
+		return nil, nil, err
+	}
+
+	req := zygoteRequest{Env: make(map[string]string, len(env))}
+	for _, kv := range env {
+		if i := strings.IndexByte(kv, '='); i > 0 {
+			req.Env[kv[:i]] = kv[i+1:]
+		}
+	}
+	payload, err := json.Marshal(req)
+	if err != nil {
+		conn.Close()
+		ptmx.Close()
+		return nil, nil, err
+	}
+
+	// One datagram: the request and its fd arrive together or not at all
+	rights := syscall.UnixRights(int(tty.Fd()))
+	if _, _, err := conn.WriteMsgUnix(payload, rights, nil); err != nil {
+		conn.Close()
+		ptmx.Close()
+		return nil, nil, err
+	}
+
+	// Closing the connection tells the zygote to hang up the session
+	return ptmx, func() { _ = conn.Close() }, nil
+}
+
 func main() {
 	// Clean up chat files on start
-	os.Remove("/tmp/ssh-chat.log")
+	os.Remove(chatFile)
 	os.Remove("/tmp/ssh-chat-messages.log")
+	os.RemoveAll(chatSegmentDir)
+	if err := os.MkdirAll(filepath.Dir(chatFile), 0755); err != nil {
+		log.Fatalf("Failed to create chat log directory: %v", err)
+	}
 	
 	// Start file watcher for chat messages
 	go watchChatMessages()
@@ -214,20 +527,35 @@ func main() {
 			return
 		}
 
-		// Start the command with a PTY
-		cmd := exec.Command("./.venv/bin/python3", "main.py")
-		
 		// Set environment variables for the Python app
-		cmd.Env = append(os.Environ(),
+		env := append(os.Environ(),
 			fmt.Sprintf("SSH_SESSION_ID=%s", sessionID),
 			fmt.Sprintf("SSH_USERNAME=%s", username),
 		)
-
-		// Start the PTY
-		ptmx, err := pty.StartWithSize(cmd, &pty.Winsize{
+		// Pass on the player's hints (ssh -o SendEnv=LC_BLACKJACK_LOW_BANDWIDTH)
+		for _, kv := range s.Environ() {
+			if strings.HasPrefix(kv, "LC_BLACKJACK_PACING=") {
+				env = append(env, kv)
+			}
+			if strings.HasPrefix(kv, "LC_BLACKJACK_LOW_BANDWIDTH=") {
+				// The app caps its own frame rate, forked from the zygote or not
+				env = append(env, kv)
+			}
+		}
+		winsize := &pty.Winsize{
 			Rows: uint16(ptyReq.Window.Height),
 			Cols: uint16(ptyReq.Window.Width),
-		})
+		}
+
+		// Start the game with a PTY, forked from the zygote when one is configured
+		var ptmx *os.File
+		var stop func()
+		var err error
+		if zygoteSocket := os.Getenv("BLACKJACK_ZYGOTE"); zygoteSocket != "" {
+			ptmx, stop, err = startFromZygote(zygoteSocket, env, winsize)
+		} else {
+			ptmx, stop, err = startProcess(env, winsize)
+		}
 		if err != nil {
 			io.WriteString(s, "Error starting PTY: "+err.Error()+"\n")
 			return
@@ -239,7 +567,7 @@ func main() {
 		defer func() {
 			sessionManager.RemoveSession(sessionID)
 			_ = ptmx.Close()
-			_ = cmd.Process.Kill()
+			stop()
 		}()
 
 		// Handle window resize
@@ -1,91 +1,141 @@
+import time
+
+# Startup timeline: (event, time.monotonic()) from the start of this import
+# to the first paint; bench_startup.py reads it via BLACKJACK_STARTUP_TIMELINE
+STARTUP_TIMELINE = [("import main", time.monotonic())]
+
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal, Vertical, Container
 from textual.widgets import Button, Static, Input
 from textual.binding import Binding
-import random
 import asyncio
 import json
 import os
-import sys
 import threading
 import re
-import time
+from datetime import datetime
+
+from chat_ring import RingReader
+from chat_store import BACKFILL_LINES, CHAT_FILE, backfill as chat_backfill
+from chat_tail import ChatTailReader
+from chat_writer import ChatWriteCounts, shared_writer
+import debuglog
+from frame_cap import capped_driver, low_bandwidth_frame_interval
+import profiling
+from chat_view import ChatBuffer, DEFAULT_MAX_LINES
+from engine import (
+    CARD_VALUES, DEFAULT_DECKS, RANKS, SUITS, Hand, Round, Shoe, ShoeManager, card_label, payout,
+    PLAYER_BLACKJACK, PLAYER_BUST, DEALER_BUST, PLAYER_WIN, DEALER_WIN, PUSH,
+)
+from stats_store import DEFAULT_BET, STARTING_BANKROLL, shared_store
+from table import DEAL, HIDDEN_CARD, HIT, PLAYING, STAND
+
+STARTUP_TIMELINE.append(("imports done", time.monotonic()))
+
+# Card slots per hand: the most cards a hand can hold without busting
+MAX_CARDS = 11
+
+# Low-bandwidth mode: extra stylesheet, and how long incoming chat may wait
+# so a burst of messages is drawn once
+LOW_BANDWIDTH_CSS = "compact.tcss"
+CHAT_COALESCE = 0.5
+
+# Dealer pacing profiles: seconds between the reveal and each dealer card
+PACING = {"normal": 1.0, "fast": 0.25, "instant": 0.0}
+DEFAULT_PACING = "normal"
+
+
+def low_bandwidth_requested(env=None) -> bool:
+    """True if the session asked for low-bandwidth mode.
+
+    BLACKJACK_LOW_BANDWIDTH is the server-side switch; LC_BLACKJACK_LOW_BANDWIDTH
+    is the hint a player can send themselves, since stock sshd accepts LC_*
+    variables (`LC_BLACKJACK_LOW_BANDWIDTH=1 ssh -o SendEnv=LC_BLACKJACK_LOW_BANDWIDTH ...`).
+    """
+    env = os.environ if env is None else env
+    for name in ("BLACKJACK_LOW_BANDWIDTH", "LC_BLACKJACK_LOW_BANDWIDTH"):
+        if env.get(name, "").strip().lower() in ("1", "true", "yes", "on"):
+            return True
+    return False
+
+
+def stylesheet_parse_cache(stylesheet):
+    """Textual's cache of parsed rules, or None on a Textual without one.
+
+    It is a private attribute, so anything that doesn't look like the
+    mapping it has been just turns the cache off.
+    """
+    cache = getattr(stylesheet, "_parse_cache", None)
+    if not all(hasattr(cache, name) for name in ("keys", "__getitem__", "__setitem__")):
+        return None
+    return cache
+
+
+def seed_parsed_css(stylesheet):
+    """Hand a new app's stylesheet the rules already parsed in this process"""
+    cache = stylesheet_parse_cache(stylesheet)
+    if cache is not None:
+        for key, rules in PREPARSED_CSS.items():
+            cache[key] = rules
+
+
+def keep_parsed_css(stylesheet):
+    """Remember what a stylesheet parsed, for the apps started after it"""
+    cache = stylesheet_parse_cache(stylesheet)
+    if cache is not None:
+        for key in list(cache.keys()):
+            PREPARSED_CSS[key] = cache[key]
+
 
 class Card(Static):
-    def __init__(self, rank: str, suit: str, suit_id: str) -> None:
+    def __init__(self, rank: str, suit: str, suit_id: str = "") -> None:
         self.rank = rank
         self.suit = suit
         self.suit_id = suit_id
+        self.code = None
+        self.compact = False  # one-line glyph instead of rank over suit
         label = f"{rank}\n{suit}"
-        super().__init__(label, id=f"card-{rank}{suit_id}")
-
-    def __repr__(self):
-        return f"{self.rank}{self.suit}"
-
-class Hand:
-    def __init__(self, owner: str):
-        self.owner = owner  # player or dealer
-        self.cards: list[Card] = []
-
-    def add(self, card: Card):
-        self.cards.append(card)
-
-    def clear(self):
-        self.cards.clear()
-
-    def values(self) -> tuple[int, int]:
-        """Returns (low_value, high_value) where high_value uses aces as 11 when beneficial"""
-        total = 0
-        aces = 0
-        for card in self.cards:
-            if card.rank in ["J", "Q", "K"]:
-                total += 10
-            elif card.rank == "A":
-                aces += 1
-                total += 1
+        super().__init__(label, id=f"card-{rank}{suit_id}" if suit_id else None)
+
+    @classmethod
+    def slot(cls, compact: bool = False) -> "Card":
+        """An empty pooled slot, shown once a card is put in it"""
+        card = cls("", "")
+        card.compact = compact
+        card.display = False
+        return card
+
+    def show_code(self, code: int):
+        """Put a card (or HIDDEN_CARD) in this slot; redrawn only if it changed"""
+        if self.code != code:
+            self.code = code
+            if code == HIDDEN_CARD:
+                self.rank, self.suit = ("?", "?") if self.compact else ("O", "?")
             else:
-                total += int(card.rank)
-
-        high = total + (10 if aces and total + 10 <= 21 else 0)
-        return total, high
-
-    def best_value(self) -> int:
-        """Returns the best valid hand value"""
-        low, high = self.values()
-        return high if high <= 21 else low
-
-    def is_blackjack(self) -> bool:
-        return len(self.cards) == 2 and max(self.values()) == 21
-
-    def is_bust(self) -> bool:
-        return min(self.values()) > 21
+                self.rank, self.suit = RANKS[code >> 2], SUITS[code & 3]
+            self.update(f"{self.rank}{self.suit}" if self.compact else f"{self.rank}\n{self.suit}")
+        self.display = True
 
     def __repr__(self):
-        cards = " ".join(repr(c) for c in self.cards)
-        return f"{self.owner} Hand: {cards} (best={self.best_value()})"
-
-def generate_shoe(num_decks=6):
-    """Generate a shuffled shoe of cards with a break card near the end"""
-    ranks = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
-    suits = ["♠", "♥", "♦", "♣"]
-    suit_ids = ["S", "H", "D", "C"]
-
-    shoe = []
-    card_id = 0
-    for _ in range(num_decks):
-        for rank in ranks:
-            for suit, suit_id in zip(suits, suit_ids):
-                card_id += 1
-                shoe.append(Card(rank, suit, f"{suit_id}-{card_id}"))
+        return f"{self.rank}{self.suit}"
 
-    random.shuffle(shoe)
+# Parsed stylesheet rules to seed each new app with, filled in by a warm-up
+# run (see zygote.py) or by the first app of each layout in this process, so
+# sessions don't parse the same CSS again
+PREPARSED_CSS = {}
+CSS_LAYOUTS_KEPT = set()  # css_path tuples whose rules are in PREPARSED_CSS
 
-    # Insert break card near the end
-    cut_position = random.randint(60, 75)
-    break_card_index = len(shoe) - cut_position
-    shoe.insert(break_card_index, "BREAK")
+RESULT_MESSAGES = {
+    PLAYER_BLACKJACK: "Blackjack! Player wins immediately.",
+    PLAYER_BUST: "Player busts! Dealer wins.",
+    DEALER_BUST: "Dealer busts! Player wins!",
+    PLAYER_WIN: "Player wins!",
+    DEALER_WIN: "Dealer wins!",
+    PUSH: "It's a tie!",
+}
 
-    return shoe
+# Buttons that become table actions when seated at a shared table
+TABLE_ACTIONS = {"deal-button": DEAL, "hit-button": HIT, "stand-button": STAND}
 
 class BlackjackApp(App[str]):
     """A Textual blackjack game application with chat"""
@@ -94,59 +144,102 @@ class BlackjackApp(App[str]):
     BINDINGS = [
         Binding("ctrl+c", "quit", "Quit"),
         Binding("enter", "send_chat", "Send chat message", show=False),
+        Binding("f2", "toggle_analysis", "Live EV analysis", show=False),
     ]
 
-    def __init__(self):
-        super().__init__()
-        self.shoe = generate_shoe()
-        self.player_hand = Hand("Player")
-        self.dealer_hand = Hand("Dealer")
+    def __init__(self, session_id: str = None, username: str = None, watch_chat: bool = True,
+                 low_bandwidth: bool = None, pacing: str = None, step_delay: float = None, tables=None,
+                 warm_up: bool = False, **kwargs):
+        if low_bandwidth is None:
+            low_bandwidth = low_bandwidth_requested()
+        if low_bandwidth:
+            kwargs.setdefault("css_path", [self.CSS_PATH, LOW_BANDWIDTH_CSS])
+            # Capped in the driver, so forked and hosted sessions get it as well as fresh ones
+            driver_class = kwargs.get("driver_class") or self.get_driver_class()
+            kwargs["driver_class"] = capped_driver(driver_class, low_bandwidth_frame_interval())
+        super().__init__(**kwargs)
+        self.timeline = [("app init", time.monotonic())]
+        self.low_bandwidth = low_bandwidth
+        # Seed the parse cache with what this process parsed before; a new layout is kept after the first paint
+        self.css_cache = None
+        if os.getenv("BLACKJACK_CSS_CACHE", "1") != "0":
+            layout = tuple(self.css_path)
+            if layout not in CSS_LAYOUTS_KEPT:
+                self.css_cache = layout
+            seed_parsed_css(self.stylesheet)
+        # At a shared table (a table.TableCoordinator) the round is the seat's,
+        # over the table's shoe and dealer; it is set once seated on mount
+        self.tables = tables
+        self.seat = None
+        self.table_state = {}
+        self.shoes = None
+        self.round = None
+        if tables is None:
+            # BLACKJACK_SECURE_SHUFFLE=1 shuffles from the OS CSPRNG, for audited games
+            self.shoes = ShoeManager(DEFAULT_DECKS, secure=os.getenv("BLACKJACK_SECURE_SHUFFLE") == "1")
+            self.round = Round(self.shoes.shoe)
+        self.bet = int(os.getenv("BLACKJACK_BET", DEFAULT_BET))
+        self.bankroll = int(os.getenv("BLACKJACK_BANKROLL", STARTING_BANKROLL))  # until the store answers
+        self.session_net = 0  # won this session, on top of the stored bankroll
+        self.stats = None
+        self.strategy = None  # hint table, loaded on first use
+        # Card widgets are created once and reused every hand
+        self.dealer_slots = [Card.slot(low_bandwidth) for _ in range(MAX_CARDS)]
+        self.player_slots = [Card.slot(low_bandwidth) for _ in range(MAX_CARDS)]
+        self.texts = {}  # widget -> text last shown, to skip no-op updates
+        self.analysis = os.getenv("BLACKJACK_ANALYSIS") == "1"
+        self.analysis_state = None
+        # The player's LC_ hint picks the pace, else the server's default;
+        # an explicit step_delay (seconds) overrides both
+        pacing = pacing or os.getenv("LC_BLACKJACK_PACING") or os.getenv("BLACKJACK_PACING", DEFAULT_PACING)
+        self.step_delay = step_delay if step_delay is not None else PACING.get(pacing, PACING[DEFAULT_PACING])
+        self.dealer_worker = None  # the dealer's turn, while it is being played out
+        self.skip_animation = asyncio.Event()
+        self.deal_queued = False
         self.console_log = None
         self.chat_log = None
+        self.chat_buffer = None
         self.chat_input = None
+        self.chat_flush_timer = None
         
-        # Get session info from environment
-        self.session_id = os.getenv("SSH_SESSION_ID", "local")
-        self.username = os.getenv("SSH_USERNAME", "Player")
+        # Session info comes from the environment unless the host passes it in
+        self.session_id = session_id or os.getenv("SSH_SESSION_ID", "local")
+        self.username = username or os.getenv("SSH_USERNAME", "Player")
         
-        # Track last chat message count
-        self.last_chat_line = 0
-
-    def display_chat_message(self, msg):
+        # Follow the shared chat log from where we last stopped reading
+        self.chat_reader = ChatTailReader(CHAT_FILE)
+        self.chat_ring = None  # shared-memory reader, when the host provides a ring
+        self.chat_watcher = None
+        self.watch_chat = watch_chat  # False when a host notifies all its sessions itself
+        self.warm_up = warm_up  # a zygote warm-up run: start nothing that outlives it, such as the stats thread
+        self.chat_writer = None
+        self.chat_counts = ChatWriteCounts()  # this session's lines; the writer's own counts are process-wide
+        self.setup_done = False  # after_first_paint has run
+        self.profiler = None  # set on mount when BLACKJACK_PROFILE / BLACKJACK_TRACEMALLOC pick this session
+
+    @property
+    def shoe(self) -> Shoe:
+        return self.round.shoe
+
+    @property
+    def player_hand(self) -> Hand:
+        return self.round.player
+
+    @property
+    def dealer_hand(self) -> Hand:
+        return self.round.dealer
+
+    def display_chat_message(self, msg, flush: bool = True):
         """Display a chat message in the chat log"""
-        if self.chat_log:
-            username = msg.get("username", "Unknown")
-            message = msg.get("message", "")
-            timestamp = msg.get("timestamp", "")
-            
-            # Format timestamp
-            if timestamp:
-                try:
-                    from datetime import datetime
-                    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                    time_str = dt.strftime("%H:%M:%S")
-                except:
-                    time_str = ""
-            else:
-                from datetime import datetime
-                time_str = datetime.now().strftime("%H:%M:%S")
-            
-            formatted_msg = f"[{time_str}] {username}: {message}"
-            
-            # Get current chat log content
-            current_content = str(self.chat_log.renderable) if self.chat_log.renderable else ""
-            if current_content:
-                new_content = current_content + "\n" + formatted_msg
-            else:
-                new_content = formatted_msg
-            
-            self.chat_log.update(new_content)
+        if self.chat_buffer:
+            self.chat_buffer.append_message(msg)
+            if flush:
+                self.chat_buffer.flush()
 
     def send_chat_message(self, message: str):
         """Send a chat message to all connected users"""
         if message.strip():
             # Always show the message immediately to the sender for better UX
-            from datetime import datetime
             msg = {
                 "username": self.username,
                 "message": message.strip(),
@@ -164,62 +257,73 @@ class BlackjackApp(App[str]):
                 }
                 chat_json = json.dumps(chat_msg)
                 
-                # Write to a dedicated chat file that the Go server monitors
-                try:
-                    with open('/tmp/ssh-chat-messages.log', 'a') as f:
-                        f.write(f"{chat_json}\n")
-                        f.flush()
-                    
-                    # Also write to debug file
-                    with open('/tmp/python-chat-debug.log', 'a') as f:
-                        f.write(f"[{self.session_id}] Sent to file: {chat_json}\n")
-                        f.flush()
-                        
-                except Exception as e:
-                    # Fallback: write to debug log
-                    try:
-                        with open('/tmp/python-chat-debug.log', 'a') as f:
-                            f.write(f"[{self.session_id}] ERROR writing chat: {e}\n")
-                            f.flush()
-                    except:
-                        pass
+                # Queue for the dedicated chat file that the Go server monitors;
+                # the writer runs in the background so a slow disk can't stall us
+                if self.chat_writer.submit(chat_json, self.chat_counts):
+                    debuglog.debug("chat.sent", session=self.session_id, message=chat_msg)
+                else:
+                    debuglog.warning("chat.dropped", session=self.session_id, reason="queue full")
+                    self.display_chat_message({"username": "System", "message": "Chat is busy, message not sent"})
 
     def check_for_chat_messages(self):
-        """Check for incoming chat messages from file"""
+        """Check for incoming chat messages from the shared ring or the chat file"""
+        if self.chat_ring:
+            self.read_chat_ring()
+            return
         try:
-            chat_file = "/tmp/ssh-chat.log"
-            if os.path.exists(chat_file):
-                with open(chat_file, 'r') as f:
-                    lines = f.readlines()
-                
-                # Process new lines since last check
-                new_lines = lines[self.last_chat_line:]
-                for line in new_lines:
-                    line = line.strip()
-                    if line:
-                        try:
-                            msg = json.loads(line)
-                            # Don't display our own messages that come back from server
-                            # (we already displayed them immediately when sending)
-                            if msg.get("username") != self.username:
-                                self.display_chat_message(msg)
-                        except json.JSONDecodeError:
-                            # Silently ignore malformed JSON lines
-                            pass
-                
-                self.last_chat_line = len(lines)
+            lines = self.chat_reader.read_lines()
         except Exception:
             # Silently ignore file reading errors
-            pass
-        
-        # Schedule next check
-        self.set_timer(1.0, self.check_for_chat_messages)
+            lines = []
+        self.display_chat_lines(lines)
+
+    def read_chat_ring(self):
+        """Show new messages straight from shared memory, skipping our own undecoded"""
+        records, missed = self.chat_ring.read(self.username.encode())
+        if missed:
+            self.chat_buffer.append(f"... {missed} chat messages skipped (reading too slowly)")
+        for username, timestamp, message in records:
+            self.chat_buffer.append_chat(username, timestamp, message)
+        self.flush_incoming_chat()
+
+    def display_chat_lines(self, lines):
+        """Show chat log lines (JSON messages), rendering the whole batch at once"""
+        for line in lines:
+            line = line.strip()
+            if line:
+                try:
+                    msg = json.loads(line)
+                    # Don't display our own messages that come back from server
+                    # (we already displayed them immediately when sending)
+                    if msg.get("username") != self.username:
+                        self.display_chat_message(msg, flush=False)
+                except json.JSONDecodeError:
+                    # Silently ignore malformed JSON lines
+                    pass
+
+        if self.chat_buffer:
+            self.flush_incoming_chat()
+
+    def flush_incoming_chat(self):
+        """Draw newly received chat now, or in low-bandwidth mode once per CHAT_COALESCE"""
+        if not self.low_bandwidth:
+            self.chat_buffer.flush()
+        elif self.chat_buffer.dirty and self.chat_flush_timer is None:
+            self.chat_flush_timer = self.set_timer(CHAT_COALESCE, self._flush_chat_timer)
+
+    def _flush_chat_timer(self):
+        self.chat_flush_timer = None
+        self.chat_buffer.flush()
+
+    def poll_chat_messages(self):
+        """Fallback for platforms without inotify: check the chat file once a second"""
+        self.check_for_chat_messages()
+        self.set_timer(1.0, self.poll_chat_messages)
 
     def send_test_message(self):
         """Send a test message to verify chat functionality"""
         test_msg = f"Auto-test message from {self.username}"
-        sys.stderr.write(f"DEBUG: Sending auto-test message: {test_msg}\n")
-        sys.stderr.flush()
+        debuglog.debug("chat.test_message", session=self.session_id)
         self.send_chat_message(test_msg)
 
     def action_send_chat(self):
@@ -229,119 +333,276 @@ class BlackjackApp(App[str]):
             if message.strip():
                 self.send_chat_message(message)
                 self.chat_input.value = ""
-                sys.stderr.write(f"DEBUG: Chat message sent via action: '{message}'\n")
-                sys.stderr.flush()
+                debuglog.debug("chat.action", session=self.session_id)
 
     def on_mount(self):
+        self.profiler = profiling.for_session(self.session_id)
         self.console_log = self.query_one("#log", Static)
+        self.dealer_total = self.query_one("#dealer-total", Static)
+        self.player_total = self.query_one("#player-total", Static)
+        self.deal_button = self.query_one("#deal-button", Button)
+        self.hit_button = self.query_one("#hit-button", Button)
+        self.stand_button = self.query_one("#stand-button", Button)
+        self.hint_button = self.query_one("#hint-button", Button)
+        self.analysis_view = self.query_one("#analysis", Static)
+        self.table_view = self.query_one("#table-seats", Static)
+        self.bankroll_view = self.query_one("#bankroll", Static)
         self.chat_log = self.query_one("#chat-log", Static)
         self.chat_input = self.query_one("#chat-input", Input)
-        
-        # Debug: write session info to file
-        try:
-            with open('/tmp/python-startup-debug.log', 'a') as f:
-                f.write(f"Session ID: {self.session_id}\n")
-                f.write(f"Username: {self.username}\n")
-                f.write(f"Is local: {self.session_id == 'local'}\n")
-                f.flush()
-        except:
-            pass
+        self.analysis_view.display = self.analysis
+        if self.low_bandwidth:
+            # No press flash: each one costs two extra repaints
+            for button in (self.deal_button, self.hit_button, self.stand_button, self.hint_button):
+                button.active_effect_duration = 0
+        max_lines = int(os.getenv("BLACKJACK_CHAT_MAX_LINES", DEFAULT_MAX_LINES))
+        self.chat_buffer = ChatBuffer(self.chat_log, max_lines)
+        self.chat_writer = shared_writer("/tmp/ssh-chat-messages.log")
+        debuglog.info("session.start", session=self.session_id, username=self.username,
+                      local=self.session_id == "local")
         
         # Welcome message
         welcome_msg = f"Welcome {self.username}! You can chat with other players here."
-        self.chat_log.update(welcome_msg)
-        
-        # Start chat message monitoring
-        self.set_timer(1.0, self.check_for_chat_messages)
+        self.chat_buffer.append(welcome_msg)
+        self.chat_buffer.flush()
+        self.show_bankroll()
+
+        if self.tables is not None:
+            self.seat = self.tables.join(self.username, self.on_table_update)
+            self.round = self.seat.round
+            self.table_view.display = True
+            self.console_log.update(f"Seated at table {self.seat.table.id}. Press Deal to join the next round.")
+
+        # Everything else waits until the first frame is on screen
+        self.timeline.append(("mount", time.monotonic()))
+        self.call_after_refresh(self.after_first_paint)
+
+    def after_first_paint(self):
+        """Start-up work the first frame doesn't need: stats, chat history and monitoring"""
+        self.timeline.append(("after first paint", time.monotonic()))
+
+        # Bankroll and statistics persist for real sessions, or wherever a
+        # database is named explicitly
+        if not self.warm_up and (self.session_id != "local" or os.getenv("BLACKJACK_STATS_DB")):
+            self.stats = shared_store()
+            self.run_worker(self.load_bankroll(), group="stats")
+
+        # Start chat message monitoring: pushed by inotify, polled only as a fallback
+        if self.watch_chat:
+            from chat_watch import ChatFileWatcher
+
+            self.chat_watcher = ChatFileWatcher(CHAT_FILE, self.check_for_chat_messages)
+            if not self.chat_watcher.start():
+                self.set_timer(1.0, self.poll_chat_messages)
+
+        # Backfill only recent history: from the shared ring when the host runs
+        # one, else the tail of the active segment, topped up from sealed
+        # segments if that is short, instead of the whole log
+        backfill = int(os.getenv("BLACKJACK_CHAT_BACKFILL", BACKFILL_LINES))
+        ring_path = os.getenv("BLACKJACK_CHAT_RING")
+        if ring_path:
+            try:
+                self.chat_ring = RingReader(ring_path)
+                self.chat_ring.backfill(backfill)
+            except (OSError, ValueError):
+                self.chat_ring = None
+        if not self.chat_ring:
+            self.display_chat_lines(chat_backfill(self.chat_reader, backfill))
+        self.check_for_chat_messages()
         
         # Send a test message after 3 seconds if not in local mode
         if self.session_id != "local":
             self.set_timer(3.0, self.send_test_message)
 
+        if self.css_cache:
+            keep_parsed_css(self.stylesheet)
+            CSS_LAYOUTS_KEPT.add(self.css_cache)
+            self.css_cache = None
+        self.timeline.append(("deferred setup done", time.monotonic()))
+        self.setup_done = True
+        timeline_path = os.getenv("BLACKJACK_STARTUP_TIMELINE")
+        if timeline_path:
+            with open(timeline_path, "a") as f:
+                f.write(json.dumps({"pid": os.getpid(), "events": STARTUP_TIMELINE + self.timeline}) + "\n")
+
+    async def on_unmount(self):
+        if self.stats:
+            try:
+                await asyncio.wait_for(asyncio.wrap_future(self.stats.flush()), 5.0)
+            except asyncio.TimeoutError:
+                debuglog.warning("stats.flush_timeout", session=self.session_id)
+            except Exception as error:
+                debuglog.warning("stats.flush_failed", session=self.session_id, error=repr(error))
+        if self.seat is not None:
+            self.tables.leave(self.seat)
+        if self.chat_watcher:
+            self.chat_watcher.stop()
+        self.chat_reader.close()
+        if self.chat_ring:
+            self.chat_ring.close()
+        if self.chat_writer:
+            # Don't lose messages still queued when the session ends
+            counts = self.chat_counts
+            if counts.dropped or counts.delayed or counts.errors:
+                debuglog.warning("chat.writer", session=self.session_id, report=counts.report())
+            try:
+                await asyncio.wait_for(self.chat_writer.drain(), 5.0)
+            except asyncio.TimeoutError:
+                debuglog.warning("chat.drain_timeout", session=self.session_id, report=counts.report())
+        if self.profiler:
+            debuglog.info("profile.written", session=self.session_id, paths=self.profiler.stop())
+        debuglog.info("session.end", session=self.session_id)
+
     def deal_new_hand(self):
         """Deal a new hand to both player and dealer"""
-        # Clear containers
-        self.query_one("#player-hand", Horizontal).remove_children()
-        self.query_one("#dealer-hand", Horizontal).remove_children()
-        
-        # Clear hands
-        self.player_hand.clear()
-        self.dealer_hand.clear()
+        # Past the cut card: this hand comes from the next shoe, shuffled already
+        if self.shoes.start_round():
+            self.round.shoe = self.shoes.shoe
+            self.console_log.update("Shuffling a new shoe... Dealing new hand...")
 
         # Deal two cards each
-        self.player_hand.add(self.shoe.pop(0))
-        self.dealer_hand.add(self.shoe.pop(0))
-        self.player_hand.add(self.shoe.pop(0))
-        self.dealer_hand.add(self.shoe.pop(0))
-
-        # Render dealer hand (1 shown, 1 hidden)
-        dealer_container = self.query_one("#dealer-hand", Horizontal)
-        dealer_container.mount(self.dealer_hand.cards[0])
-        dealer_container.mount(Card("O", "?", "hidden"))  # Hidden card
-
-        # Render player hand
-        player_container = self.query_one("#player-hand", Horizontal)
-        for card in self.player_hand.cards:
-            player_container.mount(card)
+        self.round.deal()
+
+        # Refill the pooled card slots in place (dealer: 1 shown, 1 hidden)
+        self.show_cards(self.dealer_slots, self.dealer_hand.cards[:1])
+        self.dealer_slots[1].show_code(HIDDEN_CARD)
+        self.show_cards(self.player_slots, self.player_hand.cards)
+
+    def show_cards(self, slots, cards):
+        """Show `cards` in the first slots of a hand and hide the rest"""
+        for i, slot in enumerate(slots):
+            if i < len(cards):
+                slot.show_code(cards[i])
+            else:
+                slot.display = False
 
     def update_totals(self, reveal_dealer: bool = False):
         """Update the total displays for both hands"""
         player_total = self.player_hand.values()
         dealer_total = self.dealer_hand.values()
 
-        self.query_one("#player-total", Static).update(
-            f"Player Total: {player_total[0]} (Best: {player_total[1]})"
-        )
-        
+        self.set_text(self.player_total, f"Player Total: {player_total[0]} (Best: {player_total[1]})")
         if reveal_dealer:
-            self.query_one("#dealer-total", Static).update(
-                f"Dealer Total: {dealer_total[0]} (Best: {dealer_total[1]})"
-            )
+            self.set_text(self.dealer_total, f"Dealer Total: {dealer_total[0]} (Best: {dealer_total[1]})")
         else:
-            self.query_one("#dealer-total", Static).update("Dealer Total: ???")
+            self.set_text(self.dealer_total, "Dealer Total: ???")
 
-    def reveal_dealer_cards(self):
-        """Remove hidden card and show all dealer cards"""
-        hidden_card = self.query_one("#card-Ohidden", Card)
-        hidden_card.remove()
+    def set_text(self, widget: Static, text: str):
+        """Update a label only when its text actually changes"""
+        if self.texts.get(widget) != text:
+            self.texts[widget] = text
+            widget.update(text)
 
-        dealer_container = self.query_one("#dealer-hand", Horizontal)
-        for card in self.dealer_hand.cards[1:]:
-            dealer_container.mount(card)
+    def reveal_dealer_cards(self):
+        """Turn the hidden card over and show all dealer cards"""
+        self.show_cards(self.dealer_slots, self.dealer_hand.cards)
 
     def set_button_visibility(self, deal: bool = False, hit: bool = False, stand: bool = False):
         """Set visibility of game buttons"""
-        self.query_one("#deal-button", Button).visible = deal
-        self.query_one("#hit-button", Button).visible = hit
-        self.query_one("#stand-button", Button).visible = stand
+        self.deal_button.visible = deal
+        self.hit_button.visible = hit
+        self.stand_button.visible = stand
+        self.hint_button.visible = hit
 
     async def handle_dealer_turn(self):
         """Handle the dealer's turn following blackjack rules"""
-        dealer_container = self.query_one("#dealer-hand", Horizontal)
-        
-        while self.dealer_hand.values()[1] < 17:
-            card = self.shoe.pop(0)
-            self.dealer_hand.add(card)
-            dealer_container.mount(card)
-            self.console_log.update(f"Dealer drew: {card}")
-            self.update_totals(reveal_dealer=True)
-            await asyncio.sleep(1)
+        while self.round.dealer_should_draw():
+            card = self.round.dealer_draw()
+            with self.batch_update():
+                self.show_cards(self.dealer_slots, self.dealer_hand.cards)
+                self.console_log.update(f"Dealer drew: {card_label(card)}")
+                self.update_totals(reveal_dealer=True)
+            await self.pause()
+
+    async def pause(self):
+        """Wait one pacing step, or not at all once the animation is skipped"""
+        if self.step_delay <= 0 or self.skip_animation.is_set():
+            return
+        try:
+            await asyncio.wait_for(self.skip_animation.wait(), self.step_delay)
+        except asyncio.TimeoutError:
+            pass
 
     def determine_winner(self) -> str:
         """Determine the winner and return result message"""
-        player_best = self.player_hand.values()[1]
-        dealer_best = self.dealer_hand.values()[1]
-
-        if player_best > 21:
-            return "Player busts! Dealer wins."
-        elif dealer_best > 21:
-            return "Dealer busts! Player wins!"
-        elif player_best > dealer_best:
-            return "Player wins!"
-        elif player_best < dealer_best:
-            return "Dealer wins!"
-        else:
-            return "It's a tie!"
+        return self.record_outcome(self.round.settle())
+
+    def record_outcome(self, outcome: str) -> str:
+        """Settle the bet on a finished hand, queue it for the stats store and describe it"""
+        net = payout(outcome, self.bet)
+        self.session_net += net
+        if self.stats:
+            self.stats.record(self.username, outcome, self.bet)
+        if self.profiler:
+            self.profiler.hand_finished()
+        self.show_bankroll()
+        return f"{RESULT_MESSAGES[outcome]} ({net:+d})"
+
+    async def load_bankroll(self):
+        """Fetch the stored bankroll without blocking the loop on SQLite"""
+        try:
+            row = await asyncio.wrap_future(self.stats.load(self.username))
+        except Exception as error:
+            # Play on from the starting bankroll; the store logged why
+            debuglog.warning("stats.load_failed", session=self.session_id, error=repr(error))
+            return
+        # Hands settled meanwhile are queued after the load, so add them on top
+        self.bankroll = row["bankroll"]
+        self.show_bankroll()
+
+    def check_bet(self) -> bool:
+        """True if the bankroll covers the bet; otherwise say so and deal nothing"""
+        if self.bankroll + self.session_net >= self.bet:
+            return True
+        self.console_log.update(f"Not enough chips for a {self.bet} bet: "
+                                f"your bankroll is {self.bankroll + self.session_net}.")
+        return False
+
+    def show_bankroll(self):
+        self.set_text(self.bankroll_view, f"Bankroll: {self.bankroll + self.session_net}   Bet: {self.bet}")
+
+    def on_table_update(self, diff: dict):
+        """Table broadcast callback; the diff is applied in the app's own turn"""
+        self.call_later(self.show_table, diff)
+
+    def show_table(self, diff: dict):
+        """Apply a state diff broadcast by the shared table"""
+        state = self.table_state
+        state.update(diff)
+        me = self.seat.key()
+        _, cards, values, status, ready, result = state[me]
+        with self.batch_update():
+            if "dealer" in diff:
+                self.show_cards(self.dealer_slots, diff["dealer"])
+            if "dealer_total" in diff:
+                total = diff["dealer_total"]
+                self.set_text(self.dealer_total, "Dealer Total: ???" if total is None else
+                              f"Dealer Total: {total[0]} (Best: {total[1]})")
+            if me in diff:
+                self.show_cards(self.player_slots, cards)
+                self.set_text(self.player_total, f"Player Total: {values[0]} (Best: {values[1]})")
+            if any(key.startswith("seat") and key != me for key in diff):
+                self.set_text(self.table_view, self.describe_other_seats())
+
+            if diff.get("message"):
+                self.console_log.update(diff["message"])
+            if "in_round" in diff and not state["in_round"] and result:
+                self.console_log.update(self.record_outcome(result))
+
+            my_turn = state["turn"] == self.seat.index
+            self.set_button_visibility(deal=not ready and status != PLAYING, hit=my_turn, stand=my_turn)
+            if my_turn and ("turn" in diff or me in diff):
+                self.request_analysis()
+
+    def describe_other_seats(self) -> str:
+        """One line per other player at the table: cards, total and status"""
+        lines = []
+        for key, seat in self.table_state.items():
+            if key.startswith("seat") and seat is not None and key != self.seat.key():
+                username, cards, values, status, ready, result = seat
+                hand = " ".join(card_label(card) for card in cards)
+                note = RESULT_MESSAGES[result] if result and status != PLAYING else status
+                lines.append(f"{username}: {hand or '-'} ({values[1]}) {note}{' (ready)' if ready else ''}")
+        return "\n".join(lines)
 
     def compose(self) -> ComposeResult:
         """Compose the initial UI layout"""
@@ -350,104 +611,209 @@ class BlackjackApp(App[str]):
             with Vertical(id="game-area"):
                 yield Static("Dealer Total: ???", id="dealer-total")
                 with Horizontal(id="dealer-hand"):
-                    pass
+                    yield from self.dealer_slots
                 yield Static("Player Total: 0 (Best: 0)", id="player-total")
                 with Horizontal(id="player-hand"):
-                    pass
+                    yield from self.player_slots
+                table_seats = Static("", id="table-seats")
+                table_seats.display = False
+                yield table_seats
 
                 with Horizontal(id="button-row"):
-                    yield Button("Deal", id="deal-button")
+                    compact = self.low_bandwidth
+                    yield Button("Deal", id="deal-button", compact=compact)
                     
-                    hit_button = Button("Hit", id="hit-button")
+                    hit_button = Button("Hit", id="hit-button", compact=compact)
                     hit_button.visible = False
                     yield hit_button
                     
-                    stand_button = Button("Stand", id="stand-button")
+                    stand_button = Button("Stand", id="stand-button", compact=compact)
                     stand_button.visible = False
                     yield stand_button
+
+                    hint_button = Button("Hint", id="hint-button", compact=compact)
+                    hint_button.visible = False
+                    yield hint_button
                     
+                yield Static("", id="bankroll")
                 yield Static("Welcome to Blackjack! Press Deal to start.", id="log")
+                yield Static("", id="analysis")
             
             # Right side - Chat
             with Vertical(id="chat-area"):
                 yield Static("💬 Chat", id="chat-title")
                 yield Static("", id="chat-log", classes="chat-log")
-                yield Input(placeholder="Type a message and press Enter...", id="chat-input")
+                chat_input = Input(placeholder="Type a message and press Enter...", id="chat-input",
+                                   compact=self.low_bandwidth)
+                chat_input.cursor_blink = not self.low_bandwidth  # a blink is a repaint twice a second
+                yield chat_input
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button press events"""
-        if event.button.id == "deal-button":
+        if self.seat is not None and event.button.id in TABLE_ACTIONS:
+            action = TABLE_ACTIONS[event.button.id]
+            if action != DEAL or self.check_bet():
+                self.seat.table.send(self.seat, action)
+        elif event.button.id == "deal-button":
             await self.handle_deal()
         elif event.button.id == "hit-button":
             await self.handle_hit()
         elif event.button.id == "stand-button":
             await self.handle_stand()
+        elif event.button.id == "hint-button":
+            self.handle_hint()
         else:
             self.console_log.update(f"Unknown button pressed: {event.button.id}")
 
     async def on_input_submitted(self, event: Input.Submitted) -> None:
         """Handle chat input submission"""
-        sys.stderr.write(f"DEBUG: Input submitted event triggered for {event.input.id}\n")
-        sys.stderr.flush()
+        debuglog.debug("input.submitted", session=self.session_id, input=event.input.id)
         
         if event.input.id == "chat-input":
             message = event.input.value
-            sys.stderr.write(f"DEBUG: Chat input received: '{message}'\n")
-            sys.stderr.flush()
-            
             if message.strip():
                 self.send_chat_message(message)
                 event.input.value = ""
-                sys.stderr.write(f"DEBUG: Chat message sent and input cleared\n")
-                sys.stderr.flush()
             else:
-                sys.stderr.write(f"DEBUG: Empty message, not sending\n")
-                sys.stderr.flush()
+                debuglog.debug("chat.empty", session=self.session_id)
         
         # Prevent the key binding from also triggering
         event.stop()
 
     async def handle_deal(self):
         """Handle the deal button press"""
-        self.console_log.update("Dealing new hand...")
-        self.deal_new_hand()
-        self.update_totals(reveal_dealer=False)
-        
-        if self.player_hand.is_blackjack():
-            self.console_log.update("Blackjack! Player wins immediately.")
-            self.reveal_dealer_cards()
-            self.update_totals(reveal_dealer=True)
-            self.set_button_visibility(deal=True)
-        else:
-            self.set_button_visibility(hit=True, stand=True)
+        if not self.check_bet():
+            return
+        if self.dealer_worker is not None:
+            # Mid-animation: finish the round at once, then deal
+            self.deal_queued = True
+            self.skip_animation.set()
+            return
+        with self.batch_update():
+            self.console_log.update("Dealing new hand...")
+            self.deal_new_hand()
+            self.update_totals(reveal_dealer=False)
+
+            if self.player_hand.is_blackjack():
+                self.console_log.update(self.record_outcome(PLAYER_BLACKJACK))
+                self.reveal_dealer_cards()
+                self.update_totals(reveal_dealer=True)
+                self.set_button_visibility(deal=True)
+            else:
+                self.set_button_visibility(hit=True, stand=True)
+                self.request_analysis()
 
     async def handle_hit(self):
         """Handle the hit button press"""
-        card = self.shoe.pop(0)
-        self.player_hand.add(card)
-        self.console_log.update(f"Player drew: {card}")
-        self.query_one("#player-hand", Horizontal).mount(card)
-        self.update_totals(reveal_dealer=False)
-
-        if self.player_hand.values()[1] > 21:
-            self.console_log.update("Player busts!")
-            self.reveal_dealer_cards()
-            self.update_totals(reveal_dealer=True)
-            self.set_button_visibility(deal=True)
+        card = self.round.hit()
+        with self.batch_update():
+            self.console_log.update(f"Player drew: {card_label(card)}")
+            self.show_cards(self.player_slots, self.player_hand.cards)
+            self.update_totals(reveal_dealer=False)
+
+            if self.round.player_bust():
+                self.console_log.update(self.record_outcome(PLAYER_BUST))
+                self.reveal_dealer_cards()
+                self.update_totals(reveal_dealer=True)
+                self.set_button_visibility(deal=True)
+            else:
+                self.request_analysis()
 
     async def handle_stand(self):
         """Handle the stand button press"""
-        self.console_log.update("Player stands")
-        self.reveal_dealer_cards()
-        self.update_totals(reveal_dealer=True)
-        await asyncio.sleep(1)
+        with self.batch_update():
+            self.console_log.update("Player stands")
+            # Deal stays pressable while the dealer plays: it skips to the end
+            self.set_button_visibility(deal=True)
+            self.reveal_dealer_cards()
+            self.update_totals(reveal_dealer=True)
+
+        # Play the dealer out in a worker so input keeps being handled meanwhile
+        self.skip_animation.clear()
+        self.dealer_worker = self.run_worker(self.finish_round(), exclusive=True, group="dealer")
 
+    async def finish_round(self):
+        """Dealer's turn and the result, paced by the session's pacing profile"""
+        await self.pause()
         await self.handle_dealer_turn()
-        
+
         result = self.determine_winner()
-        self.console_log.update(result)
-        self.set_button_visibility(deal=True)
+        with self.batch_update():
+            self.console_log.update(result)
+            self.set_button_visibility(deal=True)
+        self.dealer_worker = None
+        if self.deal_queued:
+            self.deal_queued = False
+            await self.handle_deal()
+
+    def handle_hint(self):
+        """Show the basic-strategy play and its EV for the current hand"""
+        if self.strategy is not None:
+            self.show_hint()
+            return
+        self.console_log.update("Hint: working out the odds...")
+
+        # A cold cache means building the whole table: do it off the event loop
+        def work():
+            from strategy import load_table
+            try:
+                strategy = load_table(DEFAULT_DECKS)
+            except Exception as error:
+                debuglog.error("hint.failed", session=self.session_id, error=repr(error))
+                self.call_from_thread(self.console_log.update, "Hint unavailable right now.")
+                return
+            self.call_from_thread(self.strategy_loaded, strategy)
+
+        self.run_worker(work, thread=True, exclusive=True, group="strategy", exit_on_error=False)
+
+    def strategy_loaded(self, strategy):
+        self.strategy = strategy
+        if self.hint_button.visible:  # still the player's turn
+            self.show_hint()
+
+    def show_hint(self):
+        play, stand_ev, hit_ev = self.strategy.advise(self.player_hand, self.dealer_hand.cards[0])
+        self.console_log.update(
+            f"Hint: {play} (EV {max(stand_ev, hit_ev):+.3f}; stand {stand_ev:+.3f}, hit {hit_ev:+.3f})"
+        )
+
+    def action_toggle_analysis(self):
+        """Turn live composition-dependent EV analysis on or off"""
+        self.analysis = not self.analysis
+        self.analysis_view.display = self.analysis
+        if self.analysis and self.hit_button.visible:
+            self.request_analysis()
+
+    def request_analysis(self):
+        """Solve the current decision against the live shoe in a worker thread"""
+        if not self.analysis:
+            return
+        from live_ev import solve, unseen_counts
+
+        # Snapshot the state here; the shoe keeps changing on the event loop
+        state = (
+            unseen_counts(self.shoe, self.dealer_hand.cards[1]),
+            self.player_hand.hard,
+            self.player_hand.aces > 0,
+            CARD_VALUES[self.dealer_hand.cards[0]],
+        )
+        self.analysis_state = state
+        self.analysis_view.update("Live EV: solving...")
+
+        def work():
+            stand_ev, hit_ev = solve(*state)
+            self.call_from_thread(self.show_analysis, state, stand_ev, hit_ev)
+
+        self.run_worker(work, thread=True, exclusive=True, group="analysis")
+
+    def show_analysis(self, state, stand_ev: float, hit_ev: float):
+        if state is not self.analysis_state:
+            return  # the hand moved on while we were solving
+        play = "Hit" if hit_ev > stand_ev else "Stand"
+        self.analysis_view.update(
+            f"Live EV ({sum(state[0])} unseen): {play} (stand {stand_ev:+.3f}, hit {hit_ev:+.3f})"
+        )
 
 if __name__ == "__main__":
     app = BlackjackApp()
-    app.run()
\ No newline at end of file
+    app.run()
\ No newline at end of file
@@ -70,7 +70,7 @@ func (sm *SessionManager) BroadcastMessage(msg ChatMessage) {
 	log.Printf("Broadcasting message from %s: %s", msg.Username, msg.Message)
 	
 	// Write to chat file for all sessions to read
-	chatFile := "/tmp/ssh-chat.log"
+	chatFile := "/tmp/ssh-chat/ssh-chat.log"
 	file, err := os.OpenFile(chatFile, os.O_APPEND|os.O_CREATE|os.O_WRONLY, 0644)
 	if err == nil {
 		messageData, _ := json.Marshal(msg)
@@ -93,7 +93,8 @@ func (sm *SessionManager) GetActiveUsers() []string {
 
 func main() {
 	// Clean up chat file on start
-	os.Remove("/tmp/ssh-chat.log")
+	os.Remove("/tmp/ssh-chat/ssh-chat.log")
+	os.MkdirAll("/tmp/ssh-chat", 0755)
 	
 	ssh.Handle(func(s ssh.Session) {
 		// Generate a unique session ID
@@ -0,0 +1,237 @@
+"""Opt-in profiling and allocation tracing for individual sessions.
+
+Nothing happens unless one of these is set:
+
+  BLACKJACK_PROFILE=cprofile   cProfile over the session's event loop
+  BLACKJACK_PROFILE=sample     a thread that samples the loop's stack every
+                               BLACKJACK_PROFILE_INTERVAL seconds (default
+                               0.005); much cheaper than cProfile
+  BLACKJACK_TRACEMALLOC=N      tracemalloc snapshots at mount and every N hands
+
+Which sessions are profiled: the one whose SSH_SESSION_ID equals
+BLACKJACK_PROFILE_SESSION, else a random BLACKJACK_PROFILE_RATE fraction
+of them (default all). Output goes to BLACKJACK_PROFILE_DIR (default /tmp)
+as blackjack-<session>-<pid>.prof (pstats), .folded (sampled stacks, one
+"frame;frame;frame count" line per stack, for flamegraph tools) and
+-alloc.txt (top allocations of each snapshot against the one at mount).
+It is written when the session ends and whenever the process gets SIGUSR2.
+
+Profilers and tracemalloc see the whole process, so when ssh_host.py runs
+many sessions on one loop only one session at a time is profiled and its
+files cover everything that loop did meanwhile.
+
+With the switches unset, for_session() returns None and the app's hooks
+are a None check.
+"""
+import atexit
+import os
+import random
+import re
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = ("cprofile", "sample")
+DEFAULT_INTERVAL = 0.005
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 25
+
+mode = None  # None when profiling is off
+snapshot_every = 0  # hands between tracemalloc snapshots; 0 when off
+active = []  # running SessionProfilers
+_installed = False
+
+# cProfile and tracemalloc are imported when first needed, keeping them off
+# every session's start-up path
+
+
+def configure(env=None):
+    """(Re)read the environment; starts tracemalloc early so the mount snapshot means something"""
+    global mode, snapshot_every
+    env = os.environ if env is None else env
+    mode = env.get("BLACKJACK_PROFILE", "").lower() or None
+    if mode not in MODES:
+        mode = None
+    snapshot_every = int(env.get("BLACKJACK_TRACEMALLOC", "0") or 0)
+    if snapshot_every:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+
+def for_session(session_id: str, env=None) -> "SessionProfiler":
+    """A started profiler if this session is to be profiled, else None"""
+    if mode is None and not snapshot_every:
+        return None
+    env = os.environ if env is None else env
+    only = env.get("BLACKJACK_PROFILE_SESSION")
+    if only:
+        if session_id != only:
+            return None
+    elif random.random() >= float(env.get("BLACKJACK_PROFILE_RATE", "1")):
+        return None
+    if active:
+        return None  # one at a time: the profilers are per process
+    profiler = SessionProfiler(session_id, env.get("BLACKJACK_PROFILE_DIR", "/tmp"),
+                               float(env.get("BLACKJACK_PROFILE_INTERVAL", DEFAULT_INTERVAL)))
+    profiler.start()
+    return profiler
+
+
+class StackSampler:
+    """Counts the stacks seen on one thread, sampled from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+                self.samples += 1
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            counts = dict(self.counts)  # the sampler thread may still be adding to it
+            for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+
+
+class SessionProfiler:
+    def __init__(self, session_id: str, directory: str, interval: float = DEFAULT_INTERVAL):
+        tag = re.sub(r"[^\w.-]", "_", session_id)
+        self.prefix = os.path.join(directory, f"blackjack-{tag}-{os.getpid()}")
+        self.interval = interval
+        self.profile = None
+        self.sampler = None
+        self.hands = 0
+        self.baseline = None  # tracemalloc snapshot at mount
+        self.writer = None  # compares and writes snapshots off the event loop, in order
+        self.started = time.time()
+
+    def start(self):
+        if mode == "cprofile":
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif mode == "sample":
+            self.sampler = StackSampler(threading.get_ident(), self.interval)
+            self.sampler.start()
+        if snapshot_every:
+            import tracemalloc
+
+            self.writer = ThreadPoolExecutor(1, thread_name_prefix="profile-alloc")
+            self.baseline = tracemalloc.take_snapshot()
+            self._snapshot("mount", self.baseline)
+        active.append(self)
+        _install()
+
+    def hand_finished(self):
+        self.hands += 1
+        if snapshot_every and self.hands % snapshot_every == 0:
+            self._snapshot(f"after {self.hands} hands")
+
+    def dump(self) -> list:
+        """Write what has been collected so far; returns the paths written"""
+        paths = []
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(f"{self.prefix}.prof")
+            self.profile.enable()
+            paths.append(f"{self.prefix}.prof")
+        if self.sampler is not None:
+            self.sampler.write(f"{self.prefix}.folded")
+            paths.append(f"{self.prefix}.folded")
+        if self.baseline is not None:
+            paths.append(f"{self.prefix}-alloc.txt")
+        return paths
+
+    def stop(self) -> list:
+        """Stop profiling and write the files"""
+        if self not in active:
+            return []
+        active.remove(self)
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.writer is not None:
+            self._snapshot(f"at exit, {self.hands} hands")
+            self.writer.shutdown()
+        paths = self.dump()
+        if self.profile is not None:
+            self.profile.disable()
+        return paths
+
+    def _snapshot(self, label: str, snapshot=None):
+        """Take a snapshot now; grouping and comparing it takes seconds, so that is left to the writer"""
+        import tracemalloc
+
+        snapshot = snapshot or tracemalloc.take_snapshot()
+        self.writer.submit(self._write_allocations, snapshot, label, *tracemalloc.get_traced_memory(),
+                           time.time() - self.started)
+
+    def _write_allocations(self, snapshot, label: str, current: int, peak: int, elapsed: float):
+        file_mode = "w" if snapshot is self.baseline else "a"
+        with open(f"{self.prefix}-alloc.txt", file_mode) as f:
+            f.write(f"== {label} ({elapsed:.1f}s): "
+                    f"{current / 1024:.0f} KiB traced, peak {peak / 1024:.0f} KiB\n")
+            if snapshot is self.baseline:
+                stats = snapshot.statistics("lineno")
+            else:
+                stats = snapshot.compare_to(self.baseline, "lineno")
+            for stat in stats[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+
+def dump_all() -> list:
+    paths = []
+    for profiler in list(active):
+        try:
+            paths += profiler.dump()
+        except OSError:
+            pass
+    return paths
+
+
+def dump_if_enabled():
+    """For processes that leave through os._exit, which skips atexit"""
+    for profiler in list(active):
+        try:
+            profiler.stop()
+        except OSError:
+            pass
+
+
+def _install():
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    atexit.register(dump_if_enabled)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR2, lambda *_: dump_all())
+
+
+configure()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Vectorised Monte Carlo simulation of the table rules in engine.py.
+
+Plays many shoes side by side as NumPy arrays, one lane per shoe, and fans
+batches out over a process pool. The rules match the game: the dealer draws
+while their best total is under 17, a two-card 21 for the player settles
+immediately, and everything else is settled like Round.settle(). The player
+hits while their best total is below --stand-on.
+
+    python simulate.py --hands 100000000 --workers 8 --seed 42
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # the game itself doesn't need NumPy
+    np = None
+
+from engine import SUITS
+
+# Blackjack value of each rank index, aces counted as 1
+RANK_VALUES = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10]
+
+
+def best_totals(hard, has_ace):
+    """Vectorised Hand.values()[1]: count one ace as 11 when it doesn't bust"""
+    soft = hard + 10
+    return np.where(has_ace & (soft <= 21), soft, hard)
+
+
+def simulate_batch(rng, lanes, num_decks=6, stand_on=17, blackjack_pays=1.5):
+    """Play every shoe in a batch of `lanes` shoes down to its cut card.
+
+    Returns a dict of totals: hands, wins, losses, pushes, blackjacks, player
+    and dealer busts, plus the sum and sum of squares of the payoff per hand.
+    """
+    deck = np.repeat(np.array(RANK_VALUES, dtype=np.int8), len(SUITS))
+    shoes = rng.permuted(np.tile(deck, (lanes, num_decks)), axis=1)
+    # Rounds start only before the cut card, as a dealer would play it
+    cut = shoes.shape[1] - rng.integers(60, 76, size=lanes)
+    cursor = np.zeros(lanes, dtype=np.int64)
+    rows = np.arange(lanes)
+
+    totals = dict.fromkeys(
+        ("hands", "wins", "losses", "pushes", "blackjacks", "player_busts", "dealer_busts"), 0
+    )
+    payoff_sum = 0.0
+    payoff_sq_sum = 0.0
+
+    def draw(mask):
+        lane = rows[mask]
+        cards = shoes[lane, cursor[lane]]
+        cursor[lane] += 1
+        return lane, cards
+
+    active = cursor < cut
+    while active.any():
+        lane = rows[active]
+        cards = shoes[lane[:, None], cursor[lane][:, None] + np.arange(4)]
+        cursor[lane] += 4
+
+        p_hard = np.zeros(lanes, dtype=np.int16)
+        d_hard = np.zeros(lanes, dtype=np.int16)
+        p_ace = np.zeros(lanes, dtype=bool)
+        d_ace = np.zeros(lanes, dtype=bool)
+        # Dealt player, dealer, player, dealer
+        p_hard[lane] = cards[:, 0] + cards[:, 2]
+        d_hard[lane] = cards[:, 1] + cards[:, 3]
+        p_ace[lane] = (cards[:, 0] == 1) | (cards[:, 2] == 1)
+        d_ace[lane] = (cards[:, 1] == 1) | (cards[:, 3] == 1)
+
+        natural = active & (best_totals(p_hard, p_ace) == 21)
+
+        hitting = active & ~natural & (best_totals(p_hard, p_ace) < stand_on)
+        while hitting.any():
+            hit_lane, hit_cards = draw(hitting)
+            p_hard[hit_lane] += hit_cards
+            p_ace[hit_lane] |= hit_cards == 1
+            hitting &= (p_hard <= 21) & (best_totals(p_hard, p_ace) < stand_on)
+
+        player_bust = active & (p_hard > 21)
+        dealer_plays = active & ~natural & ~player_bust
+        drawing = dealer_plays & (best_totals(d_hard, d_ace) < 17)
+        while drawing.any():
+            draw_lane, draw_cards = draw(drawing)
+            d_hard[draw_lane] += draw_cards
+            d_ace[draw_lane] |= draw_cards == 1
+            drawing &= best_totals(d_hard, d_ace) < 17
+
+        dealer_bust = dealer_plays & (d_hard > 21)
+        p_best = best_totals(p_hard, p_ace)
+        d_best = best_totals(d_hard, d_ace)
+        compared = dealer_plays & ~dealer_bust
+        won = natural | dealer_bust | (compared & (p_best > d_best))
+        lost = player_bust | (compared & (p_best < d_best))
+        pushed = compared & (p_best == d_best)
+
+        payoff = np.where(natural, blackjack_pays, 0.0)
+        payoff += (won & ~natural) * 1.0
+        payoff -= lost * 1.0
+        payoff = payoff[active]
+
+        totals["hands"] += int(active.sum())
+        totals["wins"] += int(won.sum())
+        totals["losses"] += int(lost.sum())
+        totals["pushes"] += int(pushed.sum())
+        totals["blackjacks"] += int(natural.sum())
+        totals["player_busts"] += int(player_bust.sum())
+        totals["dealer_busts"] += int(dealer_bust.sum())
+        payoff_sum += float(payoff.sum())
+        payoff_sq_sum += float((payoff * payoff).sum())
+
+        active = cursor < cut
+
+    totals["payoff_sum"] = payoff_sum
+    totals["payoff_sq_sum"] = payoff_sq_sum
+    return totals
+
+
+def _run_worker(seed_seq, hands, lanes, num_decks, stand_on, blackjack_pays):
+    """Process-pool entry point: play batches until at least `hands` are done"""
+    rng = np.random.default_rng(seed_seq)
+    combined = None
+    while combined is None or combined["hands"] < hands:
+        batch = simulate_batch(rng, lanes, num_decks, stand_on, blackjack_pays)
+        if combined is None:
+            combined = batch
+        else:
+            for key, value in batch.items():
+                combined[key] += value
+    return combined
+
+
+def simulate(hands, workers=None, seed=None, lanes=10_000, num_decks=6, stand_on=17,
+             blackjack_pays=1.5):
+    """Run `hands` hands (rounded up to whole batches) and return a report dict.
+
+    With the same seed, worker count and lane count the result is identical
+    from run to run.
+    """
+    if np is None:
+        raise RuntimeError("simulate.py needs NumPy: pip install numpy")
+
+    workers = workers or os.cpu_count() or 1
+    children = np.random.SeedSequence(seed).spawn(workers)
+    quota = math.ceil(hands / workers)
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_run_worker(children[0], quota, lanes, num_decks, stand_on, blackjack_pays)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_worker, child, quota, lanes, num_decks, stand_on, blackjack_pays)
+                for child in children
+            ]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    combined = dict.fromkeys(results[0], 0)
+    for result in results:
+        for key, value in result.items():
+            combined[key] += value
+    return build_report(combined, elapsed, seed, workers, num_decks, stand_on, blackjack_pays)
+
+
+def build_report(totals, elapsed, seed, workers, num_decks, stand_on, blackjack_pays):
+    n = totals["hands"]
+    ev = totals["payoff_sum"] / n
+    variance = max(totals["payoff_sq_sum"] / n - ev * ev, 0.0)
+    half_width = 1.96 * math.sqrt(variance / n)
+    return {
+        "rules": {
+            "num_decks": num_decks,
+            "stand_on": stand_on,
+            "blackjack_pays": blackjack_pays,
+            "dealer_stands_on": 17,
+        },
+        "seed": seed,
+        "workers": workers,
+        "hands": n,
+        "seconds": round(elapsed, 3),
+        "hands_per_second": round(n / elapsed) if elapsed else None,
+        "win_rate": totals["wins"] / n,
+        "loss_rate": totals["losses"] / n,
+        "push_rate": totals["pushes"] / n,
+        "blackjack_rate": totals["blackjacks"] / n,
+        "player_bust_rate": totals["player_busts"] / n,
+        "dealer_bust_rate": totals["dealer_busts"] / n,
+        "ev": ev,
+        "ev_ci95": [ev - half_width, ev + half_width],
+        "house_edge": -ev,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the blackjack table rules")
+    parser.add_argument("--hands", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--lanes", type=int, default=10_000, help="shoes played side by side per batch")
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--stand-on", type=int, default=17, help="player hits while best total is below this")
+    parser.add_argument("--blackjack-pays", type=float, default=1.5)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = simulate(args.hands, args.workers, args.seed, args.lanes, args.decks,
+                      args.stand_on, args.blackjack_pays)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    low, high = report["ev_ci95"]
+    print(f"Hands:       {report['hands']:,} in {report['seconds']}s "
+          f"({report['hands_per_second']:,} hands/s, {report['workers']} workers)")
+    print(f"Win/Loss/Push: {report['win_rate']:.4%} / {report['loss_rate']:.4%} / {report['push_rate']:.4%}")
+    print(f"Blackjacks:  {report['blackjack_rate']:.4%}")
+    print(f"Busts:       player {report['player_bust_rate']:.4%}, dealer {report['dealer_bust_rate']:.4%}")
+    print(f"EV per hand: {report['ev']:+.5f} (95% CI {low:+.5f} .. {high:+.5f})")
+    print(f"House edge:  {report['house_edge']:.4%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Serve many blackjack sessions from one Python process over SSH.
+
+Instead of one PTY and one interpreter per player, every connection gets a
+BlackjackApp running on the shared asyncio loop with a Textual driver that
+reads and writes the SSH channel directly. The CSS is parsed once up front
+and shared by every session. `--workers N` forks N copies of the server
+bound to the same port (SO_REUSEPORT) so the kernel spreads connections
+across cores; worker 0 also relays chat in place of the Go server. A
+single inotify watch per worker wakes every session when the chat log
+changes, rather than one watch per session, and sessions read new messages
+from a shared-memory ring (chat_ring.py) that the relay fills. With
+`--seats N`, players sit together at shared tables (table.py) of up to N,
+one shoe and dealer per table; tables are per worker.
+
+    python ssh_host.py --port 2224 --workers 4
+    ssh -p 2224 alice@localhost
+
+Requires asyncssh (`pip install asyncssh`).
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import resource
+import shutil
+import signal
+import sys
+import time
+
+try:
+    import asyncssh
+except ImportError:  # only needed to actually serve
+    asyncssh = None
+
+from textual import events
+from textual._xterm_parser import XTermParser
+from textual.driver import Driver
+from textual.geometry import Size
+
+import chat_ring
+import chat_store
+from chat_ring import ChatRing
+from chat_store import ChatStore
+from chat_tail import ChatTailReader
+from chat_watch import ChatFileWatcher
+import debuglog
+from frame_cap import FrameCap
+import profiling
+from strategy import default_cache_dir
+from table import TURN_TIMEOUT, TableCoordinator
+
+DEFAULT_PORT = 2224
+CHAT_FILE = chat_store.CHAT_FILE
+CHAT_MESSAGES_FILE = "/tmp/ssh-chat-messages.log"
+ESCAPE_TIMEOUT = 0.1  # a lone ESC is a key press once no more bytes follow
+
+
+class ChannelDriver(FrameCap, Driver):
+    """Textual driver bound to one SSH session instead of a terminal.
+
+    Output written during one loop iteration is sent as a single channel
+    write, no more often than the app's `frame_interval` (see frame_cap);
+    input is parsed with Textual's own xterm parser. `mouse_motion=False`
+    asks the terminal for clicks only.
+    """
+
+    def __init__(self, process, app, *, debug=False, mouse=True, size=None,
+                 frame_interval=0.0, mouse_motion=True):
+        super().__init__(app, debug=debug, mouse=mouse, size=size, frame_interval=frame_interval)
+        self._process = process
+        self._mouse_motion = mouse_motion
+        self._parser = XTermParser()
+        self._reader = None
+        self._tick = None
+
+    def _emit(self, data: str):
+        try:
+            self._process.stdout.write(data)
+        except (BrokenPipeError, OSError):
+            pass  # client already gone; the reader ends the app
+
+    def start_application_mode(self) -> None:
+        width, height = self._size
+        self.process_message(events.Resize(Size(width, height), Size(width, height)))
+        self.write("\x1b[?1049h")  # alt screen
+        if self._mouse:
+            motion = "\x1b[?1003h" if self._mouse_motion else ""
+            self.write(f"\x1b[?1000h{motion}\x1b[?1015h\x1b[?1006h")
+        self.write("\x1b[?25l")  # hide cursor
+        self.write("\x1b[?2004h")  # bracketed paste
+        self._send()
+        self._reader = self._loop.create_task(self._read_input())
+
+    def disable_input(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._tick is not None:
+            self._tick.cancel()
+            self._tick = None
+
+    def stop_application_mode(self) -> None:
+        self.disable_input()
+        self.write("\x1b[?2004l")
+        if self._mouse:
+            self.write("\x1b[?1000l\x1b[?1003l\x1b[?1015l\x1b[?1006l")
+        self.write("\x1b[?1049l\x1b[?25h")
+        self._send()
+
+    def _feed(self, data: str):
+        for event in self._parser.feed(data):
+            self.process_message(event)
+        if self._tick is not None:
+            self._tick.cancel()
+        self._tick = self._loop.call_later(ESCAPE_TIMEOUT, self._on_tick)
+
+    def _on_tick(self):
+        self._tick = None
+        for event in self._parser.tick():
+            self.process_message(event)
+
+    async def _read_input(self):
+        stdin = self._process.stdin
+        while True:
+            try:
+                data = await stdin.read(4096)
+            except asyncssh.TerminalSizeChanged as change:
+                size = Size(change.width, change.height)
+                self.process_message(events.Resize(size, size))
+                continue
+            except (asyncssh.Error, OSError):
+                data = ""
+            if not data:
+                self._app.exit()
+                return
+            self._feed(data)
+
+
+class ChatHub:
+    """Tell every session in this process when the shared chat log changes"""
+
+    def __init__(self, path: str = CHAT_FILE):
+        self.apps = set()
+        self.watcher = ChatFileWatcher(path, self.notify)
+        self.timer = None
+
+    def start(self):
+        if not self.watcher.start():
+            self.timer = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(1.0)
+            self.notify()
+
+    def notify(self):
+        for app in self.apps:
+            if app.chat_buffer is not None:  # mounted
+                app.check_for_chat_messages()
+
+
+chat_hub = None
+tables = None  # TableCoordinator when sessions sit at shared tables
+
+
+async def run_session(process):
+    """Run one BlackjackApp for the lifetime of an SSH session"""
+    from main import BlackjackApp, low_bandwidth_requested
+
+    if process.get_terminal_type() is None:
+        process.stdout.write("No PTY requested.\r\n")
+        process.exit(1)
+        return
+
+    width, height, _, _ = process.get_terminal_size()
+    username = process.get_extra_info("username") or "Player"
+    # Either the server or the player's own LC_ hint can ask for low bandwidth
+    low_bandwidth = low_bandwidth_requested() or low_bandwidth_requested(process.env)
+    driver_class = functools.partial(ChannelDriver, process)
+    if low_bandwidth:  # the app caps the frame rate itself
+        driver_class = functools.partial(driver_class, mouse_motion=False)
+    app = BlackjackApp(
+        session_id=f"session-{time.time_ns()}",
+        username=username,
+        watch_chat=False,
+        low_bandwidth=low_bandwidth,
+        pacing=process.env.get("LC_BLACKJACK_PACING"),
+        tables=tables,
+        driver_class=driver_class,
+    )
+    chat_hub.apps.add(app)
+    try:
+        await app.run_async(size=(width or 80, height or 24))
+    finally:
+        chat_hub.apps.discard(app)
+        process.exit(0)
+
+
+class ChatRelay:
+    """Copy messages sent by sessions into the shared, segmented chat log.
+
+    This is what the Go server's BroadcastMessage does when it fronts the
+    sessions; exactly one process per host should run it. With a ring, each
+    message is also parsed once here and published to shared memory, where
+    sessions read it without touching the file.
+    """
+
+    def __init__(self, source: str = CHAT_MESSAGES_FILE, target: str = CHAT_FILE, ring: ChatRing = None):
+        self.store = ChatStore(target)
+        self.ring = ring
+        self.reader = ChatTailReader(source)
+        self.watcher = ChatFileWatcher(source, self.relay)
+        self.timer = None
+
+    def start(self):
+        if not self.watcher.start():
+            self.timer = asyncio.get_running_loop().create_task(self._poll())
+        self.relay()
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(0.5)
+            self.relay()
+
+    def relay(self):
+        lines = [line for line in self.reader.read_lines() if line.strip()]
+        if self.ring:
+            # Ring first: other workers are woken by the file write that follows
+            for line in lines:
+                try:
+                    msg = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.ring.append(msg.get("username", "Unknown"), msg.get("timestamp", ""), msg.get("message", ""))
+        self.store.append(lines)
+
+
+def load_host_key(path: str):
+    """Read the server host key, generating and saving one on first run"""
+    try:
+        return asyncssh.read_private_key(path)
+    except (OSError, asyncssh.KeyImportError):
+        pass
+    key = asyncssh.generate_private_key("ssh-ed25519")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    key.write_private_key(path)
+    os.chmod(path, 0o600)
+    return key
+
+
+class _Server(asyncssh.SSHServer if asyncssh else object):
+    def begin_auth(self, username: str) -> bool:
+        return False  # anyone may play, as with the Go server
+
+
+async def serve(host: str, port: int, host_key, relay: bool, reuse_port: bool, ring: ChatRing = None,
+                seats: int = 0):
+    global chat_hub, tables
+    chat_hub = ChatHub()
+    chat_hub.start()
+    if seats > 0:
+        from main import DEFAULT_PACING, PACING
+
+        step_delay = PACING.get(os.getenv("BLACKJACK_PACING", DEFAULT_PACING), PACING[DEFAULT_PACING])
+        tables = TableCoordinator(
+            seats,
+            turn_timeout=float(os.getenv("BLACKJACK_TURN_TIMEOUT", TURN_TIMEOUT)),
+            step_delay=step_delay,
+            secure_shuffle=os.getenv("BLACKJACK_SECURE_SHUFFLE") == "1",
+        )
+    if relay:
+        ChatRelay(ring=ring).start()
+    server = await asyncssh.create_server(
+        _Server, host, port,
+        server_host_keys=[host_key],
+        process_factory=run_session,
+        line_editor=False,
+        reuse_port=reuse_port,
+    )
+    # Running apps swap sys.stdout/stderr for their own print capture
+    print(f"worker {os.getpid()} listening on {host or '*'}:{port}", file=sys.__stderr__)
+    await server.wait_closed()
+
+
+def run_worker(args, host_key, relay: bool, ring: ChatRing = None):
+    import zygote
+
+    zygote.warm_up()  # parse the CSS once; every session reuses it
+    asyncio.run(serve(args.host, args.port, host_key, relay, args.workers > 1, ring, args.seats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many blackjack sessions over SSH in one process")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SSH_PORT", DEFAULT_PORT)))
+    parser.add_argument("--workers", type=int, default=1, help="processes sharing the port")
+    parser.add_argument("--host-key", default=os.getenv(
+        "BLACKJACK_HOST_KEY", os.path.join(default_cache_dir(), "ssh_host_ed25519_key")))
+    parser.add_argument("--no-relay", action="store_true",
+                        help="don't relay chat (another server already does)")
+    parser.add_argument("--no-ring", action="store_true",
+                        help="sessions read chat from the log file instead of shared memory")
+    parser.add_argument("--seats", type=int, default=int(os.getenv("BLACKJACK_TABLE_SEATS", "0")),
+                        help="seat players at shared tables of this many (0: everyone plays alone)")
+    args = parser.parse_args()
+
+    if asyncssh is None:
+        sys.exit("ssh_host.py needs asyncssh: pip install asyncssh")
+
+    # Each session holds a socket and a chat log descriptor
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    host_key = load_host_key(args.host_key)
+    relay = not args.no_relay
+    if relay:
+        for path in (CHAT_FILE, CHAT_MESSAGES_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(chat_store.default_directory(), ignore_errors=True)
+
+    # Created before forking so every worker's sessions can map it
+    ring = None
+    if relay and not args.no_ring:
+        ring = ChatRing(chat_ring.default_path())
+        os.environ["BLACKJACK_CHAT_RING"] = ring.path
+
+    if args.workers <= 1:
+        run_worker(args, host_key, relay, ring)
+        return
+
+    children = []
+    for index in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                run_worker(args, host_key, relay and index == 0, ring if index == 0 else None)
+                status = 0
+            finally:
+                debuglog.dump_if_enabled()
+                profiling.dump_if_enabled()
+                os._exit(status)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for pid in children:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                break
+
+
+if __name__ == "__main__":
+    main()
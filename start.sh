@@ -41,7 +41,7 @@ if [ $? -ne 0 ]; then
 fi
 
 # Clean up any existing chat files
-rm -f /tmp/ssh-chat.log
+rm -f /tmp/ssh-chat/ssh-chat.log
 
 # Check if port is already in use
 if command -v netstat &> /dev/null; then
@@ -56,6 +56,18 @@ elif command -v ss &> /dev/null; then
     fi
 fi
 
+# Optionally pre-fork sessions from a warmed-up Python zygote
+if [ "$BLACKJACK_USE_ZYGOTE" = "1" ]; then
+    export BLACKJACK_ZYGOTE=/tmp/ssh-blackjack-zygote.sock
+    echo "Starting session zygote on $BLACKJACK_ZYGOTE..."
+    .venv/bin/python3 zygote.py --socket "$BLACKJACK_ZYGOTE" &
+    ZYGOTE_PID=$!
+    trap 'kill $ZYGOTE_PID 2>/dev/null' EXIT
+    while [ ! -S "$BLACKJACK_ZYGOTE" ] && kill -0 $ZYGOTE_PID 2>/dev/null; do
+        sleep 0.1
+    done
+fi
+
 # Start the server
 echo "Starting server on port 2223..."
 echo "Connect with: ssh localhost -p 2223"
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Bankrolls and per-player statistics in SQLite, written off the event loop.
+
+Sessions call `record()` once per settled hand and return at once; one
+thread per process owns the connection, gathers whatever arrives within a
+short window, folds it into one row change per player and commits the lot
+as a single upsert transaction. The database runs in WAL mode with
+synchronous=NORMAL, so readers never block the writer, a commit is an
+append to the WAL rather than an fsync, and processes on the same host
+(workers, or one process per session under the Go server) only contend
+for the write lock once per batch.
+
+`load()` and `flush()` go through the same queue, so they see every hand
+queued before them. A batch that fails to commit (say, the database is
+locked for longer than the busy timeout) is kept and retried with the next
+one; if the thread cannot go on at all, every waiting and later future gets
+the error instead of hanging. The leaderboard reads the bankroll index.
+
+    python stats_store.py --top 10
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+import debuglog
+from engine import DEALER_BUST, PLAYER_BLACKJACK, PLAYER_BUST, PLAYER_WIN, PUSH, payout
+from strategy import default_cache_dir
+
+STARTING_BANKROLL = 1000
+DEFAULT_BET = 10
+BATCH_WINDOW = 0.2  # seconds to gather hands into one transaction
+MAX_BATCH = 1000
+BUSY_TIMEOUT = 5000  # ms to wait for another process's write to finish
+RETRY_DELAY = 1.0  # seconds before retrying a failed batch when nothing else arrives
+MAX_UNWRITTEN = 100_000  # hands kept for retrying; the oldest are dropped beyond this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    username TEXT PRIMARY KEY,
+    bankroll INTEGER NOT NULL,
+    hands INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    pushes INTEGER NOT NULL DEFAULT 0,
+    blackjacks INTEGER NOT NULL DEFAULT 0,
+    busts INTEGER NOT NULL DEFAULT 0,
+    bet INTEGER NOT NULL DEFAULT 0,
+    wagered INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_by_bankroll ON players (bankroll DESC);
+"""
+
+UPSERT = """
+INSERT INTO players (username, bankroll, hands, wins, losses, pushes, blackjacks, busts, bet, wagered, updated)
+VALUES (:username, :start + :net, :hands, :wins, :losses, :pushes, :blackjacks, :busts, :bet, :wagered, :updated)
+ON CONFLICT (username) DO UPDATE SET
+    bankroll = bankroll + :net,
+    hands = hands + :hands,
+    wins = wins + :wins,
+    losses = losses + :losses,
+    pushes = pushes + :pushes,
+    blackjacks = blackjacks + :blackjacks,
+    busts = busts + :busts,
+    bet = :bet,
+    wagered = wagered + :wagered,
+    updated = :updated
+"""
+
+COLUMNS = ("username", "bankroll", "hands", "wins", "losses", "pushes", "blackjacks", "busts", "bet", "wagered")
+
+# Columns added since the first schema, for databases created before them
+ADDED_COLUMNS = {
+    "bet": "INTEGER NOT NULL DEFAULT 0",  # the last bet placed
+    "wagered": "INTEGER NOT NULL DEFAULT 0",  # every bet placed, summed
+}
+
+_stores = {}
+
+
+def default_path() -> str:
+    return os.getenv("BLACKJACK_STATS_DB", os.path.join(default_cache_dir(), "stats.sqlite3"))
+
+
+def connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(players)")}
+    for column, definition in ADDED_COLUMNS.items():
+        if column not in existing:
+            try:
+                conn.execute(f"ALTER TABLE players ADD COLUMN {column} {definition}")
+            except sqlite3.OperationalError:
+                pass  # another process added it first
+    return conn
+
+
+def new_player(username: str, start: int = STARTING_BANKROLL) -> dict:
+    return dict(zip(COLUMNS, (username, start, 0, 0, 0, 0, 0, 0, 0, 0)))
+
+
+class StatsStore:
+    def __init__(self, path: str, start: int = STARTING_BANKROLL, window: float = BATCH_WINDOW):
+        self.path = path
+        self.start = start
+        self.window = window
+        self.pid = os.getpid()
+        self.queue = queue.SimpleQueue()
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.dropped = 0
+        self.unwritten = []  # hands from batches that failed to commit, retried with the next
+        self.failure = None  # the exception that stopped the thread
+        self.thread = threading.Thread(target=self._run, name="stats-store", daemon=True)
+        self.thread.start()
+
+    def record(self, username: str, outcome: str, bet: int):
+        """Queue one settled hand; never blocks"""
+        self.queue.put(("hand", username, outcome, bet))
+
+    def load(self, username: str) -> Future:
+        """Future of the player's row (a new player's defaults if unknown)"""
+        future = Future()
+        self._request(("load", username, future))
+        return future
+
+    def flush(self) -> Future:
+        """Future that completes once everything queued so far is committed"""
+        future = Future()
+        self._request(("flush", None, future))
+        return future
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def _request(self, item):
+        self.queue.put(item)
+        if self.failure is not None:
+            self._fail_pending()  # the thread may have stopped before this was queued
+
+    def _fail_pending(self):
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[0] != "hand":
+                item[2].set_exception(self.failure)
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+        except Exception as error:
+            self._stop(error)
+            return
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=RETRY_DELAY if self.unwritten else None)
+                except queue.Empty:
+                    self._apply(conn, [])  # retry the failed hands on their own
+                    continue
+                if item is None:
+                    return
+                batch = [item]
+                deadline = time.monotonic() + self.window
+                # Gather hands for a while, but answer a load or flush right away
+                while batch[-1][0] == "hand" and len(batch) < MAX_BATCH:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self.queue.put(None)  # finish this batch, then stop
+                        break
+                    batch.append(item)
+                self._apply(conn, batch)
+        except Exception as error:
+            self._stop(error)
+        finally:
+            conn.close()
+
+    def _stop(self, error: Exception):
+        debuglog.error("stats.stopped", path=self.path, error=repr(error), unwritten=len(self.unwritten))
+        self.failure = error
+        self._fail_pending()
+
+    def _apply(self, conn, batch):
+        hands = self.unwritten + [item for item in batch if item[0] == "hand"]
+        error = None
+        try:
+            if hands:
+                self._write(conn, hands)
+            self.unwritten = []
+        except sqlite3.Error as e:
+            error = e
+            self.errors += 1
+            self.unwritten = hands[-MAX_UNWRITTEN:]
+            self.dropped += len(hands) - len(self.unwritten)
+            debuglog.warning("stats.write_failed", path=self.path, hands=len(hands), error=repr(e))
+        for kind, username, future in (item for item in batch if item[0] != "hand"):
+            try:
+                if kind == "flush" and error is not None:
+                    raise error
+                result = self._read(conn, username) if kind == "load" else None
+            except sqlite3.Error as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _write(self, conn, hands):
+        now = time.time()
+        rows = {}
+        for _, username, outcome, bet in hands:
+            row = rows.get(username)
+            if row is None:
+                row = rows[username] = {"username": username, "start": self.start, "net": 0, "hands": 0,
+                                        "wins": 0, "losses": 0, "pushes": 0, "blackjacks": 0, "busts": 0,
+                                        "bet": bet, "wagered": 0, "updated": now}
+            row["net"] += payout(outcome, bet)
+            row["hands"] += 1
+            row["bet"] = bet
+            row["wagered"] += bet
+            if outcome in (PLAYER_WIN, DEALER_BUST, PLAYER_BLACKJACK):
+                row["wins"] += 1
+            elif outcome == PUSH:
+                row["pushes"] += 1
+            else:
+                row["losses"] += 1
+            if outcome == PLAYER_BLACKJACK:
+                row["blackjacks"] += 1
+            elif outcome == PLAYER_BUST:
+                row["busts"] += 1
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(UPSERT, rows.values())
+        self.written += len(hands)
+        self.batches += 1
+
+    def _read(self, conn, username):
+        found = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM players WHERE username = ?",
+                             (username,)).fetchone()
+        return dict(zip(COLUMNS, found)) if found else new_player(username, self.start)
+
+
+def leaderboard(path: str = None, limit: int = 10) -> list:
+    """Top players by bankroll, read through the bankroll index"""
+    conn = connect(path or default_path())
+    try:
+        rows = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM players ORDER BY bankroll DESC LIMIT ?",
+                            (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+
+def shared_store(path: str = None) -> StatsStore:
+    """The store for `path` in this process, started on first use.
+
+    Sessions hosted in one process share it, so their hands are batched together.
+    """
+    path = path or default_path()
+    store = _stores.get(path)
+    # A forked child needs its own thread; a store whose thread stopped is started afresh
+    if store is None or store.pid != os.getpid() or store.failure is not None:
+        start = int(os.getenv("BLACKJACK_BANKROLL", STARTING_BANKROLL))
+        store = _stores[path] = StatsStore(path, start)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the blackjack leaderboard")
+    parser.add_argument("--db", default=default_path())
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    print(f"{'player':<20} {'bankroll':>9} {'hands':>7} {'wins':>6} {'bj':>4} {'busts':>6}")
+    for row in leaderboard(args.db, args.top):
+        print(f"{row['username']:<20} {row['bankroll']:>9} {row['hands']:>7} {row['wins']:>6} "
+              f"{row['blackjacks']:>4} {row['busts']:>6}")
+
+
+if __name__ == "__main__":
+    main()
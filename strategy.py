@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Basic-strategy EV tables for hit/stand against the dealer's up card.
+
+Dealer final-total probabilities are computed exactly for the configured
+shoe (cards removed as the dealer draws), player hit/stand EVs follow by
+memoised recursion over (hard total, holding an ace). The finished table is
+written once to a small binary cache keyed by rule set and memory-mapped on
+later runs, so a lookup is a single index into it. The header records the
+byte order the EVs were written in; a table written on a host of the other
+byte order is read into a byte-swapped copy instead.
+
+    python strategy.py --decks 6      # build the cache and print the chart
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from functools import lru_cache
+
+import debuglog
+from engine import CARD_VALUES, DEFAULT_DECKS, RANKS
+
+RULES_VERSION = 1
+DEALER_STANDS_ON = 17
+MAGIC = b"BJS2"
+HEADER = struct.Struct("<4sIIB3x")  # magic, rules version, deck count, byte order
+BYTE_ORDERS = {"little": 0, "big": 1}
+
+UP_CARDS = range(1, 11)   # ace counted as 1 .. ten-value
+HARD_TOTALS = range(2, 22)
+DEALER_FINALS = (17, 18, 19, 20, 21, 22)  # 22 stands for bust
+
+HIT = "Hit"
+STAND = "Stand"
+
+
+def rules_key(num_decks: int) -> str:
+    rules = f"v{RULES_VERSION}-decks{num_decks}-s{DEALER_STANDS_ON}-nopeek"
+    return hashlib.sha1(rules.encode()).hexdigest()[:12]
+
+
+def default_cache_dir() -> str:
+    return os.getenv("BLACKJACK_CACHE_DIR", os.path.expanduser("~/.cache/ssh-blackjack"))
+
+
+def shoe_counts(num_decks: int) -> tuple:
+    """Number of cards of each value 1..10 in a full shoe"""
+    counts = [0] * 10
+    for value in CARD_VALUES:
+        counts[value - 1] += num_decks
+    return tuple(counts)
+
+
+def dealer_final_probabilities(counts: tuple, up: int) -> tuple:
+    """Probability of each DEALER_FINALS outcome given the up card and unseen cards.
+
+    The dealer draws while their best total is under 17, removing each card
+    from the shoe. `counts` must already exclude the up card.
+    """
+    @lru_cache(maxsize=None)
+    def finish(remaining, hard, ace):
+        best = hard + 10 if ace and hard + 10 <= 21 else hard
+        if best >= DEALER_STANDS_ON:
+            result = [0.0] * len(DEALER_FINALS)
+            result[min(best, 22) - 17] = 1.0
+            return tuple(result)
+
+        total = sum(remaining)
+        result = [0.0] * len(DEALER_FINALS)
+        for index, count in enumerate(remaining):
+            if not count:
+                continue
+            value = index + 1
+            drawn = remaining[:index] + (count - 1,) + remaining[index + 1:]
+            p = count / total
+            for outcome, q in enumerate(finish(drawn, hard + value, ace or value == 1)):
+                result[outcome] += p * q
+        return tuple(result)
+
+    return finish(counts, up, up == 1)
+
+
+def stand_ev(total: int, dealer: tuple) -> float:
+    if total > 21:
+        return -1.0
+    ev = dealer[-1]  # dealer busts
+    for final, p in zip(DEALER_FINALS[:-1], dealer[:-1]):
+        if total > final:
+            ev += p
+        elif total < final:
+            ev -= p
+    return ev
+
+
+def player_evs(counts: tuple, dealer: tuple) -> dict:
+    """EV of standing and of hitting (then playing on optimally) for each player state"""
+    total = sum(counts)
+    probabilities = [(index + 1, count / total) for index, count in enumerate(counts) if count]
+
+    @lru_cache(maxsize=None)
+    def best_ev(hard, ace):
+        if hard > 21:
+            return -1.0
+        return max(stand_ev(best_total(hard, ace), dealer), hit_ev(hard, ace))
+
+    @lru_cache(maxsize=None)
+    def hit_ev(hard, ace):
+        return sum(p * best_ev(hard + value, ace or value == 1) for value, p in probabilities)
+
+    return {
+        (hard, ace): (stand_ev(best_total(hard, ace), dealer), hit_ev(hard, ace))
+        for hard in HARD_TOTALS
+        for ace in (False, True)
+    }
+
+
+def best_total(hard: int, ace: bool) -> int:
+    return hard + 10 if ace and hard + 10 <= 21 else hard
+
+
+def _index(up: int, hard: int, ace: bool) -> int:
+    return (((up - 1) * len(HARD_TOTALS) + (hard - 2)) * 2 + ace) * 2
+
+
+def build_table(num_decks: int) -> array:
+    """Compute (stand EV, hit EV) for every up card and player state"""
+    table = array("d", bytes(8 * 2 * 2 * len(HARD_TOTALS) * len(UP_CARDS)))
+    full = shoe_counts(num_decks)
+    for up in UP_CARDS:
+        counts = full[:up - 1] + (full[up - 1] - 1,) + full[up:]
+        dealer = dealer_final_probabilities(counts, up)
+        for (hard, ace), (stand, hit) in player_evs(counts, dealer).items():
+            i = _index(up, hard, ace)
+            table[i] = stand
+            table[i + 1] = hit
+    return table
+
+
+class StrategyTable:
+    """Memory-mapped hit/stand EVs indexed by up card and player state"""
+
+    def __init__(self, path: str, num_decks: int):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, decks, byte_order = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != RULES_VERSION or decks != num_decks:
+            self._map.close()
+            raise ValueError(f"{path} is not a strategy table for these rules")
+        if byte_order == BYTE_ORDERS[sys.byteorder]:
+            self._evs = memoryview(self._map)[HEADER.size:].cast("d")
+        else:
+            self._evs = array("d", self._map[HEADER.size:])
+            self._evs.byteswap()
+            self._map.close()
+
+    @classmethod
+    def in_memory(cls, evs: array) -> "StrategyTable":
+        """A table from build_table() that is used without a cache file"""
+        table = cls.__new__(cls)
+        table._map = None
+        table._evs = evs
+        return table
+
+    def lookup(self, hard: int, ace: bool, up: int) -> tuple[float, float]:
+        """Return (stand EV, hit EV); `up` is the up card's value with aces as 1"""
+        i = _index(up, min(hard, 21), ace)
+        return self._evs[i], self._evs[i + 1]
+
+    def advise(self, hand, up_card: int) -> tuple[str, float, float]:
+        """Best play for an engine Hand against the dealer's up card code"""
+        stand, hit = self.lookup(hand.hard, hand.aces > 0, CARD_VALUES[up_card])
+        return (HIT if hit > stand else STAND), stand, hit
+
+
+def load_table(num_decks: int = DEFAULT_DECKS, cache_dir: str = None) -> StrategyTable:
+    """Open the cached table for these rules, building and writing it first if needed.
+
+    If the cache can't be written the freshly built table is used from memory.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    path = os.path.join(cache_dir, f"strategy-{rules_key(num_decks)}.bin")
+    try:
+        return StrategyTable(path, num_decks)
+    except (OSError, ValueError):
+        pass
+
+    table = build_table(num_decks)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # A temp file of its own: sessions in one process may build at the same time
+        fd, tmp_path = tempfile.mkstemp(prefix=".strategy-", suffix=".tmp", dir=cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                os.fchmod(f.fileno(), 0o644)
+                f.write(HEADER.pack(MAGIC, RULES_VERSION, num_decks, BYTE_ORDERS[sys.byteorder]))
+                f.write(table.tobytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return StrategyTable(path, num_decks)
+    except OSError as error:
+        debuglog.warning("strategy.cache_failed", path=path, error=repr(error))
+        return StrategyTable.in_memory(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and print the hit/stand strategy table")
+    parser.add_argument("--decks", type=int, default=DEFAULT_DECKS)
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+
+    table = load_table(args.decks, args.cache_dir)
+    up_labels = [RANKS[up - 1] if up < 10 else "10" for up in UP_CARDS]
+    print("      " + " ".join(f"{label:>3}" for label in up_labels))
+    for ace in (False, True):
+        for hard in HARD_TOTALS:
+            if ace and hard + 10 > 21:
+                continue
+            label = f"A,{RANKS[hard - 2]}" if ace else f"{hard}"
+            plays = []
+            for up in UP_CARDS:
+                stand, hit = table.lookup(hard, ace, up)
+                plays.append("  H" if hit > stand else "  S")
+            print(f"{label:>5} " + " ".join(plays))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Shared blackjack tables: one shoe and one dealer for several players.
+
+A Table seats up to `seats` sessions around one shoe and one dealer Hand.
+Each seat gets a Round over the table's shoe and dealer and its own player
+hand, so the hint and live EV code works on a seat exactly as on a solo
+game. The table runs as one asyncio task while anyone is seated: it waits
+for players to press Deal, deals everyone who is ready, gives each seat its
+turn in order (standing for them after `turn_timeout`), plays the dealer
+out and settles every hand.
+
+Seats talk to the table through `send(seat, action)` and are told what
+changed through their `notify(diff)` callback. The table keeps the state
+it last broadcast as a flat dict and sends only the keys that changed, the
+same dict object to every seat, so a broadcast costs one comparison however
+many seats are watching. A new seat gets the whole state.
+
+Before each deal the table makes sure the shoe can cover the whole round.
+A player stops hitting by a hard 31 (21 plus a ten) and the dealer by 26,
+so a shoe holding that much card value per hand can't run dry mid-round;
+when it holds less, the next shoe comes in early. Seats are capped so a
+fresh shoe always covers a full table. A round that fails anyway is
+abandoned and logged, and the table carries on with the next one.
+
+TableCoordinator hands out seats, filling open tables before starting new
+ones, so one process can run hundreds of tables on one event loop.
+"""
+import asyncio
+import itertools
+
+import debuglog
+from engine import CARD_VALUES, DEFAULT_DECKS, Hand, Round, ShoeManager
+
+SEATS = 5
+TURN_TIMEOUT = 30.0  # seconds a player has to act before standing
+JOIN_WAIT = 2.0  # after the first Deal, how long others have to join the round
+HIDDEN_CARD = -1  # the dealer's hole card in a broadcast
+PLAYER_MAX_VALUE = 31  # most card value a player's hand can take: hits up to 21, then a ten
+DEALER_MAX_VALUE = 26  # the dealer draws up to 16, then a ten
+
+# Seat status
+WATCHING = "watching"  # seated, not in the current round
+PLAYING = "playing"
+STOOD = "stood"
+BUST = "bust"
+BLACKJACK = "blackjack"
+
+# Actions a seat can send
+DEAL = "deal"
+HIT = "hit"
+STAND = "stand"
+
+
+def round_reserve(players: int) -> int:
+    """Card value a shoe must hold to be sure of covering a round for `players`"""
+    return players * PLAYER_MAX_VALUE + DEALER_MAX_VALUE
+
+
+def max_seats(decks: int) -> int:
+    """The most seats a fresh shoe of `decks` decks can always deal a round to"""
+    return (sum(CARD_VALUES) * decks - DEALER_MAX_VALUE) // PLAYER_MAX_VALUE
+
+
+class Seat:
+    """One player's place at a table"""
+    __slots__ = ("table", "index", "username", "notify", "hand", "round", "status", "ready", "result")
+
+    def __init__(self, table: "Table", index: int, username: str, notify):
+        self.table = table
+        self.index = index
+        self.username = username
+        self.notify = notify  # called with each state diff
+        self.hand = Hand(username)
+        self.round = Round(table.shoe, self.hand, table.dealer)
+        self.status = WATCHING
+        self.ready = False  # pressed Deal: dealt into the next round
+        self.result = None  # outcome constant of the last settled round
+
+    def key(self) -> str:
+        return f"seat{self.index}"
+
+    def view(self) -> tuple:
+        return (self.username, tuple(self.hand.cards), self.hand.values(), self.status, self.ready,
+                self.result)
+
+
+class Table:
+    def __init__(self, table_id: int, seats: int = SEATS, turn_timeout: float = TURN_TIMEOUT,
+                 step_delay: float = 1.0, join_wait: float = JOIN_WAIT, decks: int = DEFAULT_DECKS,
+                 secure_shuffle: bool = False):
+        self.id = table_id
+        self.decks = decks
+        self.shoes = ShoeManager(decks, secure_shuffle)
+        self.shoe = self.shoes.shoe
+        self.dealer = Hand("Dealer")
+        self.seats: list = [None] * min(seats, max_seats(decks))
+        self.turn_timeout = turn_timeout
+        self.step_delay = step_delay
+        self.join_wait = join_wait
+        self.actions = asyncio.Queue()
+        self.in_round = False
+        self.hole_hidden = True
+        self.turn = None  # index of the seat whose turn it is
+        self.state = {}  # as last broadcast
+        self.task = None
+
+    def occupied(self) -> int:
+        return sum(seat is not None for seat in self.seats)
+
+    def has_room(self) -> bool:
+        return None in self.seats
+
+    def sit(self, username: str, notify) -> Seat:
+        index = self.seats.index(None)
+        seat = self.seats[index] = Seat(self, index, username, notify)
+        self.broadcast(f"{username} sits down", joining=seat)
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return seat
+
+    def leave(self, seat: Seat):
+        if self.seats[seat.index] is seat:
+            self.seats[seat.index] = None
+            self.actions.put_nowait((seat, None))  # wake the table if it waits on them
+            self.broadcast(f"{seat.username} leaves")
+
+    def send(self, seat: Seat, action: str):
+        """Queue DEAL, HIT or STAND from a seat; the table acts on it in turn"""
+        self.actions.put_nowait((seat, action))
+
+    def snapshot(self) -> dict:
+        dealer = list(self.dealer.cards)
+        if self.hole_hidden and len(dealer) > 1:
+            dealer[1] = HIDDEN_CARD
+        state = {
+            "dealer": tuple(dealer),
+            "dealer_total": None if self.hole_hidden else self.dealer.values(),
+            "turn": self.turn,
+            "in_round": self.in_round,
+        }
+        for index, seat in enumerate(self.seats):
+            state[f"seat{index}"] = seat.view() if seat is not None else None
+        return state
+
+    def broadcast(self, message: str = None, joining: Seat = None):
+        """Send every seat what changed since the last broadcast (`joining` gets it all)"""
+        state = self.snapshot()
+        state["message"] = message
+        old = self.state
+        diff = {key: value for key, value in state.items() if old.get(key) != value}
+        self.state = state
+        for seat in self.seats:
+            if seat is None:
+                continue
+            if seat is joining:
+                seat.notify(dict(state))
+            elif diff:
+                seat.notify(diff)
+
+    async def run(self):
+        try:
+            while self.occupied():
+                if await self._wait_for_players():
+                    try:
+                        await self._play_round()
+                    except Exception as error:
+                        debuglog.error("table.round_failed", table=self.id, error=repr(error))
+                        self._abandon_round()
+        finally:
+            self.task = None
+
+    def _abandon_round(self):
+        """Put every seat back to watching after a round failed, with nothing to settle"""
+        for seat in self.seats:
+            if seat is not None:
+                seat.status = WATCHING
+                seat.result = None
+        self.in_round = False
+        self.turn = None
+        self.hole_hidden = False
+        self.broadcast("Round abandoned after a table error. Press Deal to play again.")
+
+    async def _wait_for_players(self) -> bool:
+        """Wait for someone to press Deal, then briefly for the others"""
+        loop = asyncio.get_running_loop()
+        deadline = None
+        if any(seat is not None and seat.ready for seat in self.seats):
+            deadline = loop.time() + self.join_wait  # asked for a deal during the last round
+        while self.occupied():
+            seated = [seat for seat in self.seats if seat is not None]
+            if deadline is not None and all(seat.ready for seat in seated):
+                return True
+            timeout = None if deadline is None else deadline - loop.time()
+            if timeout is not None and timeout <= 0:
+                return True
+            try:
+                seat, action = await asyncio.wait_for(self.actions.get(), timeout)
+            except asyncio.TimeoutError:
+                return True
+            if action == DEAL and self.seats[seat.index] is seat and not seat.ready:
+                seat.ready = True
+                if deadline is None:
+                    deadline = loop.time() + self.join_wait
+                self.broadcast(f"{seat.username} is ready")
+        return False
+
+    async def _next_action(self, seat: Seat):
+        """The acting seat's next HIT or STAND, or None once they time out or leave"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.turn_timeout
+        while self.seats[seat.index] is seat:
+            try:
+                sender, action = await asyncio.wait_for(self.actions.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                return None
+            if sender is seat and action in (HIT, STAND):
+                return action
+            if action == DEAL and self.seats[sender.index] is sender and not sender.ready:
+                sender.ready = True  # deal them into the next round
+                self.broadcast()
+        return None
+
+    async def _play_round(self):
+        players = [seat for seat in self.seats if seat is not None and seat.ready]
+        if not players:
+            return  # whoever was ready has left
+        if self.shoes.start_round(round_reserve(len(players))):
+            self.shoe = self.shoes.shoe
+            for seat in self.seats:
+                if seat is not None:
+                    seat.round.shoe = self.shoe
+            self.broadcast("Shuffling a new shoe")
+        draw = self.shoe.draw
+        self.dealer.clear()
+        for seat in self.seats:
+            if seat is not None:
+                seat.result = None  # a seat sitting this round out has nothing to settle
+        for seat in players:
+            seat.hand.clear()
+            seat.ready = False
+        for _ in range(2):
+            for seat in players:
+                seat.hand.add(draw())
+            self.dealer.add(draw())
+        for seat in players:
+            seat.status = BLACKJACK if seat.hand.is_blackjack() else PLAYING
+        self.in_round = True
+        self.hole_hidden = True
+        self.broadcast("Dealing new hand...")
+
+        for seat in players:
+            if seat.status != PLAYING:
+                continue
+            self.turn = seat.index
+            self.broadcast(f"{seat.username}'s turn")
+            while seat.status == PLAYING:
+                action = await self._next_action(seat)
+                if action == HIT:
+                    seat.round.hit()
+                    if seat.round.player_bust():
+                        seat.status = BUST
+                    elif seat.hand.best_value() == 21:
+                        seat.status = STOOD
+                    self.broadcast(f"{seat.username} hits")
+                else:
+                    seat.status = STOOD
+                    self.broadcast(f"{seat.username} stands" if action else f"{seat.username} stands (timed out)")
+        self.turn = None
+
+        self.hole_hidden = False
+        self.broadcast("Dealer reveals")
+        rules = players[0].round  # every seat's round shares the dealer
+        if any(seat.status == STOOD for seat in players):
+            while rules.dealer_should_draw():
+                await asyncio.sleep(self.step_delay)
+                rules.dealer_draw()
+                self.broadcast("Dealer draws")
+
+        for seat in players:
+            seat.result = seat.round.settle()
+            seat.status = WATCHING
+        self.in_round = False
+        self.broadcast("Round over")
+
+
+class TableCoordinator:
+    """Seats sessions at shared tables, opening a new table when all are full"""
+
+    def __init__(self, seats: int = SEATS, **table_options):
+        self.seats = seats
+        self.table_options = table_options
+        self.tables = {}
+        self._ids = itertools.count(1)
+
+    def join(self, username: str, notify) -> Seat:
+        for table in self.tables.values():
+            if table.has_room():
+                break
+        else:
+            table_id = next(self._ids)
+            table = self.tables[table_id] = Table(table_id, self.seats, **self.table_options)
+        return table.sit(username, notify)
+
+    def leave(self, seat: Seat):
+        table = seat.table
+        table.leave(seat)
+        if not table.occupied():
+            self.tables.pop(table.id, None)
+
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark comparison: timings are judged relative to the
+machine's speed when they were taken, byte counts as they are.
+"""
+from bench_suite import best_results, compare
+
+
+def result(value, unit="us/round", calibration=1000.0):
+    return {"value": value, "unit": unit, "calibration": calibration}
+
+
+def test_slower_timing_is_a_regression():
+    baseline = {"ui.round": result(100.0), "hand.evaluate": result(50.0, "ns/call")}
+    results = {"ui.round": result(130.0), "hand.evaluate": result(55.0, "ns/call"), "new": result(1.0)}
+    assert [name for name, *_ in compare(results, baseline, 0.25)] == ["ui.round"]
+
+
+def test_timings_allow_for_a_slower_machine():
+    baseline = {"ui.round": result(100.0)}
+    assert compare({"ui.round": result(140.0, calibration=1500.0)}, baseline, 0.25) == []
+    assert compare({"ui.round": result(140.0, calibration=1000.0)}, baseline, 0.25)
+
+
+def test_bytes_are_not_scaled():
+    baseline = {"ui.bytes_per_hand": result(40000.0, "bytes/hand")}
+    results = {"ui.bytes_per_hand": result(52000.0, "bytes/hand", calibration=2000.0)}
+    (name, old, new, change), = compare(results, baseline, 0.25)
+    assert (old, new) == (40000.0, 52000.0) and round(change, 2) == 0.3
+
+
+def test_rerun_keeps_the_faster_result():
+    first = {"ui.round": result(140.0), "shoe.generate": result(120.0, "us/shoe")}
+    rerun = {"ui.round": result(150.0, calibration=1500.0)}
+    assert best_results(first, rerun)["ui.round"]["value"] == 150.0
+    assert best_results(first, rerun)["shoe.generate"] == first["shoe.generate"]
+
+
+if __name__ == "__main__":
+    test_slower_timing_is_a_regression()
+    test_timings_allow_for_a_slower_machine()
+    test_bytes_are_not_scaled()
+    test_rerun_keeps_the_faster_result()
+    print("All bench suite tests passed")
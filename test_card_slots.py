@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled card widgets: every hand reuses the same slots, the
+dealer's hole card is hidden until the reveal, leftover slots from a longer
+hand are hidden, and showing the same card again doesn't redraw it.
+"""
+import asyncio
+import random
+import time
+
+from engine import card_label
+from main import HIDDEN_CARD, MAX_CARDS, BlackjackApp
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def _deal_playable_hand(app, pilot):
+    """Deal until the player has a hand to act on (not a natural)"""
+    app.deal_button.press()
+    await pilot.pause()
+    while not app.hit_button.visible:
+        app.deal_button.press()
+        await pilot.pause()
+
+
+def _shown(slots):
+    return [repr(slot) for slot in slots if slot.display]
+
+
+def test_slots_are_reused_and_the_hole_card_revealed():
+    async def run():
+        random.seed(3)
+        app = BlackjackApp(session_id="local", username="tester", watch_chat=False, pacing="instant")
+        async with app.run_test(size=(160, 50)) as pilot:
+            dealer_slots = list(app.query_one("#dealer-hand").children)
+            player_slots = list(app.query_one("#player-hand").children)
+            assert dealer_slots == app.dealer_slots and len(dealer_slots) == MAX_CARDS
+            assert player_slots == app.player_slots and not _shown(player_slots)
+
+            for _ in range(3):
+                await _deal_playable_hand(app, pilot)
+                dealer = app.dealer_hand.cards
+                assert app.dealer_slots[1].code == HIDDEN_CARD
+                assert _shown(app.dealer_slots) == [card_label(dealer[0]), "O?"]
+                assert _shown(app.player_slots) == [card_label(card) for card in app.player_hand.cards]
+
+                # Up to four cards, so the next deal has leftover slots to hide
+                while len(app.player_hand.cards) < 4 and app.hit_button.visible:
+                    app.hit_button.press()
+                    await pilot.pause()
+                assert _shown(app.player_slots) == [card_label(card) for card in app.player_hand.cards]
+                if app.hit_button.visible:
+                    app.stand_button.press()
+                    await pilot.pause()
+                await _wait_for(lambda: app.dealer_worker is None)
+                await pilot.pause()
+                assert _shown(app.dealer_slots) == [card_label(card) for card in app.dealer_hand.cards]
+
+            # The widgets are the ones mounted at the start
+            assert list(app.query_one("#dealer-hand").children) == dealer_slots
+            assert list(app.query_one("#player-hand").children) == player_slots
+
+    asyncio.run(run())
+
+
+def test_showing_the_same_card_skips_the_redraw():
+    async def run():
+        app = BlackjackApp(session_id="local", username="tester", watch_chat=False)
+        async with app.run_test(size=(160, 50)):
+            slot = app.player_slots[0]
+            updates = []
+            update = slot.update
+            slot.update = lambda text: updates.append(text) or update(text)
+            for code in (0, 0, HIDDEN_CARD, HIDDEN_CARD, 51):
+                slot.show_code(code)
+            assert updates == ["A\n♠", "O\n?", "K\n♣"]
+            assert slot.display
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_slots_are_reused_and_the_hole_card_revealed()
+    test_showing_the_same_card_skips_the_redraw()
+    print("All card slot tests passed")
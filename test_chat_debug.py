@@ -27,8 +27,8 @@ def send_test_message():
     # Check if Go server wrote to the broadcast file
     time.sleep(2)
     try:
-        if os.path.exists('/tmp/ssh-chat.log'):
-            with open('/tmp/ssh-chat.log', 'r') as f:
+        if os.path.exists('/tmp/ssh-chat/ssh-chat.log'):
+            with open('/tmp/ssh-chat/ssh-chat.log', 'r') as f:
                 content = f.read()
                 print(f"Broadcast file content: {content}")
         else:
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared-memory chat ring: cursors are independent, a
+session's own messages are skipped, lapped readers are told what they
+missed, long fields are cut at a character boundary, and a slot
+overwritten while it is read is dropped rather than decoded.
+"""
+import os
+import tempfile
+
+import chat_ring
+from chat_ring import SLOT_HEADER, ChatRing, RingReader
+
+
+def test_readers_keep_their_own_cursor():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.ring")
+        ring = ChatRing(path, slots=16, slot_size=128)
+        early = RingReader(path)
+        ring.append("alice", "2026-10-17T12:00:00Z", "hi")
+        late = RingReader(path)
+        ring.append("bob", "2026-10-17T12:00:01Z", "hello")
+
+        assert early.read() == ([("alice", "2026-10-17T12:00:00Z", "hi"),
+                                 ("bob", "2026-10-17T12:00:01Z", "hello")], 0)
+        assert early.read() == ([], 0)
+        assert late.read(b"bob") == ([], 0)
+
+        late.backfill(10)
+        assert [record[0] for record in late.read()[0]] == ["alice", "bob"]
+        for reader in (early, late):
+            reader.close()
+        ring.close()
+
+
+def test_lapped_reader_skips_ahead_with_notice():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.ring")
+        ring = ChatRing(path, slots=8, slot_size=64)
+        reader = RingReader(path)
+        for i in range(20):
+            ring.append("carol", "t", f"m{i}")
+        records, missed = reader.read()
+        assert missed == 20 - len(records)
+        assert [message for _, _, message in records] == [f"m{i}" for i in range(20 - len(records), 20)]
+        assert len(records) == 7  # a full ring less the slot being rewritten next
+        reader.close()
+        ring.close()
+
+
+def test_long_fields_are_truncated_safely():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.ring")
+        ring = ChatRing(path, slots=4, slot_size=48)
+        reader = RingReader(path)
+        ring.append("dave", "2026-10-17T12:00:00Z", "é" * 100)
+        (username, timestamp, message), = reader.read()[0]
+        assert username == "dave"
+        assert timestamp == "2026-10-17T12:00:00Z"
+        assert message and set(message) == {"é"}
+        reader.close()
+        ring.close()
+
+
+class _OverwrittenAfterFirstLook:
+    """SLOT_HEADER, except that the writer reuses the slot right after it is first read"""
+    size = SLOT_HEADER.size
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.calls = 0
+
+    def unpack_from(self, buffer, offset):
+        fields = SLOT_HEADER.unpack_from(buffer, offset)
+        self.calls += 1
+        if self.calls == 1:
+            seq, user_len, stamp_len, text_len = fields
+            buf = self.ring._map
+            buf[offset + SLOT_HEADER.size] = 0xFF  # half a new username: not UTF-8
+            SLOT_HEADER.pack_into(buf, offset, seq + self.ring.slots, user_len, stamp_len, text_len)
+        return fields
+
+
+def test_slot_overwritten_mid_read_is_dropped():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.ring")
+        ring = ChatRing(path, slots=4, slot_size=64)
+        reader = RingReader(path)
+        ring.append("erin", "t", "hello")
+        chat_ring.SLOT_HEADER = _OverwrittenAfterFirstLook(ring)
+        try:
+            assert reader.read() == ([], 1)
+        finally:
+            chat_ring.SLOT_HEADER = SLOT_HEADER
+        assert reader._mapping.decoded == {}
+        reader.close()
+        ring.close()
+
+
+if __name__ == "__main__":
+    test_readers_keep_their_own_cursor()
+    test_lapped_reader_skips_ahead_with_notice()
+    test_long_fields_are_truncated_safely()
+    test_slot_overwritten_mid_read_is_dropped()
+    print("All chat ring tests passed")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the segmented chat log: rotation and the index, background
+compaction, backfilling the last N messages across segments (also while a
+segment is being sealed), and a segment directory on another filesystem.
+"""
+import errno
+import json
+import os
+import shutil
+import tempfile
+
+from chat_store import ChatStore, backfill, history, read_index
+from chat_tail import ChatTailReader, tail_offset
+
+
+def _messages(start, count):
+    return [f'{{"username": "u", "message": "m{i}"}}' for i in range(start, start + count)]
+
+
+def test_tail_offset_counts_complete_lines_only():
+    with tempfile.TemporaryFile() as f:
+        f.write(b"one\ntwo\nthree\npartial")
+        assert tail_offset(f, 2, block=4) == (4, 2)
+        f.seek(4)
+        assert f.read().split(b"\n")[:2] == [b"two", b"three"]
+        assert tail_offset(f, 10) == (0, 3)
+        assert tail_offset(f, 0)[1] == 0
+
+
+def test_rotation_compaction_and_history():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        store = ChatStore(path, os.path.join(tmp, "segments"), segment_bytes=400, max_segments=3)
+        reader = ChatTailReader(path)
+        seen = []
+        for batch in range(10):
+            store.append(_messages(batch * 5, 5))
+            seen.extend(reader.read_lines())
+            store.wait()
+
+        # Readers follow every rotation without losing a line
+        assert seen == _messages(0, 50)
+
+        entries = read_index(store.directory)
+        assert len(entries) == 3
+        assert all(entry["file"].endswith(".gz") for entry in entries.values())
+        assert sorted(os.listdir(store.directory)) == sorted(
+            ["index.jsonl"] + [entry["file"] for entry in entries.values()])
+
+        # A late joiner takes the tail of the active segment, then older segments
+        late = ChatTailReader(path)
+        found = late.skip_to_last(12)
+        older = history(12 - found, store.directory)
+        assert older + late.read_lines() == _messages(38, 12)
+
+        late = ChatTailReader(path)
+        assert backfill(late, 12, store.directory) + late.read_lines() == _messages(38, 12)
+
+
+def test_backfill_is_bounded_by_what_is_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        store = ChatStore(path, os.path.join(tmp, "segments"), segment_bytes=200, max_segments=2)
+        for batch in range(20):
+            store.append(_messages(batch * 3, 3))
+            store.wait()
+        reader = ChatTailReader(path)
+        found = reader.skip_to_last(1000)
+        lines = history(1000 - found, store.directory) + reader.read_lines()
+        assert lines == _messages(60 - len(lines), len(lines))
+        assert len(lines) < 30
+
+
+def test_backfill_while_a_segment_is_sealed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        store = ChatStore(path, os.path.join(tmp, "segments"), segment_bytes=10_000)
+        store.append(_messages(0, 10))
+        store.rotate()
+        store.wait()
+        store.append(_messages(10, 10))
+
+        # Sealed between the reader opening its file and the index being read
+        reader = ChatTailReader(path)
+        skip = reader.skip_to_last
+
+        def sealed_after_open(lines):
+            found = skip(lines)
+            if store.next_seq() == 2:
+                store.rotate()
+                store.wait()
+            return found
+
+        reader.skip_to_last = sealed_after_open
+        older = backfill(reader, 15, store.directory)
+        store.append(_messages(20, 2))
+        assert older + reader.read_lines() == _messages(5, 17)
+
+        # Moved into the segment directory but not yet in the index
+        reader = ChatTailReader(path)
+        skip = reader.skip_to_last
+        moved = {}
+
+        def moved_before_open(lines):
+            if not moved:
+                moved["name"] = f"segment-{store.next_seq():06d}.log"
+                shutil.move(path, os.path.join(store.directory, moved["name"]))
+            elif "indexed" not in moved:
+                moved["indexed"] = True
+                store._append_index({"seq": 3, "file": moved["name"]})
+            return skip(lines)
+
+        reader.skip_to_last = moved_before_open
+        older = backfill(reader, 5, store.directory)
+        store.append(_messages(22, 1))
+        assert older + reader.read_lines() == _messages(17, 6)
+        assert json.loads(older[-1])["message"] == "m21"
+
+
+def test_rotation_into_another_filesystem():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        segments = os.path.join(tmp, "segments")
+        store = ChatStore(path, segments, segment_bytes=300)
+        reader = ChatTailReader(path)
+
+        rename, replace = os.rename, os.replace
+
+        def same_device_only(move):
+            def checked(src, dst, *args, **kwargs):
+                if os.path.dirname(src) != segments and os.path.dirname(dst) == segments:
+                    raise OSError(errno.EXDEV, "Invalid cross-device link")
+                return move(src, dst, *args, **kwargs)
+            return checked
+
+        store.append(_messages(0, 5))
+        seen = reader.read_lines()
+        os.rename, os.replace = same_device_only(rename), same_device_only(replace)
+        try:
+            store.append(_messages(5, 5))  # passes segment_bytes: rotates
+            store.wait()
+        finally:
+            os.rename, os.replace = rename, replace
+        assert seen + reader.read_lines() == _messages(0, 10)
+        assert not os.path.exists(path)
+        entry, = read_index(segments).values()
+        assert entry["messages"] == 10
+        assert history(20, segments) == _messages(0, 10)
+        assert os.listdir(tmp) == ["segments"]  # nothing left behind mid-move
+        reader.close()
+
+
+if __name__ == "__main__":
+    test_tail_offset_counts_complete_lines_only()
+    test_rotation_compaction_and_history()
+    test_backfill_is_bounded_by_what_is_kept()
+    test_backfill_while_a_segment_is_sealed()
+    test_rotation_into_another_filesystem()
+    print("All chat store tests passed")
@@ -31,8 +31,8 @@ def test_chat_system():
     time.sleep(2)
     
     # Check if message appears in chat log (what Python apps read)
-    if os.path.exists('/tmp/ssh-chat.log'):
-        with open('/tmp/ssh-chat.log', 'r') as f:
+    if os.path.exists('/tmp/ssh-chat/ssh-chat.log'):
+        with open('/tmp/ssh-chat/ssh-chat.log', 'r') as f:
             lines = f.readlines()
         
         found_message = False
@@ -7,9 +7,9 @@ echo "========================================"
 echo "Starting chat file monitor..."
 (
     while true; do
-        if [ -f /tmp/ssh-chat.log ]; then
+        if [ -f /tmp/ssh-chat/ssh-chat.log ]; then
             echo "--- Chat Log Contents ---"
-            cat /tmp/ssh-chat.log
+            cat /tmp/ssh-chat/ssh-chat.log
             echo "--- End of Chat Log ---"
             break
         fi
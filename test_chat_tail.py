@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental chat log reader: appends, partial lines,
+truncation and rotation.
+"""
+import os
+import tempfile
+
+from chat_tail import ChatTailReader
+
+
+def test_reads_only_appended_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        reader = ChatTailReader(path)
+        assert reader.read_lines() == []
+
+        with open(path, "a") as f:
+            f.write('{"message": "one"}\n{"message": "two"}\n')
+        assert reader.read_lines() == ['{"message": "one"}', '{"message": "two"}']
+        assert reader.read_lines() == []
+
+        with open(path, "a") as f:
+            f.write('{"message": "three"}\n')
+        assert reader.read_lines() == ['{"message": "three"}']
+        reader.close()
+
+
+def test_partial_line_is_buffered():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        with open(path, "a") as f:
+            f.write('{"message": "hal')
+        reader = ChatTailReader(path)
+        assert reader.read_lines() == []
+
+        with open(path, "a") as f:
+            f.write('f"}\n')
+        assert reader.read_lines() == ['{"message": "half"}']
+        reader.close()
+
+
+def test_truncation_restarts_from_top():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        with open(path, "w") as f:
+            f.write("old line one\nold line two\n")
+        reader = ChatTailReader(path)
+        assert len(reader.read_lines()) == 2
+
+        with open(path, "w") as f:
+            f.write("new\n")
+        assert reader.read_lines() == ["new"]
+        reader.close()
+
+
+def test_rotation_drains_old_file_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chat.log")
+        with open(path, "w") as f:
+            f.write("first\n")
+        reader = ChatTailReader(path)
+        assert reader.read_lines() == ["first"]
+
+        with open(path, "a") as f:
+            f.write("last of old\n")
+        os.rename(path, path + ".1")
+        with open(path, "w") as f:
+            f.write("fresh\n")
+        assert reader.read_lines() == ["last of old", "fresh"]
+        reader.close()
+
+
+if __name__ == "__main__":
+    test_reads_only_appended_lines()
+    test_partial_line_is_buffered()
+    test_truncation_restarts_from_top()
+    test_rotation_drains_old_file_first()
+    print("✓ Chat tail reader tests passed")
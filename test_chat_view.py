@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded chat buffer and timestamp formatting.
+"""
+from chat_view import ChatBuffer, format_chat_time
+
+
+class FakeLog:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, content):
+        self.updates.append(str(content))
+
+
+def test_format_chat_time():
+    assert format_chat_time("2025-07-19T12:34:56Z") == "12:34:56"
+    assert format_chat_time("2025-07-19T12:34:56.123456789Z") == "12:34:56"
+    assert format_chat_time("2025-07-19T12:34:56.5+02:00") == "12:34:56"
+    assert format_chat_time("garbage") == ""
+    assert len(format_chat_time("")) == 8
+
+
+def test_buffer_is_bounded_and_flushes_once_per_batch():
+    log = FakeLog()
+    buffer = ChatBuffer(log, max_lines=3)
+    for i in range(5):
+        buffer.append_message({"username": "bob", "message": f"msg {i}",
+                               "timestamp": "2025-07-19T10:00:00Z"})
+    assert log.updates == []
+
+    buffer.flush()
+    buffer.flush()
+    assert len(log.updates) == 1
+    assert log.updates[0].splitlines() == [
+        "[10:00:00] bob: msg 2",
+        "[10:00:00] bob: msg 3",
+        "[10:00:00] bob: msg 4",
+    ]
+
+
+if __name__ == "__main__":
+    test_format_chat_time()
+    test_buffer_is_bounded_and_flushes_once_per_batch()
+    print("✓ Chat view tests passed")
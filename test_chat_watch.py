@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test that the inotify chat watcher pushes writes, including after the
+file is removed and recreated.
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from chat_watch import ChatFileWatcher
+
+
+async def _wait_for(event, timeout=2.0):
+    await asyncio.wait_for(event.wait(), timeout)
+    event.clear()
+
+
+def test_watcher_pushes_writes():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "chat.log")
+            fired = asyncio.Event()
+            watcher = ChatFileWatcher(path, fired.set)
+            if not watcher.start():
+                pytest.skip("inotify not available")
+
+            # File doesn't exist yet: creation is noticed through the directory watch
+            with open(path, "a") as f:
+                f.write("hello\n")
+            await _wait_for(fired)
+
+            with open(path, "a") as f:
+                f.write("again\n")
+            await _wait_for(fired)
+
+            # Unrelated files in the same directory don't wake us
+            with open(os.path.join(tmp, "other.log"), "a") as f:
+                f.write("noise\n")
+            await asyncio.sleep(0.1)
+            assert not fired.is_set()
+
+            os.remove(path)
+            await asyncio.sleep(0.05)
+            fired.clear()
+            with open(path, "a") as f:
+                f.write("recreated\n")
+            await _wait_for(fired)
+            watcher.stop()
+
+    asyncio.run(run())
+
+
+def test_watcher_creates_missing_directory():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ssh-chat", "chat.log")
+            fired = asyncio.Event()
+            watcher = ChatFileWatcher(path, fired.set)
+            if not watcher.start():
+                pytest.skip("inotify not available")
+
+            # Started before any writer made the directory
+            assert os.path.isdir(os.path.dirname(path))
+            with open(path, "a") as f:
+                f.write("hello\n")
+            await _wait_for(fired)
+            watcher.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_watcher_pushes_writes()
+    test_watcher_creates_missing_directory()
+    print("✓ Chat watcher test passed")
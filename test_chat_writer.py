@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the background chat writer: bursts are group-committed, a full
+queue drops instead of blocking, rotation under the handle is noticed, and
+a failed write is counted and logged without stalling drain(), and each
+session's own counts leave out the other sessions' lines.
+"""
+import asyncio
+import os
+import tempfile
+
+import debuglog
+from chat_writer import ChatWriteCounts, ChatWriter, shared_writer
+
+
+def test_burst_is_written_as_one_batch():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.log")
+            writer = ChatWriter(path)
+            writer.start()
+            for i in range(50):
+                assert writer.submit(f"line {i}")
+            await writer.drain()
+            with open(path) as f:
+                assert f.read().splitlines() == [f"line {i}" for i in range(50)]
+            assert writer.written == 50
+            assert writer.batches == 1
+            await writer.close()
+
+    asyncio.run(run())
+
+
+def test_full_queue_drops_and_counts():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.log")
+            writer = ChatWriter(path, maxsize=4)
+            writer.start()
+            results = [writer.submit(f"line {i}") for i in range(6)]
+            assert results == [True] * 4 + [False] * 2
+            assert writer.dropped == 2
+            assert "2 dropped" in writer.report()
+
+            # The waiting variant applies backpressure instead of dropping
+            for i in range(10):
+                await writer.write(f"more {i}")
+            await writer.close()
+            with open(path) as f:
+                assert len(f.read().splitlines()) == 14
+
+    asyncio.run(run())
+
+
+def test_reopens_after_file_is_removed():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.log")
+            writer = shared_writer(path)
+            assert shared_writer(path) is writer
+            writer.submit("before")
+            await writer.drain()
+            os.remove(path)
+            writer.submit("after")
+            await writer.drain()
+            with open(path) as f:
+                assert f.read() == "after\n"
+            await writer.close()
+
+    asyncio.run(run())
+
+
+def test_failed_write_is_logged_and_drain_returns():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.log")
+            writer = ChatWriter(path)
+            writer.start()
+            write = writer._write
+            failures = [ValueError("bad batch"), PermissionError("read-only")]
+
+            def flaky(data):
+                if failures:
+                    raise failures.pop(0)
+                write(data)
+
+            writer._write = flaky
+            for line in ("lost", "also lost", "kept"):
+                writer.submit(line)
+                await asyncio.wait_for(writer.drain(), 1.0)
+            assert writer.errors == 2 and writer.written == 1
+            with open(path) as f:
+                assert f.read() == "kept\n"
+            events = [(event, fields["error"]) for _, _, event, fields in debuglog.ring]
+            assert events == [("chat.write_failed", "ValueError('bad batch')"),
+                              ("chat.write_failed", "PermissionError('read-only')")]
+            await writer.close()
+
+    debuglog.configure({"BLACKJACK_DEBUG": "warning"})
+    try:
+        debuglog.ring.clear()
+        asyncio.run(run())
+    finally:
+        debuglog.configure({})
+        debuglog.ring.clear()
+
+
+def test_sessions_count_their_own_lines():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = ChatWriter(os.path.join(tmp, "out.log"), maxsize=4)
+            writer.start()
+            alice, bob = ChatWriteCounts(), ChatWriteCounts()
+            for i in range(3):
+                writer.submit(f"alice {i}", alice)
+            writer.submit("bob 0", bob)
+            assert not writer.submit("bob 1", bob)
+            await writer.drain()
+            assert (writer.written, writer.batches, writer.dropped) == (4, 1, 1)
+            assert (alice.written, alice.batches, alice.dropped) == (3, 1, 0)
+            assert (bob.written, bob.batches, bob.dropped) == (1, 1, 1)
+            assert bob.report().startswith("1 lines in 1 writes, 1 dropped")
+            await writer.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_burst_is_written_as_one_batch()
+    test_full_queue_drops_and_counts()
+    test_reopens_after_file_is_removed()
+    test_failed_write_is_logged_and_drain_returns()
+    test_sessions_count_their_own_lines()
+    print("All chat writer tests passed")
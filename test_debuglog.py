@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the debug log: nothing is recorded while it is off, levels filter
+when it is on, and a dump writes the ring as JSON lines.
+"""
+import json
+import os
+import tempfile
+
+import debuglog
+
+
+def test_disabled_records_nothing():
+    debuglog.configure({})
+    debuglog.ring.clear()
+    assert debuglog.debug is debuglog._noop
+    debuglog.debug("input.submitted", input="chat-input")
+    debuglog.error("chat.dropped")
+    assert len(debuglog.ring) == 0
+    assert not debuglog.enabled()
+
+
+def test_levels_and_dump():
+    debuglog.configure({"BLACKJACK_DEBUG": "info", "BLACKJACK_DEBUG_LINES": "3"})
+    try:
+        debuglog.ring.clear()
+        debuglog.debug("too.quiet")
+        for i in range(4):
+            debuglog.info("session.start", session=f"s{i}")
+        debuglog.warning("chat.dropped", session="s9", reason="queue full")
+        assert not debuglog.enabled(debuglog.DEBUG)
+        assert debuglog.enabled(debuglog.INFO)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = debuglog.dump(os.path.join(tmp, "debug.jsonl"))
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        # The ring keeps only the newest three events
+        assert [r["event"] for r in records] == ["session.start", "session.start", "chat.dropped"]
+        assert records[-1]["level"] == "warning"
+        assert records[-1]["reason"] == "queue full"
+        assert records[0]["session"] == "s2"
+    finally:
+        debuglog.configure({})
+
+
+if __name__ == "__main__":
+    test_disabled_records_nothing()
+    test_levels_and_dump()
+    print("All debug log tests passed")
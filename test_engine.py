@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless round API: dealing, dealer rules and settlement.
+"""
+import random
+from array import array
+
+from engine import (
+    DEALER_BUST, DEALER_WIN, PLAYER_BLACKJACK, PLAYER_BUST, PLAYER_WIN, PUSH,
+    CARD_VALUES, Hand, Round, Shoe, generate_shoe,
+)
+
+# Card codes for spades of each rank
+A, TWO, FIVE, SIX, SEVEN, EIGHT, NINE, TEN, K = 0, 4, 16, 20, 24, 28, 32, 36, 48
+
+
+def rigged(*cards):
+    return Shoe(array("B", cards))
+
+
+def test_running_totals_match_a_full_recount():
+    hand = Hand("Player")
+    for _ in range(2000):
+        if hand.hard > 21 or random.random() < 0.2:
+            hand.clear()
+        hand.add(random.randrange(52))
+        low = sum(CARD_VALUES[c] for c in hand.cards)
+        soft = any(CARD_VALUES[c] == 1 for c in hand.cards) and low + 10 <= 21
+        assert hand.values() == (low, low + 10 if soft else low)
+        assert hand.is_bust() == (low > 21)
+
+
+def test_natural_settles_immediately():
+    rnd = Round(rigged(A, NINE, K, SEVEN))
+    assert rnd.deal()
+    assert rnd.settle() == PLAYER_BLACKJACK
+
+
+def test_player_bust():
+    rnd = Round(rigged(TEN, NINE, SIX, SEVEN, K))
+    assert not rnd.deal()
+    rnd.hit()
+    assert rnd.player_bust()
+    assert rnd.settle() == PLAYER_BUST
+
+
+def test_dealer_draws_to_17_and_stands_on_soft_17():
+    # Player 10+8; dealer 5+A is soft 16, draws an ace to soft 17 and stands
+    rnd = Round(rigged(TEN, FIVE, EIGHT, A, A, K))
+    rnd.deal()
+    rnd.play_dealer()
+    assert rnd.dealer.values() == (7, 17)
+    assert rnd.settle() == PLAYER_WIN
+
+
+def test_dealer_bust_win_and_push():
+    rnd = Round(rigged(TEN, TEN, EIGHT, SIX, K))
+    rnd.deal()
+    rnd.play_dealer()
+    assert rnd.settle() == DEALER_BUST
+
+    rnd = Round(rigged(TEN, TEN, SEVEN, NINE))
+    rnd.deal()
+    rnd.play_dealer()
+    assert rnd.settle() == DEALER_WIN
+
+    rnd = Round(rigged(TEN, TEN, NINE, NINE))
+    rnd.deal()
+    rnd.play_dealer()
+    assert rnd.settle() == PUSH
+
+
+def test_many_rounds_through_a_shoe():
+    rnd = Round(generate_shoe())
+    outcomes = set()
+    while len(rnd.shoe) > 20:
+        if not rnd.deal():
+            while rnd.player.values()[1] < 17:
+                rnd.hit()
+            if not rnd.player_bust():
+                rnd.play_dealer()
+        outcomes.add(rnd.settle())
+    assert outcomes <= {PLAYER_BLACKJACK, PLAYER_BUST, DEALER_BUST, PLAYER_WIN, DEALER_WIN, PUSH}
+
+
+if __name__ == "__main__":
+    test_running_totals_match_a_full_recount()
+    test_natural_settles_immediately()
+    test_player_bust()
+    test_dealer_draws_to_17_and_stands_on_soft_17()
+    test_dealer_bust_win_and_push()
+    test_many_rounds_through_a_shoe()
+    print("✓ Engine tests passed")
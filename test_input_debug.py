@@ -49,7 +49,7 @@ def simulate_user_input():
         time.sleep(2)
         
         try:
-            with open('/tmp/ssh-chat.log', 'r') as f:
+            with open('/tmp/ssh-chat/ssh-chat.log', 'r') as f:
                 lines = f.readlines()
                 
             # Look for our message in the broadcast file
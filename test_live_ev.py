@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for shoe composition tracking and the live EV solver.
+"""
+import tempfile
+
+from engine import CARD_VALUES, Round, generate_shoe
+from live_ev import solve, unseen_counts
+from strategy import load_table, shoe_counts
+
+
+def test_shoe_tracks_remaining_values():
+    shoe = generate_shoe()
+    assert tuple(shoe.remaining) == shoe_counts(6)
+    drawn = [shoe.draw() for _ in range(30)]
+    expected = list(shoe_counts(6))
+    for card in drawn:
+        expected[CARD_VALUES[card] - 1] -= 1
+    assert shoe.remaining == expected
+
+
+def test_fresh_shoe_agrees_with_basic_strategy():
+    with tempfile.TemporaryDirectory() as tmp:
+        table = load_table(6, tmp)
+    full = list(shoe_counts(6))
+    # Player 10+6 against a 10: only the player's cards and the up card are seen
+    for value in (10, 6, 10):
+        full[value - 1] -= 1
+    stand, hit = solve(tuple(full), 16, False, 10)
+    table_stand, table_hit = table.lookup(16, False, 10)
+    assert hit > stand
+    assert abs(stand - table_stand) < 0.02
+    assert abs(hit - table_hit) < 0.02
+
+
+def test_repeated_states_hit_the_cache():
+    rnd = Round(generate_shoe())
+    rnd.deal()
+    state = (unseen_counts(rnd.shoe, rnd.dealer.cards[1]), rnd.player.hard,
+             rnd.player.aces > 0, CARD_VALUES[rnd.dealer.cards[0]])
+    first = solve(*state)
+    hits = solve.cache_info().hits
+    assert solve(*state) == first
+    assert solve.cache_info().hits == hits + 1
+
+
+if __name__ == "__main__":
+    test_shoe_tracks_remaining_values()
+    test_fresh_shoe_agrees_with_basic_strategy()
+    test_repeated_states_hit_the_cache()
+    print("✓ Live EV tests passed")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the load generator: percentiles and the per-run summary, and a
+short in-process run where two sessions play and see each other's chat.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+from loadgen import percentiles, run_in_process, summarize
+
+
+def test_percentiles_in_milliseconds():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentiles(values) == {"p50": 51.0, "p90": 91.0, "p99": 100.0, "max": 100.0}
+    assert percentiles([]) == {"p50": None, "p90": None, "p99": None, "max": None}
+
+
+def test_summary_counts_chat_deliveries():
+    sessions = [
+        {"latencies": [0.01, 0.02], "timeouts": 1, "chat_sent": 2, "chat_latencies": [0.1],
+         "bytes": 1000, "rss_mb": 2.0, "cpu_s": 0.5},
+        {"latencies": [0.03], "timeouts": 0, "chat_sent": 1, "chat_latencies": [0.2, 0.3],
+         "bytes": 3000, "rss_mb": 4.0, "cpu_s": 1.5},
+    ]
+    row = summarize("in-process", 2, sessions, elapsed=10.0, duration=5.0)
+    assert (row["actions"], row["actions_per_s"], row["timeouts"]) == (3, 0.6, 1)
+    assert (row["chat_sent"], row["chat_delivered"], row["chat_expected"]) == (3, 3, 3)
+    assert (row["bytes_per_session"], row["rss_mb_per_session"], row["cpu_percent_per_session"]) == (2000, 3.0, 10.0)
+
+
+def test_sessions_play_and_chat():
+    saved = os.environ.get("BLACKJACK_STATS_DB")
+    with tempfile.TemporaryDirectory() as tmp:
+        options = argparse.Namespace(duration=1.5, rate=10.0, chat_interval=0.5, pacing="instant", ramp=0.0,
+                                     no_relay=False, chat_dir=tmp)
+        os.environ["BLACKJACK_STATS_DB"] = os.path.join(tmp, "stats.sqlite3")  # not the real leaderboard
+        try:
+            row = asyncio.run(run_in_process(2, options))
+        finally:
+            if saved is None:
+                del os.environ["BLACKJACK_STATS_DB"]
+            else:
+                os.environ["BLACKJACK_STATS_DB"] = saved
+    assert row["actions"] > 5 and row["timeouts"] == 0
+    assert row["action_latency_ms"]["p50"] is not None
+    assert row["chat_sent"] >= 2 and row["chat_delivered"] > 0
+
+
+if __name__ == "__main__":
+    test_percentiles_in_milliseconds()
+    test_summary_counts_chat_deliveries()
+    test_sessions_play_and_chat()
+    print("All load generator tests passed")
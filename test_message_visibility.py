@@ -13,7 +13,7 @@ def test_message_visibility():
     
     # Read the current broadcast file
     try:
-        with open('/tmp/ssh-chat.log', 'r') as f:
+        with open('/tmp/ssh-chat/ssh-chat.log', 'r') as f:
             lines = f.readlines()
         
         print(f"Messages that '{current_username}' should see:")
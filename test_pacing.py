@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for dealer pacing: the instant profile settles a round with no
+pauses, an explicit step delay overrides the profile, and Deal pressed
+while the dealer is still playing is queued, skips the rest of the
+animation and deals the next hand.
+"""
+import asyncio
+import random
+import time
+
+from main import BlackjackApp, RESULT_MESSAGES
+
+
+async def _deal_playable_hand(app, pilot):
+    """Deal until the player has a hand to stand on (not a natural)"""
+    while not app.hit_button.visible:
+        app.deal_button.press()
+        await pilot.pause()
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_instant_pacing_settles_at_once():
+    async def run():
+        random.seed(7)
+        app = BlackjackApp(pacing="instant")
+        async with app.run_test(size=(160, 50)) as pilot:
+            await _deal_playable_hand(app, pilot)
+            start = time.monotonic()
+            app.stand_button.press()
+            await _wait_for(lambda: app.dealer_worker is None and not app.stand_button.visible)
+            assert time.monotonic() - start < 0.5
+            assert str(app.console_log.render()).startswith(tuple(RESULT_MESSAGES.values()))
+
+    asyncio.run(run())
+
+
+def test_step_delay_overrides_pacing():
+    import main
+
+    profiles = dict(main.PACING)
+    assert BlackjackApp(pacing="normal", step_delay=0.05).step_delay == 0.05
+    assert BlackjackApp(pacing="fast", step_delay=0).step_delay == 0
+    assert BlackjackApp(pacing="fast").step_delay == profiles["fast"]
+    assert main.PACING == profiles
+
+
+def test_deal_during_animation_skips_to_next_hand():
+    async def run():
+        random.seed(7)
+        app = BlackjackApp(pacing="normal")
+        async with app.run_test(size=(160, 50)) as pilot:
+            await _deal_playable_hand(app, pilot)
+            dealt = app.shoe.position
+            app.stand_button.press()
+            await pilot.pause()
+            assert app.dealer_worker is not None  # dealer still playing, 1 s per step
+
+            start = time.monotonic()
+            app.deal_button.press()
+            await _wait_for(lambda: app.shoe.position >= dealt + 4 and app.dealer_worker is None)
+            assert time.monotonic() - start < 0.5
+            assert app.hit_button.visible or app.player_hand.is_blackjack()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_instant_pacing_settles_at_once()
+    test_step_delay_overrides_pacing()
+    test_deal_during_animation_skips_to_next_hand()
+    print("All pacing tests passed")
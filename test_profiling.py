@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the profiling hooks: off unless switched on, one session picked
+by id, and each mode writes its files tagged with the session.
+"""
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+
+import profiling
+
+
+def _busy(seconds):
+    stop = time.perf_counter() + seconds
+    while time.perf_counter() < stop:
+        sum(range(100))
+
+
+def _configure(**env):
+    env = {key: str(value) for key, value in env.items()}
+    profiling.configure(env)
+    return env
+
+
+def test_off_by_default():
+    env = _configure()
+    assert profiling.for_session("session-1", env) is None
+
+
+def test_cprofile_for_one_session():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _configure(BLACKJACK_PROFILE="cprofile", BLACKJACK_PROFILE_SESSION="session-2",
+                         BLACKJACK_PROFILE_DIR=tmp)
+        try:
+            assert profiling.for_session("session-1", env) is None
+            profiler = profiling.for_session("session-2", env)
+            assert profiling.for_session("session-2", env) is None  # one at a time
+            _busy(0.05)
+            path, = profiler.stop()
+            assert os.path.basename(path) == f"blackjack-session-2-{os.getpid()}.prof"
+            assert "_busy" in {name for _, _, name in pstats.Stats(path).stats}
+            assert not profiling.active
+        finally:
+            _configure()
+
+
+def test_sampler_and_allocation_snapshots():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _configure(BLACKJACK_PROFILE="sample", BLACKJACK_PROFILE_INTERVAL=0.001,
+                         BLACKJACK_TRACEMALLOC=2, BLACKJACK_PROFILE_DIR=tmp)
+        try:
+            profiler = profiling.for_session("session/3", env)
+            kept = []
+            for _ in range(4):
+                kept.append([object() for _ in range(1000)])
+                profiler.hand_finished()
+            _busy(0.1)
+            folded, alloc = profiler.stop()
+            with open(folded) as f:
+                assert any("_busy" in line for line in f)
+            assert os.path.basename(alloc) == f"blackjack-session_3-{os.getpid()}-alloc.txt"
+            with open(alloc) as f:
+                headers = [line for line in f if line.startswith("==")]
+            assert [header.split(" (")[0] for header in headers] == [
+                "== mount", "== after 2 hands", "== after 4 hands", "== at exit, 4 hands"]
+        finally:
+            _configure()
+            tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    test_off_by_default()
+    test_cprofile_for_one_session()
+    test_sampler_and_allocation_snapshots()
+    print("All profiling tests passed")
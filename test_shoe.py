@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact shoe: composition, cut card and draw order, and the
+shoe manager's switch to a shoe shuffled in the background.
+"""
+import asyncio
+import random
+from collections import Counter
+
+from engine import BREAK, Hand, Round, ShoeManager, card_label, generate_shoe
+from main import BlackjackApp
+
+
+def test_shoe_composition():
+    shoe = generate_shoe(num_decks=6)
+    assert len(shoe) == 6 * 52 + 1
+    counts = Counter(shoe.cards)
+    assert counts.pop(BREAK) == 1
+    assert len(counts) == 52
+    assert set(counts.values()) == {6}
+
+
+def test_draw_skips_cut_card():
+    shoe = generate_shoe(num_decks=1)
+    drawn = []
+    try:
+        while True:
+            drawn.append(shoe.draw())
+    except IndexError:
+        pass
+    assert shoe.cut_card_reached
+    assert BREAK not in drawn
+    assert sorted(drawn) == list(range(52))
+
+
+def test_hand_values_from_codes():
+    hand = Hand("Player")
+    hand.add(0)        # A♠
+    hand.add(12 * 4)   # K♠
+    assert hand.values() == (11, 21)
+    assert hand.is_blackjack()
+    assert card_label(12 * 4 + 1) == "K♥"
+
+
+def test_manager_switches_shoes_between_rounds():
+    manager = ShoeManager(num_decks=6)
+    rnd = Round(manager.shoe)
+    first = manager.shoe
+    hands = 0
+    while manager.shoes < 4:
+        if manager.start_round():
+            assert first.cut_card_reached and manager.shoe is not first
+            assert len(first) >= 20  # the round that met the cut card still had cards to finish
+            first = rnd.shoe = manager.shoe
+        elif first.position * 2 >= len(first.cards):
+            assert manager._shuffler is not None  # the next shoe is being shuffled already
+        rnd.deal()
+        while rnd.player.values()[1] < 17:
+            rnd.hit()
+        rnd.play_dealer()
+        rnd.settle()
+        hands += 1
+    assert hands > 100
+    assert Counter(manager.shoe.cards)[BREAK] == 1 and len(manager.shoe.cards) == 6 * 52 + 1
+
+
+def test_secure_shuffle():
+    manager = ShoeManager(num_decks=2, secure=True)
+    assert isinstance(manager.rng, random.SystemRandom)
+    counts = Counter(manager.shoe.cards)
+    assert counts.pop(BREAK) == 1
+    assert set(counts.values()) == {2}
+
+
+def test_app_deals_from_a_new_shoe_after_the_cut_card():
+    async def run():
+        app = BlackjackApp(session_id="local", username="tester", watch_chat=False, pacing="instant")
+        async with app.run_test(size=(160, 50)) as pilot:
+            old = app.shoe
+            old.cut_card_reached = True
+            app.deal_button.press()
+            await pilot.pause()
+            assert app.shoe is app.shoes.shoe is not old
+            assert app.shoe.position == 4 and app.shoes.shoes == 2
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_shoe_composition()
+    test_draw_skips_cut_card()
+    test_hand_values_from_codes()
+    test_manager_switches_shoes_between_rounds()
+    test_secure_shuffle()
+    test_app_deals_from_a_new_shoe_after_the_cut_card()
+    print("✓ Shoe tests passed")
@@ -50,9 +50,9 @@ time.sleep(2)
         print(f"Error: {e}")
     
     # Check if chat file was created
-    if os.path.exists('/tmp/ssh-chat.log'):
+    if os.path.exists('/tmp/ssh-chat/ssh-chat.log'):
         print("\nChat log file contents:")
-        with open('/tmp/ssh-chat.log', 'r') as f:
+        with open('/tmp/ssh-chat/ssh-chat.log', 'r') as f:
             print(f.read())
     else:
         print("Chat log file was not created")
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test the in-process SSH host over loopback: several sessions share one
+event loop, each sees its own game, and a chat log write reaches them all.
+Also that a low-bandwidth session's channel writes stay under the frame cap.
+"""
+import asyncio
+import json
+import os
+import tempfile
+
+import pytest
+
+import ssh_host
+from ssh_host import asyncssh
+
+
+async def _read_until(process, text, timeout=10.0):
+    output = ""
+    while text not in output:
+        output += await asyncio.wait_for(process.stdout.read(65536), timeout)
+    return output
+
+
+def test_sessions_share_one_loop():
+    if asyncssh is None:
+        pytest.skip("asyncssh not installed")
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            chat_file = os.path.join(tmp, "chat.log")
+            ssh_host.chat_hub = ssh_host.ChatHub(chat_file)
+            ssh_host.chat_hub.start()
+            server = await asyncssh.create_server(
+                ssh_host._Server, "127.0.0.1", 0,
+                server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+                process_factory=ssh_host.run_session,
+                line_editor=False,
+            )
+            port = server.sockets[0].getsockname()[1]
+
+            sessions = []
+            for name in ("alice", "bob"):
+                conn = await asyncssh.connect("127.0.0.1", port, username=name, known_hosts=None)
+                process = await conn.create_process(term_type="xterm", term_size=(160, 50))
+                output = await _read_until(process, "Deal")
+                assert f"Welcome {name}" in output
+                sessions.append((conn, process))
+            assert len(ssh_host.chat_hub.apps) == 2
+
+            # Sessions don't read the hub's file, so point them at it
+            for app in ssh_host.chat_hub.apps:
+                app.chat_reader.close()
+                app.chat_reader = ssh_host.ChatTailReader(chat_file)
+            with open(chat_file, "a") as f:
+                f.write(json.dumps({"username": "carol", "message": "hi-all", "timestamp": ""}) + "\n")
+            for _, process in sessions:
+                await _read_until(process, "hi-all")
+
+            # Ctrl+C ends one session without touching the other
+            conn, process = sessions[0]
+            process.stdin.write("\x03")
+            await asyncio.wait_for(process.wait_closed(), 5)
+            assert len(ssh_host.chat_hub.apps) == 1
+
+            # A dropped connection ends its app too
+            sessions[1][0].close()
+            for _ in range(50):
+                if not ssh_host.chat_hub.apps:
+                    break
+                await asyncio.sleep(0.1)
+            assert not ssh_host.chat_hub.apps
+
+            conn.close()
+            ssh_host.chat_hub.watcher.stop()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_low_bandwidth_hint():
+    if asyncssh is None:
+        pytest.skip("asyncssh not installed")
+    from main import low_bandwidth_requested
+
+    assert low_bandwidth_requested({"LC_BLACKJACK_LOW_BANDWIDTH": "yes"})
+    assert not low_bandwidth_requested({"LC_BLACKJACK_LOW_BANDWIDTH": "0"})
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            ssh_host.chat_hub = ssh_host.ChatHub(os.path.join(tmp, "chat.log"))
+            server = await asyncssh.create_server(
+                ssh_host._Server, "127.0.0.1", 0,
+                server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+                process_factory=ssh_host.run_session,
+                line_editor=False,
+            )
+            port = server.sockets[0].getsockname()[1]
+            conn = await asyncssh.connect("127.0.0.1", port, username="dave", known_hosts=None)
+            process = await conn.create_process(term_type="xterm", term_size=(100, 30),
+                                                env={"LC_BLACKJACK_LOW_BANDWIDTH": "1"})
+            output = await _read_until(process, "Deal")
+            app, = ssh_host.chat_hub.apps
+            assert app.low_bandwidth
+            assert "\x1b[?1003h" not in output  # clicks only, no motion reports
+
+            process.stdin.write("\x03")
+            await asyncio.wait_for(process.wait_closed(), 5)
+            conn.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
+
+
+class _Channel:
+    """Stands in for an asyncssh process: records when each write went out"""
+
+    def __init__(self):
+        self.stdout = self
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append((asyncio.get_running_loop().time(), data))
+
+
+def test_frame_interval_caps_channel_writes():
+    if asyncssh is None:
+        pytest.skip("asyncssh not installed")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        channel = _Channel()
+        driver = ssh_host.ChannelDriver(channel, None, frame_interval=0.1)
+        # What Textual does on every frame: write the update, then flush
+        start = loop.time()
+        frames = 0
+        while loop.time() - start < 0.6:
+            driver.write(f"frame {frames};")
+            driver.flush()
+            frames += 1
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.15)
+
+        times = [when for when, _ in channel.writes]
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        assert frames > 30 and 5 <= len(times) <= 8
+        assert min(gaps) >= 0.1 - 0.005
+        assert "".join(data for _, data in channel.writes) == "".join(f"frame {i};" for i in range(frames))
+
+        # Without a cap every flush goes straight out
+        channel = _Channel()
+        driver = ssh_host.ChannelDriver(channel, None)
+        for i in range(3):
+            driver.write(f"frame {i};")
+            driver.flush()
+        assert len(channel.writes) == 3
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_sessions_share_one_loop()
+    test_low_bandwidth_hint()
+    test_frame_interval_caps_channel_writes()
+    print("ok")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the start-up path: work the first frame doesn't need runs after
+it, and CSS parsed by one session is reused by the next in the same process
+instead of being parsed again. A zygote warm-up app starts no stats thread,
+even with a stats database configured. A low-bandwidth app caps its own
+frame rate, whichever driver it runs under.
+"""
+import asyncio
+import functools
+import os
+import tempfile
+
+import main
+from frame_cap import FrameCap
+from main import BlackjackApp
+
+
+def test_setup_finishes_after_first_paint():
+    async def run():
+        app = BlackjackApp(session_id="local", username="tester", watch_chat=False)
+        async with app.run_test(size=(160, 50)) as pilot:
+            while not app.setup_done:
+                await pilot.pause(0.01)
+            events = [name for name, _ in app.timeline]
+            assert events == ["app init", "mount", "after first paint", "deferred setup done"]
+            times = [when for _, when in app.timeline]
+            assert times == sorted(times)
+
+    asyncio.run(run())
+
+
+def test_parsed_css_is_shared_in_process():
+    saved = dict(main.PREPARSED_CSS), set(main.CSS_LAYOUTS_KEPT)
+
+    async def run(app):
+        async with app.run_test(size=(160, 50)) as pilot:
+            while not app.setup_done:
+                await pilot.pause(0.01)
+
+    try:
+        main.PREPARSED_CSS.clear()
+        main.CSS_LAYOUTS_KEPT.clear()
+        first = BlackjackApp(session_id="local", username="tester", watch_chat=False)
+        assert first.css_cache
+        asyncio.run(run(first))
+        assert first.css_cache is None and main.PREPARSED_CSS
+
+        # The next app of the same layout starts from the kept rules
+        second = BlackjackApp(session_id="local", username="tester", watch_chat=False)
+        assert second.css_cache is None
+        assert set(main.PREPARSED_CSS) <= set(second.stylesheet._parse_cache.keys())
+
+        # Another layout is kept separately
+        low = BlackjackApp(session_id="local", username="tester", watch_chat=False, low_bandwidth=True)
+        assert low.css_cache not in (None, first.css_cache)
+    finally:
+        main.PREPARSED_CSS.clear()
+        main.PREPARSED_CSS.update(saved[0])
+        main.CSS_LAYOUTS_KEPT.clear()
+        main.CSS_LAYOUTS_KEPT.update(saved[1])
+
+
+def test_missing_parse_cache_is_tolerated():
+    class Stylesheet:
+        pass
+
+    assert main.stylesheet_parse_cache(Stylesheet()) is None
+    main.seed_parsed_css(Stylesheet())
+    main.keep_parsed_css(Stylesheet())
+
+
+def test_warm_up_app_leaves_stats_alone():
+    async def run(app):
+        async with app.run_test(size=(160, 50)) as pilot:
+            while not app.setup_done:
+                await pilot.pause(0.01)
+
+    saved = os.environ.get("BLACKJACK_STATS_DB")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["BLACKJACK_STATS_DB"] = os.path.join(tmp, "stats.sqlite3")
+            app = BlackjackApp(watch_chat=False, warm_up=True)
+            asyncio.run(run(app))
+            assert app.stats is None
+            assert not os.path.exists(os.environ["BLACKJACK_STATS_DB"])
+    finally:
+        if saved is None:
+            os.environ.pop("BLACKJACK_STATS_DB", None)
+        else:
+            os.environ["BLACKJACK_STATS_DB"] = saved
+
+
+def test_low_bandwidth_caps_the_driver():
+    from textual.driver import Driver
+
+    class HostDriver(FrameCap, Driver):
+        def __init__(self, channel, app, **kwargs):
+            super().__init__(app, **kwargs)
+
+    saved = os.environ.get("BLACKJACK_LOW_BANDWIDTH_FPS")
+    try:
+        os.environ["BLACKJACK_LOW_BANDWIDTH_FPS"] = "5"
+        # The terminal driver of a fresh or zygote-forked session
+        app = BlackjackApp(watch_chat=False, low_bandwidth=True)
+        assert issubclass(app.driver_class.func, FrameCap)
+        assert app.driver_class.keywords["frame_interval"] == 0.2
+
+        # A host's own driver keeps its arguments
+        hosted = BlackjackApp(watch_chat=False, low_bandwidth=True,
+                              driver_class=functools.partial(HostDriver, "channel"))
+        assert hosted.driver_class.func is HostDriver
+        assert hosted.driver_class.args == ("channel",)
+        assert hosted.driver_class.keywords["frame_interval"] == 0.2
+
+        assert not isinstance(BlackjackApp(watch_chat=False, low_bandwidth=False).driver_class, functools.partial)
+    finally:
+        if saved is None:
+            os.environ.pop("BLACKJACK_LOW_BANDWIDTH_FPS", None)
+        else:
+            os.environ["BLACKJACK_LOW_BANDWIDTH_FPS"] = saved
+
+
+if __name__ == "__main__":
+    test_setup_finishes_after_first_paint()
+    test_parsed_css_is_shared_in_process()
+    test_missing_parse_cache_is_tolerated()
+    test_warm_up_app_leaves_stats_alone()
+    test_low_bandwidth_caps_the_driver()
+    print("All start-up tests passed")
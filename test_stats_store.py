@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for the bankroll and statistics store: hands are folded into one
+transaction per batch, loads see every hand queued before them, the
+leaderboard is served from the bankroll index, a failed commit is retried,
+a store that can't open its database fails its futures instead of
+leaving them waiting, and bets are kept, also in a database made before
+the bet columns.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+
+import stats_store
+from engine import DEALER_BUST, DEALER_WIN, PLAYER_BLACKJACK, PLAYER_BUST, PUSH, payout
+from stats_store import StatsStore, connect, leaderboard
+
+
+def test_payouts():
+    assert payout(PLAYER_BLACKJACK, 10) == 15
+    assert payout(DEALER_BUST, 10) == 10
+    assert payout(PUSH, 10) == 0
+    assert payout(PLAYER_BUST, 10) == payout(DEALER_WIN, 10) == -10
+
+
+def test_batched_writes_and_ordered_loads():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.sqlite3")
+        store = StatsStore(path, start=100, window=0.5)
+
+        def play(username):
+            for outcome in (PLAYER_BLACKJACK, DEALER_BUST, PUSH, PLAYER_BUST) * 25:
+                store.record(username, outcome, 10)
+
+        threads = [threading.Thread(target=play, args=(f"p{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        row = store.load("p3").result(5)
+        assert row["hands"] == 100
+        assert row["bankroll"] == 100 + 25 * (15 + 10 + 0 - 10)
+        assert (row["wins"], row["pushes"], row["losses"], row["blackjacks"], row["busts"]) == (50, 25, 25, 25, 25)
+        assert store.written == 800
+        assert store.batches < 10  # 800 hands, not 800 transactions
+        assert store.load("nobody").result(5)["bankroll"] == 100
+        store.close()
+
+        conn = sqlite3.connect(path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+
+def test_leaderboard_uses_the_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.sqlite3")
+        store = StatsStore(path, start=100, window=0)
+        for i in range(5):
+            for _ in range(i):
+                store.record(f"p{i}", DEALER_BUST, 10)
+        store.flush().result(5)
+        store.close()
+
+        assert [row["username"] for row in leaderboard(path, 3)] == ["p4", "p3", "p2"]
+        conn = connect(path)
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT username FROM players ORDER BY bankroll DESC LIMIT 3").fetchall()
+        conn.close()
+        assert any("players_by_bankroll" in str(step) for step in plan)
+
+
+def test_failed_batch_is_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StatsStore(os.path.join(tmp, "stats.sqlite3"), start=100, window=0)
+        write = store._write
+        failures = [sqlite3.OperationalError("database is locked")] * 2
+
+        def flaky(conn, hands):
+            if failures:
+                raise failures.pop()
+            write(conn, hands)
+
+        retry_delay, stats_store.RETRY_DELAY = stats_store.RETRY_DELAY, 0.05
+        try:
+            store._write = flaky
+            for _ in range(3):
+                store.record("ida", DEALER_BUST, 10)
+            try:
+                store.flush().result(5)
+                raise AssertionError("flush should report the failed commit")
+            except sqlite3.OperationalError:
+                pass
+            for _ in range(100):  # the retry happens on its own once the queue is idle
+                if not store.unwritten:
+                    break
+                threading.Event().wait(0.02)
+            store.record("ida", DEALER_BUST, 10)
+            store.flush().result(5)
+            assert store.errors == 2 and store.written == 4
+            assert store.load("ida").result(5)["bankroll"] == 140
+        finally:
+            stats_store.RETRY_DELAY = retry_delay
+            store.close()
+
+
+def test_unusable_database_fails_every_future():
+    with tempfile.NamedTemporaryFile() as not_a_directory:
+        store = StatsStore(os.path.join(not_a_directory.name, "stats.sqlite3"))
+        store.thread.join(5)
+        for future in (store.load("jo"), store.flush()):
+            try:
+                future.result(1)
+                raise AssertionError("expected the connect error")
+            except OSError:
+                pass
+        assert store.failure is not None
+
+
+def test_bets_are_recorded_and_old_databases_upgraded():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE players (username TEXT PRIMARY KEY, bankroll INTEGER NOT NULL,
+                hands INTEGER NOT NULL DEFAULT 0, wins INTEGER NOT NULL DEFAULT 0,
+                losses INTEGER NOT NULL DEFAULT 0, pushes INTEGER NOT NULL DEFAULT 0,
+                blackjacks INTEGER NOT NULL DEFAULT 0, busts INTEGER NOT NULL DEFAULT 0,
+                updated REAL NOT NULL);
+            INSERT INTO players (username, bankroll, hands, updated) VALUES ('old', 500, 3, 0);
+        """)
+        conn.close()
+
+        store = StatsStore(path, start=100, window=0)
+        store.record("old", DEALER_BUST, 10)
+        store.record("old", DEALER_WIN, 25)
+        row = store.load("old").result(5)
+        assert (row["bankroll"], row["hands"], row["bet"], row["wagered"]) == (485, 5, 25, 35)
+        assert store.load("new").result(5)["wagered"] == 0
+        store.close()
+
+
+if __name__ == "__main__":
+    test_payouts()
+    test_batched_writes_and_ordered_loads()
+    test_leaderboard_uses_the_index()
+    test_failed_batch_is_retried()
+    test_unusable_database_fails_every_future()
+    test_bets_are_recorded_and_old_databases_upgraded()
+    print("All stats store tests passed")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached basic-strategy tables.
+"""
+import os
+import sys
+import tempfile
+from array import array
+
+from engine import Hand
+from strategy import (
+    BYTE_ORDERS, HEADER, HIT, MAGIC, RULES_VERSION, STAND, StrategyTable, build_table,
+    dealer_final_probabilities, load_table, rules_key, shoe_counts,
+)
+
+
+def test_dealer_probabilities_sum_to_one():
+    full = shoe_counts(6)
+    for up in range(1, 11):
+        counts = full[:up - 1] + (full[up - 1] - 1,) + full[up:]
+        assert abs(sum(dealer_final_probabilities(counts, up)) - 1) < 1e-9
+
+
+def test_table_is_built_once_and_reused():
+    with tempfile.TemporaryDirectory() as tmp:
+        table = load_table(6, tmp)
+        path = os.path.join(tmp, f"strategy-{rules_key(6)}.bin")
+        mtime = os.path.getmtime(path)
+
+        again = load_table(6, tmp)
+        assert os.path.getmtime(path) == mtime
+        assert again.lookup(16, False, 10) == table.lookup(16, False, 10)
+
+
+def test_known_basic_strategy_plays():
+    with tempfile.TemporaryDirectory() as tmp:
+        table = load_table(6, tmp)
+
+        def play(hard, ace, up):
+            stand, hit = table.lookup(hard, ace, up)
+            return HIT if hit > stand else STAND
+
+        assert play(11, False, 10) == HIT
+        assert play(16, False, 10) == HIT
+        assert play(12, False, 4) == STAND
+        assert play(13, False, 2) == STAND
+        assert play(17, False, 1) == STAND
+        assert play(8, True, 5) == STAND   # soft 18
+        assert play(8, True, 9) == HIT     # soft 18 against a 9
+
+        hand = Hand("Player")
+        hand.add(36)  # 10♠
+        hand.add(20)  # 6♠
+        assert table.advise(hand, 36)[0] == HIT
+
+
+def test_table_from_the_other_byte_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        native = load_table(6, tmp)
+        swapped = build_table(6)
+        swapped.byteswap()
+        other = "big" if sys.byteorder == "little" else "little"
+        path = os.path.join(tmp, "swapped.bin")
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, RULES_VERSION, 6, BYTE_ORDERS[other]))
+            f.write(swapped.tobytes())
+        table = StrategyTable(path, 6)
+        assert isinstance(table._evs, array)
+        assert table.lookup(16, False, 10) == native.lookup(16, False, 10)
+
+
+def test_unwritable_cache_falls_back_to_memory():
+    with tempfile.TemporaryDirectory() as tmp:
+        blocked = os.path.join(tmp, "file")
+        open(blocked, "w").close()
+        table = load_table(6, os.path.join(blocked, "cache"))  # a file where the directory should be
+        assert table.lookup(16, False, 10) == load_table(6, tmp).lookup(16, False, 10)
+        assert [name for name in os.listdir(tmp) if name.endswith(".tmp")] == []
+
+
+if __name__ == "__main__":
+    test_dealer_probabilities_sum_to_one()
+    test_table_is_built_once_and_reused()
+    test_known_basic_strategy_plays()
+    test_table_from_the_other_byte_order()
+    test_unwritable_cache_falls_back_to_memory()
+    print("✓ Strategy table tests passed")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for shared tables: seats share one shoe and dealer, turns go in
+order, a slow player is stood for, broadcasts carry only what changed,
+and the coordinator opens a new table when the others are full. A player
+sitting a round out doesn't book a result for it. A shoe too short for the
+coming round is replaced before the deal, and a round that fails is
+abandoned without stopping the table.
+"""
+import asyncio
+
+from main import BlackjackApp
+from engine import Shoe
+from table import DEAL, HIT, STAND, WATCHING, Table, TableCoordinator, max_seats, round_reserve
+
+
+async def _until(condition, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_round_at_a_shared_table():
+    async def run():
+        tables = TableCoordinator(2, step_delay=0, join_wait=1.0)
+        diffs = {"alice": [], "bob": [], "carol": []}
+        alice = tables.join("alice", diffs["alice"].append)
+        bob = tables.join("bob", diffs["bob"].append)
+        carol = tables.join("carol", diffs["carol"].append)
+        assert alice.table is bob.table and carol.table is not alice.table
+        table = alice.table
+        assert alice.round.shoe is bob.round.shoe is table.shoe
+        assert alice.round.dealer is bob.round.dealer is table.dealer
+
+        # Both ready: dealt at once without waiting out the join window
+        table.send(alice, DEAL)
+        table.send(bob, DEAL)
+        await _until(lambda: table.in_round)
+        assert len(alice.hand.cards) == len(bob.hand.cards) == len(table.dealer.cards) == 2
+        assert table.state["dealer"][1] == -1  # hole card not broadcast
+
+        for seat in (alice, bob):
+            if seat.status == "playing":
+                await _until(lambda: table.turn == seat.index)
+                # Acting out of turn does nothing
+                other = bob if seat is alice else alice
+                table.send(other, HIT)
+                before = len(diffs["alice"])
+                table.send(seat, HIT)
+                await _until(lambda: len(diffs["alice"]) > before)
+                changed = set(diffs["alice"][before])
+                assert changed <= {seat.key(), "message", "turn", "dealer", "dealer_total"}, changed
+                if seat.status == "playing":
+                    table.send(seat, STAND)
+        await _until(lambda: not table.in_round)
+
+        assert alice.result and bob.result
+        assert alice.status == bob.status == WATCHING
+        assert table.state["dealer_total"] == table.dealer.values()
+        # Everyone saw the same broadcasts
+        assert diffs["alice"][-1] is diffs["bob"][-1]
+        assert not any("seat0" in diff and diff["seat0"] and diff["seat0"][0] == "alice"
+                       for diff in diffs["carol"])
+
+        for seat in (alice, bob, carol):
+            tables.leave(seat)
+        assert not tables.tables
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+
+def test_slow_player_is_stood_for():
+    async def run():
+        tables = TableCoordinator(3, turn_timeout=0.05, step_delay=0, join_wait=0.01)
+        messages = []
+        seat = tables.join("dave", lambda diff: messages.append(diff.get("message")))
+        table = seat.table
+        for _ in range(20):  # a natural skips the turn, so deal until one is played
+            table.send(seat, DEAL)
+            await _until(lambda: table.in_round)
+            await _until(lambda: not table.in_round)
+            if not seat.hand.is_blackjack():
+                break
+        assert "dave stands (timed out)" in messages
+        assert len(seat.hand.cards) == 2 and seat.result is not None
+        tables.leave(seat)
+
+    asyncio.run(run())
+
+
+def test_leaving_mid_turn_finishes_the_round():
+    async def run():
+        tables = TableCoordinator(2, step_delay=0, join_wait=0.01)
+        erin = tables.join("erin", lambda diff: None)
+        frank = tables.join("frank", lambda diff: None)
+        table = erin.table
+        table.send(erin, DEAL)
+        table.send(frank, DEAL)
+        await _until(lambda: table.in_round)
+        tables.leave(erin)
+        tables.leave(frank)
+        await _until(lambda: table.task is None)
+        assert not tables.tables
+
+    asyncio.run(run())
+
+
+def test_sitting_a_round_out_records_nothing():
+    async def run():
+        tables = TableCoordinator(2, turn_timeout=0.05, step_delay=0, join_wait=0.01)
+        app = BlackjackApp(session_id="local", username="gina", watch_chat=False, tables=tables)
+        async with app.run_test(size=(160, 50)) as pilot:
+            await _until(lambda: app.seat is not None)
+            messages = []
+            harry = tables.join("harry", lambda diff: messages.append(diff.get("message")))
+            table = harry.table
+            recorded = []
+            record = app.record_outcome
+            app.record_outcome = lambda outcome: recorded.append(outcome) or record(outcome)
+
+            async def play_round(*seats):
+                rounds = messages.count("Round over")
+                for seat in seats:
+                    table.send(seat, DEAL)
+                await _until(lambda: messages.count("Round over") > rounds)
+                await pilot.pause()
+
+            await play_round(app.seat, harry)
+            assert len(recorded) == 1
+            await play_round(harry)  # gina sits this one out
+            assert len(recorded) == 1 and app.seat.result is None
+            tables.leave(harry)
+
+    asyncio.run(run())
+
+
+def test_short_shoe_is_replaced_before_the_deal():
+    async def run():
+        tables = TableCoordinator(5, turn_timeout=0.01, step_delay=0, join_wait=0.01)
+        seats = [tables.join(f"p{index}", lambda diff: None) for index in range(5)]
+        table = seats[0].table
+        # Ten cards left and no cut card: far too few for five players
+        table.shoes.shoe = table.shoe = Shoe(table.shoe.cards[-10:])
+        for seat in seats:
+            table.send(seat, DEAL)
+        await _until(lambda: table.in_round)
+        await _until(lambda: not table.in_round)
+        assert table.shoes.shoes == 2
+        assert all(seat.result is not None for seat in seats)
+        for seat in seats:
+            tables.leave(seat)
+
+    asyncio.run(run())
+
+
+def test_failed_round_is_abandoned():
+    async def run():
+        tables = TableCoordinator(2, turn_timeout=0.01, step_delay=0, join_wait=0.01)
+        messages = []
+        seat = tables.join("ivy", lambda diff: messages.append(diff.get("message")))
+        table = seat.table
+
+        class BrokenShoe(Shoe):
+            def draw(self):
+                raise RuntimeError("card jammed")
+
+        shoe = table.shoe
+        table.shoes.shoe = table.shoe = seat.round.shoe = BrokenShoe(shoe.cards)
+        table.send(seat, DEAL)
+        await _until(lambda: any(message and "abandoned" in message for message in messages))
+        assert table.task is not None and not table.in_round
+        assert seat.status == WATCHING and seat.result is None
+
+        # The table plays on once the fault clears
+        table.shoes.shoe = table.shoe = seat.round.shoe = shoe
+        table.send(seat, DEAL)
+        await _until(lambda: "Round over" in messages)
+        tables.leave(seat)
+
+    asyncio.run(run())
+
+
+def test_seats_are_capped_to_what_one_shoe_covers():
+    table = Table(1, seats=100, decks=1)
+    assert len(table.seats) == max_seats(1) < 100
+    assert round_reserve(len(table.seats)) <= table.shoe.value_left()
+
+
+if __name__ == "__main__":
+    test_round_at_a_shared_table()
+    test_slow_player_is_stood_for()
+    test_leaving_mid_turn_finishes_the_round()
+    test_sitting_a_round_out_records_nothing()
+    test_short_shoe_is_replaced_before_the_deal()
+    test_failed_round_is_abandoned()
+    test_seats_are_capped_to_what_one_shoe_covers()
+    print("All table tests passed")
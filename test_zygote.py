@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the zygote's launch loop: a connection that never sends its
+request neither holds up other launches nor stays open for ever, and a
+forked session is hung up and reaped when its connection closes. A request
+is only accepted whole, with exactly one fd.
+"""
+import json
+import os
+import select
+import signal
+import socket
+import tempfile
+import time
+
+import zygote
+
+
+def _wait_for_hangup(tty_fd, env):
+    """Stands in for run_session in the forked child: idle until SIGHUP kills it"""
+    try:
+        # The test's own end of the connection was forked too; only the SSH side should hold it
+        os.closerange(3, tty_fd)
+        os.closerange(tty_fd + 1, 1024)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        while True:
+            time.sleep(1)
+    finally:
+        os._exit(1)
+
+
+def _serve_until(server, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        server.run_once(0.01)
+
+
+def test_silent_client_and_hangup():
+    saved = zygote.run_session, zygote.REQUEST_TIMEOUT, signal.getsignal(signal.SIGCHLD)
+    zygote.run_session = _wait_for_hangup
+    zygote.REQUEST_TIMEOUT = 0.3
+    with tempfile.TemporaryDirectory() as tmp:
+        server = zygote.Zygote(os.path.join(tmp, "zygote.sock"))
+        try:
+            server.listen()
+            silent = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            silent.connect(server.path)
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            client.connect(server.path)
+            tty, tty_peer = socket.socketpair()  # any fd will do for the child's terminal
+            socket.send_fds(client, [json.dumps({"env": {}}).encode()], [tty.fileno()])
+            tty.close()
+
+            # The second client is answered while the first has still sent nothing
+            _serve_until(server, lambda: select.select([client], [], [], 0)[0])
+            pid = json.loads(client.recv(4096).decode().splitlines()[0])["pid"]
+            assert pid in server.children and len(server.waiting) == 1
+            os.kill(pid, 0)  # running
+
+            # The silent connection is dropped once its time is up
+            _serve_until(server, lambda: not server.waiting)
+            assert silent.recv(1) == b""
+
+            # Hanging up ends the session and the zygote reaps it
+            client.close()
+            _serve_until(server, lambda: pid not in server.children)
+            try:
+                os.waitpid(pid, os.WNOHANG)
+                raise AssertionError("child was not reaped")
+            except ChildProcessError:
+                pass
+            silent.close()
+            tty_peer.close()
+        finally:
+            for pid in server.children:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            signal.set_wakeup_fd(-1)
+            zygote.run_session, zygote.REQUEST_TIMEOUT, handler = saved
+            signal.signal(signal.SIGCHLD, handler)
+            server.listener.close()
+
+
+def test_request_needs_one_whole_datagram_and_one_fd():
+    def receive(parts, fds):
+        client, server = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        with client, server:
+            socket.send_fds(client, parts, fds)
+            return zygote.receive_request(server)
+
+    tty, tty_peer = socket.socketpair()
+    with tty, tty_peer:
+        request, fd = receive([b'{"env": {"A": "1"}}'], [tty.fileno()])
+        assert request == {"env": {"A": "1"}}
+        os.close(fd)
+
+        before = len(os.listdir("/proc/self/fd"))
+        bad = [
+            ([b'{"env": {}}'], []),                              # no fd
+            ([b'{"env": {}}'], [tty.fileno(), tty.fileno()]),    # one fd too many
+            ([b'{"env": '], [tty.fileno()]),                     # cut short
+            ([b"x" * (zygote.MAX_REQUEST + 1)], [tty.fileno()]),  # truncated
+        ]
+        for parts, fds in bad:
+            try:
+                receive(parts, fds)
+                raise AssertionError(f"accepted {parts!r} with {len(fds)} fds")
+            except ValueError:
+                pass
+        assert len(os.listdir("/proc/self/fd")) == before  # refused fds were closed
+
+
+if __name__ == "__main__":
+    test_silent_client_and_hangup()
+    test_request_needs_one_whole_datagram_and_one_fd()
+    print("All zygote tests passed")
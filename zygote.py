@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Pre-forking launcher for blackjack sessions.
+
+A long-lived zygote imports Textual and main.py, runs one headless warm-up
+app so every lazily imported module is loaded and all CSS is parsed, then
+waits on a Unix SOCK_SEQPACKET socket. For each session the SSH server sends
+one request datagram (JSON with the session environment) together with the
+PTY slave fd; the zygote forks, and the child makes that PTY its controlling
+terminal and runs BlackjackApp. Children share the warmed-up interpreter heap
+copy-on-write and skip the import and CSS cost entirely.
+
+Protocol, per connection, one datagram per message:
+    -> {"env": {...}}             with exactly one tty fd attached (SCM_RIGHTS)
+    <- {"pid": 1234}\\n
+    <- {"exit": 0}\\n             when the session process ends
+A request is refused unless it arrives whole, in one datagram, with exactly
+one fd. Closing the connection hangs up the session. A connection that sends
+no request within REQUEST_TIMEOUT seconds is dropped; requests are read as
+they arrive, so a slow client never holds up anyone else's launch.
+
+    python zygote.py --socket /tmp/ssh-blackjack-zygote.sock
+"""
+import argparse
+import array
+import asyncio
+import fcntl
+import json
+import os
+import random
+import selectors
+import signal
+import socket
+import sys
+import termios
+import threading
+import time
+
+import debuglog
+import profiling
+
+DEFAULT_SOCKET = "/tmp/ssh-blackjack-zygote.sock"
+REQUEST_TIMEOUT = 5.0  # seconds a new connection has to send its request
+MAX_REQUEST = 65536  # bytes; a larger request is truncated and refused
+MAX_FDS = 4  # room to notice a request carrying more fds than the one expected
+
+
+def warm_up():
+    """Import everything a session needs and parse its CSS in this process"""
+    import main
+
+    # Both layouts, so low-bandwidth sessions skip parsing compact.tcss too
+    for low_bandwidth in (False, True):
+        app = main.BlackjackApp(low_bandwidth=low_bandwidth, warm_up=True)
+
+        async def run():
+            async with app.run_test(headless=True) as pilot:
+                await pilot.pause()
+
+        asyncio.run(run())
+
+        main.keep_parsed_css(app.stylesheet)
+        main.CSS_LAYOUTS_KEPT.add(tuple(app.css_path))
+
+    if threading.active_count() != 1:
+        raise RuntimeError("warm-up left threads running; refusing to fork from this process")
+
+
+def run_session(tty_fd: int, env: dict):
+    """Child side of the fork: take over the PTY and run the app. Never returns."""
+    status = 1
+    try:
+        os.setsid()
+        fcntl.ioctl(tty_fd, termios.TIOCSCTTY, 0)
+        for fd in (0, 1, 2):
+            os.dup2(tty_fd, fd)
+        if tty_fd > 2:
+            os.close(tty_fd)
+
+        os.environ.clear()
+        os.environ.update(env)
+        # Every child inherits the zygote's RNG state; without this all shoes match
+        random.seed()
+        debuglog.configure()
+        profiling.configure()
+
+        import main
+
+        main.BlackjackApp().run()
+        status = 0
+    finally:
+        debuglog.dump_if_enabled()
+        profiling.dump_if_enabled()
+        os._exit(status)
+
+
+def receive_request(conn: socket.socket):
+    """Read one request datagram; returns (request, tty fd).
+
+    Raises ValueError, with any fds received already closed, unless the
+    datagram arrived whole with exactly one fd and valid JSON.
+    """
+    fds = array.array("i")
+    message, ancdata, flags, _addr = conn.recvmsg(MAX_REQUEST, socket.CMSG_SPACE(MAX_FDS * fds.itemsize))
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+    try:
+        if not message:
+            raise ValueError("connection closed before a request")
+        if flags & (socket.MSG_TRUNC | socket.MSG_CTRUNC):
+            raise ValueError("request truncated")
+        if len(fds) != 1:
+            raise ValueError(f"expected one tty fd, got {len(fds)}")
+        request = json.loads(message.decode())
+        if not isinstance(request, dict):
+            raise ValueError("request is not a JSON object")
+    except ValueError:
+        for fd in fds:
+            os.close(fd)
+        raise
+    return request, fds[0]
+
+
+class Zygote:
+    def __init__(self, path: str):
+        self.path = path
+        self.selector = selectors.DefaultSelector()
+        self.children = {}  # pid -> connection
+        self.waiting = {}  # connection -> deadline for its request
+        self.listener = None
+        self.wakeup_r, self.wakeup_w = os.pipe()
+
+    def serve(self):
+        self.listen()
+        print(f"zygote ready on {self.path} (pid {os.getpid()})", file=sys.stderr)
+        while True:
+            self.run_once()
+
+    def listen(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self.listener.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.listener.listen(128)
+
+        os.set_blocking(self.wakeup_w, False)
+        signal.set_wakeup_fd(self.wakeup_w)
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        self.selector.register(self.listener, selectors.EVENT_READ, self.accept)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ, self.reap)
+
+    def run_once(self, timeout: float = None):
+        """Handle whatever is ready, waiting at most `timeout` seconds for it"""
+        if self.waiting:
+            until_expiry = max(0.0, min(self.waiting.values()) - time.monotonic())
+            timeout = until_expiry if timeout is None else min(timeout, until_expiry)
+        for key, _ in self.selector.select(timeout):
+            key.data(key.fileobj)
+        now = time.monotonic()
+        for conn, deadline in list(self.waiting.items()):
+            if deadline <= now:
+                print("zygote: no request in time, dropping connection", file=sys.stderr)
+                self.selector.unregister(conn)
+                del self.waiting[conn]
+                conn.close()
+
+    def accept(self, listener):
+        """Wait for the new connection's request without blocking the others"""
+        conn, _ = listener.accept()
+        conn.setblocking(False)
+        self.waiting[conn] = time.monotonic() + REQUEST_TIMEOUT
+        self.selector.register(conn, selectors.EVENT_READ, self.start_session)
+
+    def start_session(self, conn):
+        """The request (or a hang-up) has arrived: fork the session"""
+        self.selector.unregister(conn)
+        del self.waiting[conn]
+        try:
+            request, tty_fd = receive_request(conn)
+        except (OSError, ValueError) as error:
+            print(f"zygote: bad request: {error}", file=sys.stderr)
+            conn.close()
+            return
+        conn.setblocking(True)
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            self.listener.close()
+            conn.close()
+            for other in list(self.children.values()) + list(self.waiting):
+                other.close()
+            run_session(tty_fd, request.get("env", {}))
+
+        os.close(tty_fd)
+        self.children[pid] = conn
+        conn.sendall(json.dumps({"pid": pid}).encode() + b"\n")
+        self.selector.register(conn, selectors.EVENT_READ, lambda c, pid=pid: self.hang_up(pid))
+
+    def hang_up(self, pid: int):
+        """The SSH side closed its connection: end that session"""
+        conn = self.children.get(pid)
+        if conn is None:
+            return
+        try:
+            if conn.recv(1):
+                return  # nothing else is expected on this connection
+        except OSError:
+            pass
+        self.selector.unregister(conn)
+        try:
+            os.kill(pid, signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+
+    def reap(self, wakeup):
+        os.read(self.wakeup_r, 512)
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            conn = self.children.pop(pid, None)
+            if conn is None:
+                continue
+            try:
+                self.selector.unregister(conn)
+            except KeyError:
+                pass  # already hung up from the SSH side
+            try:
+                conn.sendall(json.dumps({"exit": os.waitstatus_to_exitcode(status)}).encode() + b"\n")
+            except OSError:
+                pass
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-forking launcher for blackjack sessions")
+    parser.add_argument("--socket", default=os.getenv("BLACKJACK_ZYGOTE", DEFAULT_SOCKET))
+    args = parser.parse_args()
+
+    warm_up()
+    Zygote(args.socket).serve()
+
+
+if __name__ == "__main__":
+    main()